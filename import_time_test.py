@@ -0,0 +1,53 @@
+"""
+Guard against import-time regressions: `import PyOghma` must not load heavy third-party packages, and must stay
+within a time budget. Run from the repository root with `python import_time_test.py [budget in ms]`.
+"""
+import os
+import sys
+import subprocess
+
+HEAVY = ('pandas', 'scipy', 'matplotlib', 'tqdm')
+BUDGET_MS = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+
+
+def importtime(statement: str) -> dict:
+    """
+    Run a statement in a fresh interpreter with `python -X importtime`.
+    Args:
+        statement (str): The statement to run.
+    Returns:
+        dict: The self and cumulative import times in microseconds of every module imported.
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], env=env,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+checks = {
+    'import PyOghma': HEAVY + ('numpy',),
+    'import PyOghma; PyOghma.Results': HEAVY,
+    'import PyOghma; PyOghma.OghmaNano': HEAVY[:3],
+    'import PyOghma; PyOghma.Calculate': ('pandas', 'scipy', 'matplotlib'),
+}
+
+failed = False
+for statement, forbidden in checks.items():
+    times = importtime(statement)
+    loaded = [name for name in forbidden if name in times]
+    total = sum(own for own, _ in times.values()) / 1e3
+    print(f'{statement:<40} {total:8.1f} ms  heavy imports: {", ".join(loaded) or "none"}')
+    failed |= bool(loaded)
+
+package = importtime('import PyOghma')['PyOghma'][1] / 1e3
+if package > BUDGET_MS:
+    print(f'import PyOghma took {package:.1f} ms, over the budget of {BUDGET_MS:.1f} ms')
+    failed = True
+
+sys.exit(1 if failed else 0)
@@ -3,12 +3,56 @@ This module provides functionality for analyzing solar cell experimental data, i
 of ideality factors, transport resistance, and pseudo JV characteristics. It processes experimental 
 data and performs numerical computations to derive key parameters for solar cell performance analysis.
 """
+import os
 import platform
+import functools
+import itertools
 import numpy as np
 import ujson as json
-import scipy.constants as sc
-import scipy.interpolate as spi
-import matplotlib.pyplot as plt
+
+from .SimInfo import SimInfo
+from .OghmaResults import Results
+
+
+CACHE_SIZE = 8
+"""The number of decoded experiment files kept by read_exp."""
+
+
+def load_exp(exp: object) -> dict:
+    """
+    Get the experiment dictionary of an experiment given as a path, a Results object or a dictionary.
+    Files are decoded once per process and shared: the returned dictionary must not be modified.
+    Args:
+        exp (object): The file path to an experiment file written by Results.save_dict, a Results
+            object, or an experiment dictionary.
+    Returns:
+        dict: The experiment dictionary.
+    """
+    if isinstance(exp, Results):
+        return exp.exp_dict
+    if isinstance(exp, dict):
+        return exp
+    path = os.path.abspath(exp)
+    stat = os.stat(path)
+    return read_exp(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def read_exp(path: str, mtime: int, size: int) -> dict:
+    """
+    Decode an experiment file. Calls are cached on the path, modification time and size, so a file is
+    decoded again only if it changes. Use read_exp.cache_clear() to release the cached experiments.
+    Args:
+        path (str): The absolute path to the experiment file.
+        mtime (int): The modification time of the file in nanoseconds.
+        size (int): The size of the file in bytes.
+    Returns:
+        dict: The experiment dictionary.
+    """
+    R = Results()
+    R.load_dict(path)
+    return R.exp_dict
+
 
 class Ideality_Factor:
     """
@@ -17,248 +61,624 @@ class Ideality_Factor:
     Attributes:
         system (str): The operating system of the machine ('Linux' or 'Windows').
         data (dict): Parsed experimental data from the input file.
-        Voc (list): List of open-circuit voltages extracted from the experimental data.
-        GenRate (list): List of generation rates extracted from the experimental data.
-        result (float): The calculated ideality factor.
+        Voc (numpy.ndarray): Open-circuit voltages extracted from the experimental data.
+        GenRate (numpy.ndarray): Generation rates extracted from the experimental data.
+        result (float or numpy.ndarray): The calculated ideality factor, one per combination of the other variables.
+        differential (numpy.ndarray): The differential ideality factor at each intensity.
     """
-    def __init__(self, exp: str) -> None:
+    def __init__(self, exp: object) -> None:
         """
         Initializes the Ideality_Factor class.
         Args:
-            exp (str): The file path to the input data file.
+            exp (object): The file path to the input data file, a Results object or an experiment dictionary.
         Attributes:
-            exp (str): Stores the file path to the input data file.
+            exp (object): Stores the experiment as given.
             system (str): The name of the operating system ('Linux' or 'Windows').
-            data (dict): The data loaded from the input file. The file is read using 
-                         `mg.open` on Linux and `gzip.open` on Windows.
+            data (dict): The experiment dictionary, loaded through the shared cache of load_exp.
         Raises:
             FileNotFoundError: If the specified file does not exist.
             json.JSONDecodeError: If the file content is not valid JSON.
         """
         self.exp = exp
         self.system = platform.system()
-        if self.system == 'Linux':
-            import mgzip as mg
-            with mg.open(self.exp, 'r') as f:
-                self.data = json.load(f)
-        elif self.system == 'Windows':
-            import gzip
-            with gzip.open(self.exp, 'r') as f:
-                self.data = json.load(f)
-
-    def calculate(self, temp: float = 300) -> None:
+        self.data = load_exp(self.exp)
+
+    def calculate(self, temp: float = 300, intensity: str = 'intensity', temperature: str = 'temperature') -> None:
         """
         Calculates the ideality factor (Nid) based on the given data.
         This method computes the ideality factor using the relationship between 
         the logarithm of the generation rate and the open-circuit voltage (Voc). 
         The calculation involves the Boltzmann constant, temperature, and the 
         gradient of the logarithmic generation rate with respect to Voc.
+        For sweeps over several variables, Voc is reshaped into a cube and the ideality factor is
+        computed along the intensity axis for every combination of the other variables at once.
         Args:
-            temp (float, optional): The temperature in Kelvin. Defaults to 300 K.
+            temp (float, optional): The temperature in Kelvin, used when the experiment has no
+                temperature variable. Defaults to 300 K.
+            intensity (str, optional): The name of the intensity variable. Defaults to 'intensity'.
+            temperature (str, optional): The name of the temperature variable. Defaults to 'temperature'.
         Attributes:
-            Voc (list): A list of open-circuit voltage values extracted from the data.
-            GenRate (list): A list of generation rate values extracted from the data.
-            result (float): The calculated ideality factor (Nid).
+            Voc (numpy.ndarray): The open-circuit voltages, with the intensity axis last and in ascending order.
+            GenRate (numpy.ndarray): The generation rates (light intensities), in ascending order.
+            axes (dict): The values of the other variables, one axis of result each, in experiment order.
+            result (float or numpy.ndarray): The ideality factor from the mean gradient, a float for a sweep
+                of intensity alone and otherwise an array with one value per combination of the other variables.
+            differential (numpy.ndarray): The differential ideality factor at each intensity, shaped like Voc.
         Raises:
-            KeyError: If required keys are missing in the input data structure.
-            ValueError: If the data contains invalid or non-numeric values.
+            KeyError: If the experiment has no intensity variable.
+            ValueError: If a sweep over several variables was not built with the 'product' iterator.
         Notes:
             - The method assumes that the input data structure (`self.data`) is 
               properly formatted and contains the necessary keys and values.
             - The Boltzmann constant and elementary charge are retrieved using 
               the `scipy.constants.value` function.
         """
+        import scipy.constants as sc
         kb = sc.value('Boltzmann constant in eV/K')
         e = sc.value('elementary charge')
-        self.Voc = []
-        self.GenRate = []
-        for idx,h in enumerate(self.data['experiment']['hashes']):
-            self.Voc.append(float(self.data[h]['sim_info']['voc']))
-            self.GenRate.append(float(self.data['experiment']['variable']['intensity'][idx]))
+        variables = self.data['experiment']['variable']
+        names = list(variables.keys())
+        if intensity not in names:
+            raise KeyError('Variable not in experiment: ' + str(intensity))
+
+        if len(names) == 1:
+            Voc = SimInfo(self.data, fields=['voc']).column('voc')
+        else:
+            R = Results()
+            R.exp_dict = self.data
+            Voc = R.to_cube('voc')
+
+        GenRate = np.asarray(variables[intensity], dtype=np.float64)
+        order = np.argsort(GenRate, kind='stable')
+        self.GenRate = GenRate[order]
+        self.Voc = np.moveaxis(Voc, names.index(intensity), -1)[..., order]
+
+        others = [name for name in names if name != intensity]
+        self.axes = {name: variables[name] for name in others}
+        T = np.float64(temp)
+        if temperature in others:
+            shape = [1] * len(others)
+            shape[others.index(temperature)] = -1
+            T = np.asarray(variables[temperature], dtype=np.float64).reshape(shape)
 
         GenRate = np.log(self.GenRate)
-        
-        plt.show()
-        grad = np.mean(np.gradient(GenRate, self.Voc))
-        Nid = 1/(kb * temp * grad)
+        grad = gradient(np.broadcast_to(GenRate, self.Voc.shape), self.Voc)
+        with np.errstate(divide='ignore'):
+            self.differential = 1/(kb * T[..., np.newaxis] * grad)
+            Nid = 1/(kb * T * np.mean(grad, axis=-1))
 
-        self.result = Nid
+        self.result = float(Nid) if not others else Nid
+
+
+def gradient(f: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Take the gradient of f with respect to x along the last axis, where x may differ from row to row.
+    Uses second-order central differences in the interior and first-order differences at the edges,
+    as np.gradient does for a non-uniform coordinate array.
+    Args:
+        f (numpy.ndarray): The values, shaped (..., n).
+        x (numpy.ndarray): The coordinates, shaped like f.
+    Returns:
+        numpy.ndarray: The gradient, shaped like f.
+    """
+    dx = np.diff(x, axis=-1)
+    df = np.diff(f, axis=-1)
+    out = np.empty(np.broadcast_shapes(f.shape, x.shape))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx1 = dx[..., :-1]
+        dx2 = dx[..., 1:]
+        a = -(dx2) / (dx1 * (dx1 + dx2))
+        b = (dx2 - dx1) / (dx1 * dx2)
+        c = dx1 / (dx2 * (dx1 + dx2))
+        out[..., 1:-1] = a * f[..., :-2] + b * f[..., 1:-1] + c * f[..., 2:]
+        out[..., 0] = df[..., 0] / dx[..., 0]
+        out[..., -1] = df[..., -1] / dx[..., -1]
+    return out
 
 class Transport_Resistance:
     """
     A class to calculate transport resistance based on experimental data.
     Attributes:
-        exp (str): The path to the experimental data file.
+        exp (object): The experiment as given: a file path, a Results object or a dictionary.
         system (str): The operating system of the platform ('Linux' or 'Windows').
         data (dict): The experimental data loaded from the file.
-        pJV_j (numpy.ndarray): Pseudo JV current density data.
-        pJV_v (numpy.ndarray): Pseudo JV voltage data.
-        TR_Voc (list): List of calculated transport resistance at open-circuit voltage.
+        PJV (Psudo_JV): The pseudo JV, whose rows are taken one hash at a time.
+        TR_Voc (numpy.ndarray): The calculated transport resistance at open-circuit voltage.
     """
-    def __init__(self, exp: str) -> None:
+    def __init__(self, exp: object) -> None:
         """
         Initializes the Transport_Resistance class.
         Args:
-            exp (str): The file path to the experiment data.
+            exp (object): The file path to the experiment data, a Results object or an experiment dictionary.
         Attributes:
-            exp (str): Stores the provided file path to the experiment data.
+            exp (object): Stores the experiment as given.
             system (str): The operating system of the current platform ('Linux' or 'Windows').
-            data (dict): The loaded experiment data from the specified file.
-            pJV_j (list): The pseudo-JV current density values calculated by the Psudo_JV class.
-            pJV_v (list): The pseudo-JV voltage values calculated by the Psudo_JV class.
+            data (dict): The experiment dictionary, loaded through the shared cache of load_exp.
+            PJV (Psudo_JV): The pseudo JV calculated by the Psudo_JV class.
         Raises:
             OSError: If there is an issue opening or reading the file.
             JSONDecodeError: If the file content is not valid JSON.
         """
         self.exp = exp
         self.system = platform.system()
-        if self.system == 'Linux':
-            import mgzip as mg
-            with mg.open(self.exp, 'r') as f:
-                self.data = json.load(f)
-        elif self.system == 'Windows':
-            import gzip
-            with gzip.open(self.exp, 'r') as f:
-                self.data = json.load(f)
-        PJV = Psudo_JV(self.exp)
-        PJV.calculate()
-        self.pJV_j = PJV.pJV_j
-        self.pJV_v = PJV.pJV_v
+        self.data = load_exp(self.exp)
+        self.PJV = Psudo_JV(self.data)
+        self.PJV.calculate()
 
-    def calculate(self) -> None:
+    def calculate(self, method: str = 'gradient', processes: int = None) -> None:
         """
         Perform calculations to compute the conductivity at open-circuit voltage (TR_Voc) 
         for experimental data.
-        This method processes JV (current-voltage) data and pJV (perturbed JV) data for each 
-        experimental hash, interpolates the data using PCHIP (Piecewise Cubic Hermite Interpolating 
-        Polynomial), and calculates the derivative of the voltage difference (Vtr) with respect to 
-        the perturbed current density (pj). The resulting derivative at zero current density is 
-        appended to the TR_Voc list.
+        For each experimental hash the JV and pJV data are interpolated using PCHIP (Piecewise Cubic
+        Hermite Interpolating Polynomial), and the derivative of the voltage difference (Vtr) with respect
+        to the perturbed current density (pj) is taken at zero current density. The sampling stencil is
+        built for every hash at once and the interpolants are only evaluated at the points needed for the
+        derivative, but the two PCHIP interpolants are still built one hash at a time, since the curves
+        differ in length; pass processes to spread that loop over a pool.
+        Args:
+            method (str, optional): 'gradient' reproduces the three-point finite difference on a 1001-point
+                grid; 'analytic' differentiates the interpolants at zero. Defaults to 'gradient'.
+            processes (int, optional): Evaluate the interpolants in a process pool of this size, for very
+                large experiments. Defaults to None, which evaluates them in this process.
         Attributes:
-            self.TR_Voc (list): A list to store the calculated TR_Voc values for each experimental hash.
+            self.TR_Voc (numpy.ndarray): The calculated TR_Voc values for each experimental hash.
         Raises:
-            ValueError: If the input data is not properly formatted or contains inconsistencies.
+            ValueError: If the method is not supported.
         Notes:
             - The method assumes that the input data is structured as a dictionary with keys 
               'experiment' and 'hashes', and that JV and pJV data are provided for each hash.
-            - The interpolation and derivative calculations rely on numpy and scipy libraries.
         """
-        self.TR_Voc = []
-        for idx,h in enumerate(self.data['experiment']['hashes']):
+        if method not in ('gradient', 'analytic'):
+            raise ValueError('Unsupported method: ' + str(method))
+        curves = []
+        for idx, h in enumerate(self.data['experiment']['hashes']):
+            v = np.asarray(self.data[h]['jv']['v'])
+            j = np.asarray(self.data[h]['jv']['j'])
+            pj, pv = self.PJV.row(idx)
+            pj = pj + j[0]
+            curves.append(unique_steps(v, j) + unique_steps(pv, pj))
 
-            v = self.data[h]['jv']['v']
-            j = self.data[h]['jv']['j']
+        lo = np.array([np.min(c[3]) for c in curves])
+        hi = np.array([np.max(c[3]) for c in curves])
+        x = zero_stencil(lo, hi) if method == 'gradient' else np.zeros((len(curves), 1))
 
-            pj = self.pJV_j[idx,:]
-            pv = self.pJV_v[idx,:]
+        tasks = [c + (x[idx], method) for idx, c in enumerate(curves)]
+        if processes is not None:
+            import multiprocessing as mp
+            with mp.Pool(processes) as pool:
+                Vtr = pool.map(evaluate_vtr, tasks, chunksize=max(1, len(tasks) // (4 * processes)))
+        else:
+            Vtr = [evaluate_vtr(task) for task in tasks]
+        Vtr = np.array(Vtr).reshape(len(curves), -1)
 
-            v = np.asarray(v)
-            j = np.asarray(j)
+        if method == 'gradient':
+            self.TR_Voc = stencil_gradient(Vtr, x)
+        else:
+            self.TR_Voc = Vtr[:, 0]
 
-            pj = np.asarray(pj + j[0])
-            pv = np.asarray(pv)
 
-            pj1 = np.roll(pj, -1)
-            j1 = np.roll(j, -1)
+def unique_steps(v: np.ndarray, j: np.ndarray) -> tuple:
+    """
+    Drop the points of a curve whose current density equals that of the next point (cyclically), so the
+    current density can be used as the abscissa of an interpolant.
+    Args:
+        v (numpy.ndarray): The voltage.
+        j (numpy.ndarray): The current density.
+    Returns:
+        tuple: The voltage and current density of the remaining points.
+    """
+    jdx = np.flatnonzero(j != np.roll(j, -1))
+    if len(jdx) > 0:
+        return v[jdx], j[jdx]
+    return v, j
 
-            jdx = np.argwhere(pj != pj1).ravel()
-            if len(jdx) > 0:
-                pv = pv[jdx]
-                pj = pj[jdx]
-            
-            jdx = np.argwhere(j != j1).ravel()
-            if len(jdx) > 0:
-                v = v[jdx]
-                j = j[jdx]
 
-            fjv = spi.PchipInterpolator(j, v)
-            fpjv = spi.PchipInterpolator(pj, pv)
-            
-            x = np.linspace(np.min(pj), np.max(pj), 1000)
-            x = np.append(x, 0)
-            x = np.sort(x)
+def zero_stencil(lo: np.ndarray, hi: np.ndarray, points: int = 1000, block: int = 1024) -> np.ndarray:
+    """
+    Find, for each curve, zero and its two neighbours on the sorted grid linspace(lo, hi, points) + [0].
+    Args:
+        lo (numpy.ndarray): The lower end of the grid of each curve.
+        hi (numpy.ndarray): The upper end of the grid of each curve.
+        points (int, optional): The number of grid points. Defaults to 1000.
+        block (int, optional): The number of curves gridded at once, to bound memory. Defaults to 1024.
+    Returns:
+        numpy.ndarray: The stencil of each curve, shaped (len(lo), 3). Rows where zero is the first or last
+            point of the grid are NaN.
+    """
+    x = np.full((len(lo), 3), np.nan)
+    for start in range(0, len(lo), block):
+        grid = np.linspace(lo[start:start + block], hi[start:start + block], points, axis=1)
+        k = np.count_nonzero(grid < 0, axis=1)
+        rows = np.flatnonzero((k > 0) & (k < points))
+        x[start + rows, 0] = grid[rows, k[rows] - 1]
+        x[start + rows, 1] = 0.0
+        x[start + rows, 2] = grid[rows, k[rows]]
+    return x
 
-            Vtr = fjv(x) - fpjv(x)
 
-            DVtr = np.zeros(len(Vtr))
-            for i in range(len(x)):
-                if i == 0:
-                    DVtr[i] = np.nan
-                elif i == len(x)-1:
-                    DVtr[i] = np.nan
-                else:
-                    kdx = [i-1, i, i+1]
-                    f = np.gradient(Vtr[kdx], x[kdx])
-                    DVtr[i] = f[1]
-            
-            x0 = np.argwhere(x == 0).ravel()
-            self.TR_Voc.append(DVtr[x0[0]])
+def evaluate_vtr(task: tuple) -> np.ndarray:
+    """
+    Evaluate Vtr, the voltage difference between the JV and pseudo JV of one hash, or its derivative.
+    Args:
+        task (tuple): (v, j, pv, pj, x, method), the deduplicated JV and pseudo JV, the points to evaluate at
+            and the method passed to Transport_Resistance.calculate.
+    Returns:
+        numpy.ndarray: Vtr at x for 'gradient', or its derivative at x for 'analytic'.
+    """
+    import scipy.interpolate as spi
+    v, j, pv, pj, x, method = task
+    fjv = spi.PchipInterpolator(j, v)
+    fpjv = spi.PchipInterpolator(pj, pv)
+    if method == 'analytic':
+        return fjv.derivative()(x) - fpjv.derivative()(x)
+    if np.isnan(x[0]):
+        return np.full(len(x), np.nan)
+    return fjv(x) - fpjv(x)
+
+
+def stencil_gradient(f: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Take the second-order central difference at the middle of three-point stencils, row by row, exactly as
+    np.gradient does for the interior of a three-point array.
+    Args:
+        f (numpy.ndarray): The values, shaped (n, 3).
+        x (numpy.ndarray): The positions, shaped (n, 3).
+    Returns:
+        numpy.ndarray: The derivative at the middle point of each row.
+    """
+    dx1 = x[:, 1] - x[:, 0]
+    dx2 = x[:, 2] - x[:, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = -(dx2) / (dx1 * (dx1 + dx2))
+        b = (dx2 - dx1) / (dx1 * dx2)
+        c = dx1 / (dx2 * (dx1 + dx2))
+        uniform = (f[:, 2] - f[:, 0]) / (2. * dx1)
+        return np.where(dx1 == dx2, uniform, a * f[:, 0] + b * f[:, 1] + c * f[:, 2])
+
 
 class Psudo_JV:
     """
     Class to calculate the pseudo JV of a diode.
+    The pseudo JV of every hash shares the same voltages and the same current densities up to a per-hash
+    offset, so only these vectors are stored. Rows are produced on demand by row and rows, in O(N) memory;
+    the full N x N matrices are only built if pJV_j or pJV_v are accessed.
     Attributes:
-        exp (str): The path to the experimental data file.
+        exp (object): The experiment as given: a file path, a Results object or a dictionary.
         system (str): The operating system of the platform ('Linux' or 'Windows').
         data (dict): The experimental data loaded from the file.
-        pJV_j (numpy.ndarray): Pseudo JV current density data.
-        pJV_v (numpy.ndarray): Pseudo JV voltage data.
+        jsc (numpy.ndarray): The short-circuit current density of each hash with a valid JV.
+        voc (numpy.ndarray): The open-circuit voltage of the same hashes.
+        offset (numpy.ndarray): The short-circuit current density added to the pseudo JV of each hash.
+        pJV_j (numpy.ndarray): Pseudo JV current density data, one row per hash.
+        pJV_v (numpy.ndarray): Pseudo JV voltage data, one row per hash, as a read-only broadcast view.
     """
-    def __init__(self, exp: str) -> None:
+    def __init__(self, exp: object) -> None:
         """
         Initializes the Psudo_JV class.
         Args:
-            exp (str): Path to the experiment file.
+            exp (object): Path to the experiment file, a Results object or an experiment dictionary.
         Attributes:
-            exp (str): Stores the provided file path to the experiment data.
+            exp (object): Stores the experiment as given.
             system (str): The operating system of the current platform ('Linux' or 'Windows').
-            data (dict): The loaded experiment data from the specified file.
+            data (dict): The experiment dictionary, loaded through the shared cache of load_exp.
         Raises:
             OSError: If there is an issue opening or reading the file.
             JSONDecodeError: If the file content is not valid JSON.
         """
         self.exp = exp
         self.system = platform.system()
-        if self.system == 'Linux':
-            import mgzip as mg
-            with mg.open(self.exp, 'r') as f:
-                self.data = json.load(f)
-        elif self.system == 'Windows':
-            import gzip
-            with gzip.open(self.exp, 'r') as f:
-                self.data = json.load(f)
+        self.data = load_exp(self.exp)
 
     def calculate(self) -> None:
         """
         Calculate the pseudo JV of the diode.
-        This method processes the experimental data to compute pseudo JV current density 
-        and voltage values for each experimental hash. The results are stored as numpy arrays.
+        This method collects the short-circuit current density and open-circuit voltage of each
+        experimental hash, dropping hashes whose current density is NaN, and the offset applied to
+        the pseudo JV of each hash.
         Attributes:
-            pJV_j (numpy.ndarray): Pseudo JV current density data.
-            pJV_v (numpy.ndarray): Pseudo JV voltage data.
+            jsc (numpy.ndarray): The short-circuit current densities.
+            voc (numpy.ndarray): The open-circuit voltages.
+            offset (numpy.ndarray): The per-hash offsets.
         Raises:
             ValueError: If the input data is not properly formatted or contains inconsistencies.
         Notes:
             - The method assumes that the input data is structured as a dictionary with keys 
               'experiment' and 'hashes', and that JV data is provided for each hash.
         """
-        self.pJV_j = []
-        self.pJV_v = []
-        pj = []
-        pv = []
-        for jv in self.data['experiment']['hashes']:
-            self.pJV_j.append(np.abs(self.data[jv]['jv']['j'][0]))
-            self.pJV_v.append(float(self.data[jv]['sim_info']['voc']))
-        
-        idx = np.argwhere(np.isnan(self.pJV_j))
-        self.pJV_j = np.delete(self.pJV_j, idx)
-        self.pJV_v = np.delete(self.pJV_v, idx)
-
-        self.pJV_j = np.array(self.pJV_j)
-        self.pJV_v = np.array(self.pJV_v)
-
-        self.pJV_j = np.tile(self.pJV_j, (len(self.data['experiment']['hashes']),1))
-        self.pJV_v = np.tile(self.pJV_v, (len(self.data['experiment']['hashes']),1))
-
-        for idx, jv in enumerate(self.data['experiment']['hashes']):
-            self.pJV_j[idx,:] = self.pJV_j[idx,:] + self.data[jv]['jv']['j'][0]
+        hashes = self.data['experiment']['hashes']
+        self.offset = np.array([self.data[jv]['jv']['j'][0] for jv in hashes], dtype=np.float64)
+        keep = ~np.isnan(np.abs(self.offset))
+        self.jsc = np.abs(self.offset)[keep]
+        self.voc = np.asarray(SimInfo(self.data, fields=['voc']).column('voc'))[keep]
+
+    def row(self, idx: int) -> tuple:
+        """
+        Get the pseudo JV of one hash.
+        Args:
+            idx (int): The index of the hash in the experiment.
+        Returns:
+            tuple: The current density and voltage of the pseudo JV.
+        """
+        return self.jsc + self.offset[idx], self.voc
+
+    def rows(self) -> object:
+        """
+        Iterate over the pseudo JV of every hash, in experiment order.
+        Yields:
+            tuple: The current density and voltage of the pseudo JV of each hash.
+        """
+        for idx in range(len(self.offset)):
+            yield self.row(idx)
+
+    @property
+    def pJV_j(self) -> np.ndarray:
+        """
+        Pseudo JV current density data, built as an N x N matrix on access.
+        """
+        return self.jsc[np.newaxis, :] + self.offset[:, np.newaxis]
+
+    @property
+    def pJV_v(self) -> np.ndarray:
+        """
+        Pseudo JV voltage data, as a read-only N x N view of the open-circuit voltages.
+        """
+        return np.broadcast_to(self.voc, (len(self.offset), len(self.voc)))
+
+
+class JV_Metrics:
+    """
+    Class to extract the figures of merit of every JV curve of an experiment at once.
+    Attributes:
+        exp (object): The experiment as given: a file path, a Results object or a dictionary.
+        system (str): The operating system of the platform ('Linux' or 'Windows').
+        data (dict): The experiment dictionary, loaded through the shared cache of load_exp.
+        hashes (list): The hashes of the jobs, one per value of each figure of merit.
+        Voc (numpy.ndarray): The open-circuit voltage of each curve.
+        Jsc (numpy.ndarray): The short-circuit current density of each curve (negative under illumination).
+        FF (numpy.ndarray): The fill factor of each curve.
+        Pmax (numpy.ndarray): The maximum power density of each curve.
+        Vmpp (numpy.ndarray): The voltage at the maximum power point.
+        Jmpp (numpy.ndarray): The current density at the maximum power point.
+        monotone (numpy.ndarray): True where the curve is monotone; the figures of merit of other curves are NaN.
+        disagree (dict): Per sim_info field, True where the extracted value differs from sim_info.
+    """
+    fields = {'voc': 'Voc', 'jsc': 'Jsc', 'ff': 'FF', 'Pmax': 'Pmax', 'v_pmax': 'Vmpp', 'j_pmax': 'Jmpp'}
+
+    def __init__(self, exp: object) -> None:
+        """
+        Initializes the JV_Metrics class.
+        Args:
+            exp (object): The file path to the experiment data, a Results object or an experiment dictionary.
+        """
+        self.exp = exp
+        self.system = platform.system()
+        self.data = load_exp(self.exp)
+
+    def calculate(self, block: int = 8192) -> None:
+        """
+        Extract Voc, Jsc, FF, Pmax, Vmpp and Jmpp from the harvested JV curves.
+        Curves are padded with NaN into blocks of equal length. Jsc and Voc are found by linear
+        interpolation at the zero crossings of the voltage and the current density, and the maximum
+        power point is the sampled point of largest -V*J between them.
+        Args:
+            block (int, optional): The number of curves processed at once, to bound memory. Defaults to 8192.
+        Notes:
+            - Jobs without a JV curve give NaN.
+        """
+        hashes = self.data['experiment']['hashes']
+        self.hashes = list(hashes)
+        out = {name: np.full(len(hashes), np.nan) for name in self.fields.values()}
+        self.monotone = np.zeros(len(hashes), dtype=bool)
+        for start in range(0, len(hashes), block):
+            part = hashes[start:start + block]
+            jvs = [self.data.get(h, {}).get('jv') if h is not None else None for h in part]
+            V = pad([jv['v'] if isinstance(jv, dict) else [] for jv in jvs])
+            J = pad([jv['j'] if isinstance(jv, dict) else [] for jv in jvs])
+            metrics, monotone = jv_metrics(V, J)
+            for name, value in metrics.items():
+                out[name][start:start + block] = value
+            self.monotone[start:start + block] = monotone
+        for name, value in out.items():
+            setattr(self, name, value)
+
+    def cross_check(self, rtol: float = 1e-2) -> dict:
+        """
+        Compare the extracted figures of merit with sim_info.
+        Args:
+            rtol (float, optional): The relative tolerance. Defaults to 1e-2.
+        Returns:
+            dict: Per sim_info field, a boolean array which is True where both values are finite and differ
+                by more than rtol. 'pce' is computed as the extracted Pmax over the incident power of the job,
+                1000 * Psun from the sim.json stored with it, and is not checked for jobs without one.
+        """
+        info = SimInfo(self.data, hashes=self.hashes, fields=list(self.fields) + ['pce'])
+        self.disagree = {}
+        for field, name in self.fields.items():
+            self.disagree[field] = differ(getattr(self, name), info.column(field), rtol)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pce = self.Pmax / self.incident_power() * 100
+        self.disagree['pce'] = differ(pce, info.column('pce'), rtol)
+        return self.disagree
+
+    def incident_power(self) -> np.ndarray:
+        """
+        Get the incident light power density of each job from the sim.json stored with it.
+        Returns:
+            numpy.ndarray: 1000 * optical.light_sources.Psun in W m^-2, NaN where the job has no stored sim.json.
+        """
+        out = np.full(len(self.hashes), np.nan)
+        for row, h in enumerate(self.hashes):
+            sim = self.data.get(h, {}).get('sim') if h is not None else None
+            try:
+                out[row] = 1000 * float(sim['optical']['light_sources']['Psun'])
+            except (KeyError, TypeError, ValueError):
+                pass
+        return out
+
+
+def pad(curves: list) -> np.ndarray:
+    """
+    Stack curves of different lengths into one array, padding with NaN.
+    Args:
+        curves (list): The curves, as lists or arrays.
+    Returns:
+        numpy.ndarray: The curves, shaped (len(curves), longest curve).
+    """
+    lengths = np.array([len(c) for c in curves], dtype=int)
+    out = np.full((len(curves), max(lengths.max(initial=0), 1)), np.nan)
+    out[np.arange(out.shape[1]) < lengths[:, np.newaxis]] = np.fromiter(itertools.chain.from_iterable(curves), dtype=np.float64, count=lengths.sum())
+    return out
+
+
+def interpolate_crossing(x: np.ndarray, y: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """
+    Interpolate, row by row, the value of x where y crosses zero between points k-1 and k.
+    Args:
+        x (numpy.ndarray): The abscissa, shaped (n, m).
+        y (numpy.ndarray): The ordinate, shaped (n, m).
+        k (numpy.ndarray): The index of the first point at or above zero in each row.
+    Returns:
+        numpy.ndarray: The crossing of each row, NaN where y does not cross zero.
+    """
+    rows = np.arange(len(k))
+    inside = (k > 0) & (k < x.shape[1])
+    k0 = np.clip(k - 1, 0, x.shape[1] - 1)
+    k1 = np.clip(k, 0, x.shape[1] - 1)
+    x0, x1 = x[rows, k0], x[rows, k1]
+    y0, y1 = y[rows, k0], y[rows, k1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = np.where(y1 == y0, x0, x0 - y0 * (x1 - x0) / (y1 - y0))
+    crossing = np.where(inside, crossing, np.nan)
+    return np.where((k < x.shape[1]) & (y1 == 0), x1, crossing)
+
+
+def jv_metrics(V: np.ndarray, J: np.ndarray) -> tuple:
+    """
+    Extract the figures of merit of NaN-padded JV curves.
+    Args:
+        V (numpy.ndarray): The voltages, shaped (curves, points), in ascending order.
+        J (numpy.ndarray): The current densities, shaped like V.
+    Returns:
+        tuple: A dictionary of Voc, Jsc, FF, Pmax, Vmpp and Jmpp arrays, and the monotone mask.
+    """
+    valid = ~np.isnan(V) & ~np.isnan(J)
+    dV = np.diff(V, axis=1)
+    dJ = np.diff(J, axis=1)
+    pair = valid[:, 1:] & valid[:, :-1]
+    monotone = np.all(~pair | ((dV > 0) & (dJ >= 0)), axis=1) & (valid.sum(axis=1) > 1)
+
+    Vs = np.where(valid, V, np.inf)
+    Js = np.where(valid, J, np.inf)
+    Jsc = interpolate_crossing(J, V, np.count_nonzero(Vs < 0, axis=1))
+    Voc = interpolate_crossing(V, J, np.count_nonzero(Js < 0, axis=1))
+
+    P = np.where(valid & (V >= 0) & (J <= 0), -V * J, -np.inf)
+    mpp = np.argmax(P, axis=1)
+    rows = np.arange(len(V))
+    Pmax = np.where(np.isfinite(P[rows, mpp]), P[rows, mpp], np.nan)
+    Vmpp = np.where(np.isfinite(Pmax), V[rows, mpp], np.nan)
+    Jmpp = np.where(np.isfinite(Pmax), J[rows, mpp], np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        FF = Pmax / (Voc * np.abs(Jsc))
+
+    metrics = {'Voc': Voc, 'Jsc': Jsc, 'FF': FF, 'Pmax': Pmax, 'Vmpp': Vmpp, 'Jmpp': Jmpp}
+    return {name: np.where(monotone, value, np.nan) for name, value in metrics.items()}, monotone
+
+
+def differ(a: np.ndarray, b: np.ndarray, rtol: float) -> np.ndarray:
+    """
+    Flag values which are both finite and differ by more than a relative tolerance.
+    Args:
+        a (numpy.ndarray): The first values.
+        b (numpy.ndarray): The second values.
+        rtol (float): The relative tolerance.
+    Returns:
+        numpy.ndarray: True where the values disagree.
+    """
+    finite = np.isfinite(a) & np.isfinite(b)
+    with np.errstate(invalid='ignore'):
+        return finite & ~np.isclose(a, b, rtol=rtol, atol=0)
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the batched Transport_Resistance against the per-point loop it replaced, on a synthetic
+    intensity sweep built from the JV curve of the standard device.
+    """
+    import os
+    import sys
+    import time
+    import tempfile
+    import scipy.interpolate as spi
+    from PyOghma.OghmaCSV import read_oghma_csv
+
+    def reference(data, pJV_j, pJV_v):
+        TR_Voc = []
+        for idx,h in enumerate(data['experiment']['hashes']):
+            v = np.asarray(data[h]['jv']['v'])
+            j = np.asarray(data[h]['jv']['j'])
+            pj = np.asarray(pJV_j[idx,:] + j[0])
+            pv = np.asarray(pJV_v[idx,:])
+            jdx = np.argwhere(pj != np.roll(pj, -1)).ravel()
+            if len(jdx) > 0:
+                pv = pv[jdx]
+                pj = pj[jdx]
+            jdx = np.argwhere(j != np.roll(j, -1)).ravel()
+            if len(jdx) > 0:
+                v = v[jdx]
+                j = j[jdx]
+            fjv = spi.PchipInterpolator(j, v)
+            fpjv = spi.PchipInterpolator(pj, pv)
+            x = np.sort(np.append(np.linspace(np.min(pj), np.max(pj), 1000), 0))
+            Vtr = fjv(x) - fpjv(x)
+            DVtr = np.zeros(len(Vtr))
+            for i in range(len(x)):
+                if i == 0 or i == len(x)-1:
+                    DVtr[i] = np.nan
+                else:
+                    kdx = [i-1, i, i+1]
+                    DVtr[i] = np.gradient(Vtr[kdx], x[kdx])[1]
+            TR_Voc.append(DVtr[np.argwhere(x == 0).ravel()[0]])
+        return np.array(TR_Voc)
+
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    device = os.path.join(os.getcwd(), 'standard_device')
+    jv = read_oghma_csv(os.path.join(device, 'jv.csv'))
+    with open(os.path.join(device, 'sim_info.dat'), 'r') as f:
+        sim_info = json.load(f)
+    intensity = np.logspace(-2, 0.5, points)
+    hashes = ['h' + str(n) for n in range(points)]
+    R = Results()
+    R.exp_dict = {'experiment': {'name': os.path.join(tempfile.mkdtemp(), 'bench'), 'dimensions': 1,
+                                 'variable': {'intensity': intensity.tolist()}, 'points': points, 'hashes': hashes}}
+    jsc = float(jv.data[0])
+    for h, I in zip(hashes, intensity):
+        voc = float(sim_info['voc']) + 1.3 * 0.02585 * np.log(I)
+        R.exp_dict[h] = {'sim_info': dict(sim_info, voc=str(voc)),
+                         'jv': {'v': jv.y.tolist(), 'j': (jv.data - jsc + jsc * I).tolist()}}
+    R.save_dict()
+
+    A = Transport_Resistance(R.exp_dict['experiment']['name'] + '.exp')
+    start = time.perf_counter()
+    ref = reference(A.data, A.PJV.pJV_j, A.PJV.pJV_v)
+    t_ref = time.perf_counter() - start
+    start = time.perf_counter()
+    A.calculate()
+    t_new = time.perf_counter() - start
+    assert np.array_equal(ref, A.TR_Voc, equal_nan=True)
+    start = time.perf_counter()
+    A.calculate(method='analytic')
+    t_ana = time.perf_counter() - start
+    print(f'{points} points  loop {t_ref:.3f} s  batched {t_new:.3f} s  x{t_ref / t_new:.1f}  identical  '
+          f'analytic {t_ana:.3f} s  max rel. diff {np.nanmax(np.abs(A.TR_Voc / ref - 1)):.2e}')
+
+    M = JV_Metrics({'experiment': {'hashes': ['standard_device']},
+                    'standard_device': {'sim_info': sim_info, 'jv': {'v': jv.y.tolist(), 'j': jv.data.tolist()}}})
+    M.calculate()
+    print('standard_device', {field: float(getattr(M, name)[0]) for field, name in M.fields.items()},
+          'disagreements', [field for field, flag in M.cross_check().items() if flag.any()])
+    big = dict(R.exp_dict, experiment={'hashes': hashes * 50})
+    M = JV_Metrics(big)
+    start = time.perf_counter()
+    M.calculate()
+    print(f'JV_Metrics on {len(big["experiment"]["hashes"])} curves {time.perf_counter() - start:.3f} s')
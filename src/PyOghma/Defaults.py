@@ -0,0 +1,188 @@
+"""
+This module provides a process-wide registry of the default configurations packaged in PyOghma.Sim_Defaults.
+The package is indexed once, independently of the working directory, and each default is read once and kept
+as text. Every request parses a fresh copy from memory, so components can modify what they are given without
+affecting each other and without resolving paths or touching the disk again. Components of OghmaNano, Sims,
+Optical and ml are declared with the LazyComponent descriptor and are only constructed, and their defaults
+only loaded, when first accessed.
+"""
+
+import sys
+import functools
+import ujson as json
+from importlib import resources
+
+DEFAULTS_PACKAGE = 'PyOghma.Sim_Defaults'
+"""The package holding the default configurations."""
+
+
+@functools.lru_cache(maxsize=None)
+def resource_index() -> dict:
+    """
+    Walk Sim_Defaults once and index every packaged file by its sub-package and name, so that defaults are
+    found with a dictionary lookup instead of resolving packages or scanning the working directory.
+    Returns:
+        dict: Sub-package (e.g. 'Sims.configs.jv') -> {file name -> resource}.
+    """
+    index = {}
+    stack = [(resources.files(DEFAULTS_PACKAGE), '')]
+    while stack:
+        folder, package = stack.pop()
+        for entry in folder.iterdir():
+            if entry.is_dir():
+                if not entry.name.startswith('__'):
+                    stack.append((entry, package + '.' + entry.name if package else entry.name))
+            elif entry.name.endswith('.json'):
+                index.setdefault(package, {})[entry.name] = entry
+    return index
+
+
+def find_resource(package: str, file: str) -> object:
+    """
+    Look up a packaged default in the index.
+    Args:
+        package (str): The sub-package of Sim_Defaults holding the file (e.g. 'Sims.configs.jv').
+        file (str): The name of the file (e.g. 'default.json').
+    Returns:
+        object: The resource, an importlib.resources Traversable.
+    Raises:
+        FileNotFoundError: If the package does not hold the file.
+    """
+    try:
+        return resource_index()[package][file]
+    except KeyError:
+        raise FileNotFoundError('No packaged default ' + file + ' in ' + DEFAULTS_PACKAGE + '.' + package) from None
+
+
+def resource_path(package: str, file: str) -> str:
+    """
+    Get the path of a packaged default.
+    Args:
+        package (str): The sub-package of Sim_Defaults holding the file (e.g. 'Sims.configs.jv').
+        file (str): The name of the file (e.g. 'default.json').
+    Returns:
+        str: The path to the file.
+    """
+    return str(find_resource(package, file))
+
+
+@functools.lru_cache(maxsize=None)
+def read_default(package: str, file: str) -> str:
+    """
+    Read a packaged default once. Later calls return the cached text.
+    Args:
+        package (str): The sub-package of Sim_Defaults holding the file.
+        file (str): The name of the file.
+    Returns:
+        str: The contents of the file.
+    """
+    return find_resource(package, file).read_text()
+
+
+def load_default(package: str, file: str) -> dict:
+    """
+    Get a private copy of a packaged default. Parsing the cached text is as fast as copying a parsed
+    dictionary, and the copy shares nothing with the registry or with other callers.
+    Args:
+        package (str): The sub-package of Sim_Defaults holding the file.
+        file (str): The name of the file.
+    Returns:
+        dict: The parsed JSON data.
+    """
+    return json.loads(read_default(package, file))
+
+
+def preload() -> int:
+    """
+    Read every packaged default into the registry, e.g. before forking worker processes so that they
+    inherit it.
+    Returns:
+        int: The number of defaults in the registry.
+    """
+    for package, files in resource_index().items():
+        for file in files:
+            read_default(package, file)
+    return read_default.cache_info().currsize
+
+
+class LazyComponent:
+    """
+    Descriptor for a component which is constructed on first access and then stored on the instance, so
+    that creating the owner does not load the defaults of components it never uses. A component created
+    after the owner was given a destination directory receives it too.
+    Attributes:
+        factory (str): The name of the class of the component, in the module of the owner.
+        name (str): The attribute name of the component.
+    """
+    def __init__(self, factory: str) -> None:
+        """
+        Initialize the LazyComponent class.
+        Args:
+            factory (str): The name of the class of the component. It is looked up in the module of the owner
+                when first needed, so the class may be defined after the owner.
+        """
+        self.factory = factory
+        self.name = factory
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.module = owner.__module__
+
+    def __get__(self, instance: object, owner: type = None) -> object:
+        if instance is None:
+            return self
+        component = getattr(sys.modules[self.module], self.factory)()
+        dest_dir = instance.__dict__.get('dest_dir')
+        if dest_dir:
+            component.dest_dir = dest_dir
+        instance.__dict__[self.name] = component
+        return component
+
+
+def constructed(obj: object) -> list:
+    """
+    Get the lazy components of an object which have been constructed.
+    Args:
+        obj (object): The owner of the components.
+    Returns:
+        list: Tuples of (name, component).
+    """
+    names = [name for cls in type(obj).__mro__ for name, value in vars(cls).items() if isinstance(value, LazyComponent)]
+    return [(name, obj.__dict__[name]) for name in dict.fromkeys(names) if name in obj.__dict__]
+
+
+def propagate(obj: object, dest_dir: str, names: tuple = None) -> None:
+    """
+    Set the destination directory of an object and of its constructed components. Components constructed
+    later receive it from the object when they are created.
+    Args:
+        obj (object): The object.
+        dest_dir (str): The destination directory.
+        names (tuple): The components to update. Defaults to every constructed component.
+    """
+    obj.dest_dir = dest_dir
+    for name, component in constructed(obj):
+        if names is None or name in names:
+            propagate(component, dest_dir)
+
+
+if __name__ == '__main__':
+    """
+    Benchmark constructing OghmaNano objects, as done once per worker or per clone.
+    """
+    import time
+    from PyOghma.OghmaNano import OghmaNano
+
+    start = time.perf_counter()
+    count = preload()
+    print(f'preloaded {count} defaults in {(time.perf_counter() - start) * 1e3:.1f} ms')
+
+    for label, touch in (('OghmaNano()', False), ('OghmaNano() and every component', True)):
+        start = time.perf_counter()
+        for _ in range(1000):
+            A = OghmaNano()
+            if touch:
+                A.Optical.Light, A.Optical.LightSource, A.Thermal, A.ML.ml_config
+                for name in ('JV', 'SunsVoc', 'SunsJsc', 'CELIV', 'PhotoCELIV', 'TPC', 'TPV', 'IMPS', 'IMVS', 'IS', 'CV', 'CE', 'PL_SS'):
+                    getattr(A.Sims, name)
+        print(f'{label:<34} {time.perf_counter() - start:8.3f} ms per object')
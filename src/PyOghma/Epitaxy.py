@@ -5,8 +5,13 @@ setting layer thickness, configuring DOS parameters, and enabling or disabling s
 for simulations.
 """
 import os
-import secrets
+import functools
 import ujson as json
+import numpy as np
+
+from .Defaults import load_default, resource_path
+from .Identifiers import new_id
+from .SimFile import read_sim, write_sim
 
 class Epitaxy:
     """
@@ -40,9 +45,7 @@ class Epitaxy:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Epitaxy.' + self.json_name, file + '.json')
 
     def find_file(self, file: str) -> str:
         """
@@ -54,10 +57,9 @@ class Epitaxy:
         Returns:
             str: The path to the found JSON file.
         """
-        config_dir = os.path.join('*', 'configs', self.json_name, file)
-        filename = glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Epitaxy.' + self.json_name, file)
+        self.loaded_filename = filename
+        return filename
 
     def set_format(self) -> None:
         """
@@ -81,8 +83,7 @@ class Epitaxy:
         Returns:
             None
         """
-        with open(os.path.join(self.dest_dir,'sim.json'), 'w') as j:
-            j.write(json.dumps(self.data, indent=4))
+        write_sim(self.dest_dir, self.data)
         return
     
     def load_existing(self) -> None:
@@ -95,8 +96,7 @@ class Epitaxy:
         Returns:
             None
         """
-        with open(os.path.join(self.dest_dir,'sim.json'), 'r') as j:
-            self.data = json.load(j)
+        self.data = read_sim(self.dest_dir)
         
         num_layers = self.data['epitaxy']['segments']
         for idx in range(num_layers):
@@ -131,7 +131,7 @@ class Layer(Epitaxy):
         super(Epitaxy, self).__init__()
         self.layer_data = layer
         self.name = self.layer_data['name']
-        self.layer_data['id'] = 'id' + str(secrets.token_hex(8))
+        self.layer_data['id'] = new_id('Layer/' + self.name)
         self.dos = DOS()
         self.dos.set_dos(self.layer_data)
 
@@ -527,6 +527,202 @@ class DOS:
 
 
 
+DOS_FIELDS = {
+    'mobility': ('mue_y', 'muh_y'),
+    'free_states_density': ('Nc', 'Nv'),
+    'trap_density': ('Ntrape', 'Ntraph'),
+    'urbach_energy': ('Etrape', 'Etraph'),
+    'free_to_trap': ('srhsigman_e', 'srhsigmap_h'),
+    'trap_to_free': ('srhsigmap_e', 'srhsigman_h'),
+    'Xi': ('Xi',),
+    'Eg': ('Eg',),
+    'relative_permittivity': ('epsilonr',),
+}
+"""Parameters set in the shape_dos of a layer: name -> the keys for (electrons, holes), or a single key."""
+
+LAYER_FIELDS = {
+    'thickness': ('dx',),
+}
+"""Parameters set on the layer itself: name -> key."""
+
+CARRIERS = {'electrons': (0,), 'holes': (1,), 'both': (0, 1)}
+"""The carriers selected by each choice, as positions in the keys of DOS_FIELDS."""
+
+
+class EpitaxyBatch:
+    """
+    Applies layer and DOS parameters to many clones at once. The source sim.json is parsed once, each sweep point
+    only copies the parts of the epitaxy which change, and the clones are written in parallel, replacing only
+    their epitaxy.
+
+    Attributes:
+        data (dict): The parsed sim.json of the source simulation.
+        layers (list): The names of the layers, as used by Epitaxy.load_existing.
+        edits (list): Tuples of (layer index, section, key, values), values holding one entry per point or one in all.
+        points (int): The number of sweep points.
+    """
+    def __init__(self, src_dir: str) -> None:
+        """
+        Initializes the EpitaxyBatch class.
+
+        Args:
+            src_dir (str): The directory of the source simulation.
+        """
+        self.data = read_sim(src_dir)
+        epitaxy = self.data['epitaxy']
+        self.layers = [epitaxy['segment' + str(idx)]['name'].lower().replace(':', '') for idx in range(epitaxy['segments'])]
+        self.edits = []
+        self.points = 1
+
+    def layer_index(self, layers: object = None) -> list:
+        """
+        Finds the indices of layers.
+
+        Args:
+            layers (object): A layer name or index, a list of them, or None for every layer.
+
+        Returns:
+            list: The layer indices.
+
+        Raises:
+            KeyError: If a layer is not in the epitaxy.
+        """
+        if layers is None:
+            return list(range(len(self.layers)))
+        if isinstance(layers, (str, int)):
+            layers = [layers]
+        out = []
+        for layer in layers:
+            if isinstance(layer, str):
+                name = layer.lower().replace(':', '')
+                if name not in self.layers:
+                    raise KeyError('Layer not in the epitaxy: ' + layer)
+                out.append(self.layers.index(name))
+            else:
+                out.append(int(layer))
+        return out
+
+    def set(self, parameter: str, values: object, layers: object = None, carriers: str = 'both') -> 'EpitaxyBatch':
+        """
+        Sets a parameter for every sweep point. Values broadcast over points, layers and carriers: a scalar is used
+        everywhere, shape (points,) gives one value per point, (points, layers) one per point and layer, and
+        (points, layers, carriers) one per point, layer and carrier. An axis of length 1 is repeated.
+
+        Args:
+            parameter (str): A key of DOS_FIELDS or LAYER_FIELDS (e.g. 'mobility', 'trap_density', 'thickness').
+            values (object): The values.
+            layers (object): A layer name or index, a list of them, or None for every layer.
+            carriers (str): The carriers ('electrons', 'holes', 'both'), for parameters which have one key per carrier.
+
+        Returns:
+            EpitaxyBatch: The batch.
+
+        Raises:
+            ValueError: If the parameter or carriers are not supported, or the number of points differs from earlier calls.
+        """
+        if parameter in DOS_FIELDS:
+            section, keys = 'shape_dos', DOS_FIELDS[parameter]
+        elif parameter in LAYER_FIELDS:
+            section, keys = None, LAYER_FIELDS[parameter]
+        else:
+            raise ValueError('Unsupported parameter: ' + str(parameter))
+        if len(keys) == 2:
+            if carriers.lower() not in CARRIERS:
+                raise ValueError('Unsupported carrier type: ' + str(carriers))
+            keys = tuple(keys[k] for k in CARRIERS[carriers.lower()])
+        index = self.layer_index(layers)
+
+        values = np.asarray(values, dtype=float)
+        values = values.reshape(values.shape + (1,) * (3 - values.ndim)) if values.ndim <= 3 else values
+        values = np.broadcast_to(values, (values.shape[0], len(index), len(keys)))
+        if values.shape[0] != 1:
+            if self.points != 1 and values.shape[0] != self.points:
+                raise ValueError('Expected ' + str(self.points) + ' points, got ' + str(values.shape[0]))
+            self.points = values.shape[0]
+        for i, layer in enumerate(index):
+            for k, key in enumerate(keys):
+                self.edits.append((layer, section, key, values[:, i, k].tolist()))
+        return self
+
+    def epitaxy(self, point: int) -> dict:
+        """
+        Computes the epitaxy of a sweep point. Layers and sections which are not edited are shared with the source.
+
+        Args:
+            point (int): The sweep point.
+
+        Returns:
+            dict: The epitaxy subtree of sim.json.
+        """
+        epitaxy = dict(self.data['epitaxy'])
+        for layer, section, key, values in self.edits:
+            name = 'segment' + str(layer)
+            if epitaxy[name] is self.data['epitaxy'][name]:
+                epitaxy[name] = dict(epitaxy[name])
+            target = epitaxy[name]
+            if section is not None:
+                if target[section] is self.data['epitaxy'][name][section]:
+                    target[section] = dict(target[section])
+                target = target[section]
+            target[key] = values[point if len(values) > 1 else 0]
+        return epitaxy
+
+    def write(self, dest_dirs: list, processes: int = None, fresh: bool = False, archive: str = None) -> None:
+        """
+        Writes the epitaxy of each sweep point into the sim.json of a clone, in a process pool. Clones holding
+        their sim.json in an archive are updated in the archive.
+
+        Args:
+            dest_dirs (list): The clone directories, one per point.
+            processes (int): The size of the pool. Defaults to os.cpu_count(); 1 writes in this process.
+            fresh (bool): Whether the clones are unmodified copies of the source. Their sim.json is then written
+                from the source without being read, and only the epitaxy is serialised per clone.
+            archive (str): The name of an archive (e.g. 'sim.oghma') to write sim.json into.
+
+        Raises:
+            ValueError: If the number of directories differs from the number of points.
+        """
+        if len(dest_dirs) != self.points:
+            raise ValueError('Expected ' + str(self.points) + ' directories, got ' + str(len(dest_dirs)))
+        template = None
+        if fresh:
+            text = json.dumps(dict(self.data, epitaxy=EPITAXY_MARKER), indent=4)
+            template = tuple(text.split(json.dumps(EPITAXY_MARKER), 1))
+        tasks = [(dest_dir, self.epitaxy(point)) for point, dest_dir in enumerate(dest_dirs)]
+        worker = functools.partial(write_epitaxy, template=template, archive=archive)
+        processes = processes or os.cpu_count()
+        if processes == 1 or len(tasks) == 1:
+            for task in tasks:
+                worker(task)
+            return
+        import multiprocessing as mp
+        with mp.Pool(processes) as pool:
+            pool.map(worker, tasks, chunksize=max(1, len(tasks) // (4 * processes)))
+
+
+EPITAXY_MARKER = '@@epitaxy@@'
+"""Placeholder for the epitaxy when a sim.json is serialised once for fresh clones."""
+
+
+def write_epitaxy(task: tuple, template: tuple = None, archive: str = None) -> None:
+    """
+    Replaces the epitaxy of the sim.json of a simulation.
+
+    Args:
+        task (tuple): The simulation directory and the epitaxy subtree.
+        template (tuple): The serialised sim.json before and after the epitaxy. If None, the sim.json is read and
+            only its epitaxy is replaced.
+        archive (str): The name of an archive to write sim.json into, as in SimFile.write_sim.
+    """
+    dest_dir, epitaxy = task
+    if template is None:
+        data = read_sim(dest_dir)
+        data['epitaxy'] = epitaxy
+        text = json.dumps(data, indent=4)
+    else:
+        text = template[0] + json.dumps(epitaxy, indent=4).replace('\n', '\n    ') + template[1]
+    write_sim(dest_dir, text, archive)
+
 
 if __name__ == '__main__':
 
@@ -0,0 +1,399 @@
+"""
+This module provides a chunked container for experiment files. The experiment dictionary is split into the
+experiment metadata and groups of jobs, and each group is compressed independently, so chunks can be
+compressed and decompressed in parallel and a single job can be read without decompressing the whole file.
+A JSON index at the end of the file records where each chunk lies and which keys it holds.
+
+Layout:
+    MAGIC | chunk 0 | chunk 1 | ... | index (JSON) | index offset (8 bytes) | index length (8 bytes) | MAGIC
+"""
+
+import os
+import zlib
+import struct
+import ujson as json
+from concurrent.futures import ThreadPoolExecutor
+
+MAGIC = b'OGHMAEXP'
+"""Bytes written at the start and end of a chunked experiment file."""
+
+FOOTER = struct.Struct('<QQ')
+"""The index offset and length written before the closing MAGIC."""
+
+CODECS = {
+    'gzip': (lambda data, level: zlib.compress(data, level), zlib.decompress, 6),
+}
+"""Registered codecs: name -> (compress(data, level), decompress(data), default level)."""
+
+try:
+    import zstandard
+    CODECS['zstd'] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+                      lambda data: zstandard.ZstdDecompressor().decompress(data), 3)
+except ImportError:
+    pass
+
+try:
+    import lz4.frame
+    CODECS['lz4'] = (lambda data, level: lz4.frame.compress(data, compression_level=level), lz4.frame.decompress, 0)
+except ImportError:
+    pass
+
+
+def default_codec() -> str:
+    """
+    Get the fastest codec available.
+    Returns:
+        str: 'zstd' if zstandard is installed, otherwise 'gzip'.
+    """
+    return 'zstd' if 'zstd' in CODECS else 'gzip'
+
+
+def is_chunked(file: str) -> bool:
+    """
+    Check whether a file is a chunked experiment file.
+    Args:
+        file (str): The path to the file.
+    Returns:
+        bool: True if the file starts with MAGIC.
+    """
+    with open(file, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class ExpStore:
+    """
+    Class to read and write chunked experiment files.
+    Attributes:
+        file (str): The path to the file.
+        codec (str): The name of the codec used for the chunks.
+        level (int): The compression level.
+        chunk_jobs (int): The number of jobs stored in each chunk.
+        workers (int): The number of threads used to compress and decompress chunks.
+        max_dead (float): The fraction of the file which may be left unreferenced by appends (old indexes and
+            replaced chunks) before append compacts it.
+        index (dict): The index of the file: the codec, the chunk positions and the chunk holding each key.
+    """
+    def __init__(self, file: str, codec: str = None, level: int = None, chunk_jobs: int = 64, workers: int = None,
+                 max_dead: float = 0.5) -> None:
+        """
+        Initialize the ExpStore class.
+        Args:
+            file (str): The path to the file.
+            codec (str): The codec used when writing. Defaults to the codec of an existing file, or default_codec().
+            level (int): The compression level. Defaults to the level registered with the codec.
+            chunk_jobs (int): The number of jobs stored in each chunk.
+            workers (int): The number of threads. Defaults to os.cpu_count().
+            max_dead (float): The fraction of unreferenced bytes above which append compacts the file.
+        Raises:
+            ValueError: If the codec is not registered.
+        """
+        self.file = file
+        self.index = None
+        self.chunk_jobs = chunk_jobs
+        self.workers = workers or os.cpu_count()
+        self.max_dead = max_dead
+        if codec is None and os.path.isfile(file) and is_chunked(file):
+            codec = self.read_index()['codec']
+        self.codec = codec or default_codec()
+        if self.codec not in CODECS:
+            raise ValueError('Codec not available: ' + str(self.codec))
+        self.level = level if level is not None else CODECS[self.codec][2]
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress a chunk with the codec of the store.
+        Args:
+            data (bytes): The raw chunk.
+        Returns:
+            bytes: The compressed chunk.
+        """
+        return CODECS[self.codec][0](data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress a chunk with the codec of the store.
+        Args:
+            data (bytes): The compressed chunk.
+        Returns:
+            bytes: The raw chunk.
+        """
+        return CODECS[self.codec][1](data)
+
+    def group(self, exp_dict: dict, keys: list) -> list:
+        """
+        Split keys of an experiment dictionary into the raw chunks to be written.
+        Args:
+            exp_dict (dict): The experiment dictionary.
+            keys (list): The keys to write.
+        Returns:
+            list: Tuples of (keys, raw JSON bytes), one per chunk.
+        """
+        chunks = []
+        if 'experiment' in keys:
+            chunks.append((['experiment'], json.dumps({'experiment': exp_dict['experiment']}).encode()))
+        jobs = [key for key in keys if key != 'experiment']
+        for start in range(0, len(jobs), self.chunk_jobs):
+            part = jobs[start:start + self.chunk_jobs]
+            chunks.append((part, json.dumps({key: exp_dict[key] for key in part}).encode()))
+        return chunks
+
+    def write(self, exp_dict: dict) -> None:
+        """
+        Write a whole experiment dictionary, replacing the file.
+        Args:
+            exp_dict (dict): The experiment dictionary.
+        """
+        self.index = {'codec': self.codec, 'chunks': [], 'keys': {}}
+        with open(self.file, 'wb') as f:
+            f.write(MAGIC)
+            self.write_chunks(f, exp_dict, list(exp_dict.keys()))
+            self.write_index(f)
+
+    def append(self, exp_dict: dict, keys: list, drop: list = None) -> None:
+        """
+        Add or replace keys of an existing file. New chunks and a new index are written after the current footer,
+        so the stored chunks are not rewritten and the old index stays valid until the new footer is complete. If
+        writing fails, the file is cut back to its previous end. Once more than max_dead of the file is left
+        unreferenced, the file is compacted, so repeated appends grow it in proportion to the data it holds.
+        Args:
+            exp_dict (dict): The experiment dictionary holding the keys.
+            keys (list): The keys to write, usually 'experiment' and the hashes of new jobs.
+            drop (list): Keys to remove from the index, e.g. the hashes of replaced jobs. Their chunks count as
+                dead once no other key refers to them.
+        Raises:
+            ValueError: If the codec of the store differs from the codec of the file.
+        """
+        if not os.path.isfile(self.file):
+            return self.write(exp_dict)
+        codec = self.read_index()['codec']
+        if codec != self.codec:
+            raise ValueError('Cannot append ' + self.codec + ' chunks to ' + str(self.file) + ', written with ' + codec)
+        for key in drop or []:
+            self.index['keys'].pop(key, None)
+        with open(self.file, 'r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            try:
+                self.write_chunks(f, exp_dict, keys)
+                self.write_index(f)
+            except BaseException:
+                f.truncate(end)
+                self.index = None
+                raise
+            size = f.tell()
+        if self.dead_bytes(size) > self.max_dead * size:
+            self.compact()
+
+    def live_chunks(self) -> list:
+        """
+        Get the chunks which hold at least one key of the index.
+        Returns:
+            list: The numbers of the chunks, in order.
+        """
+        return sorted(set(self.index['keys'].values()))
+
+    def dead_bytes(self, size: int) -> int:
+        """
+        Count the bytes of the file no longer referenced by the index: earlier indexes and replaced chunks.
+        Args:
+            size (int): The size of the file.
+        Returns:
+            int: The number of bytes.
+        """
+        live = sum(self.index['chunks'][chunk][1] for chunk in self.live_chunks())
+        return size - live - (size - self.index['offset']) - len(MAGIC)
+
+    def compact(self) -> None:
+        """
+        Rewrite the file with only the chunks the index refers to, copying them without recompressing. The file
+        is written beside the original and replaces it atomically.
+        """
+        if self.index is None:
+            self.read_index()
+        chunks = self.live_chunks()
+        renumber = {chunk: n for n, chunk in enumerate(chunks)}
+        index = {'codec': self.index['codec'], 'chunks': [],
+                 'keys': {key: renumber[chunk] for key, chunk in self.index['keys'].items()}}
+        with open(self.file, 'rb') as src, open(self.file + '.tmp', 'wb') as f:
+            f.write(MAGIC)
+            for chunk in chunks:
+                offset, length, raw = self.index['chunks'][chunk]
+                src.seek(offset)
+                index['chunks'].append([f.tell(), length, raw])
+                f.write(src.read(length))
+            self.index = index
+            self.write_index(f)
+        os.replace(self.file + '.tmp', self.file)
+
+    def write_chunks(self, f: object, exp_dict: dict, keys: list) -> None:
+        """
+        Compress chunks in parallel and write them at the current position of a file.
+        Args:
+            f (object): The file, opened in binary mode.
+            exp_dict (dict): The experiment dictionary.
+            keys (list): The keys to write.
+        """
+        chunks = self.group(exp_dict, keys)
+        with ThreadPoolExecutor(self.workers) as pool:
+            compressed = pool.map(self.compress, [raw for _, raw in chunks])
+            for (part, raw), data in zip(chunks, compressed):
+                chunk = len(self.index['chunks'])
+                self.index['chunks'].append([f.tell(), len(data), len(raw)])
+                for key in part:
+                    self.index['keys'][key] = chunk
+                f.write(data)
+
+    def write_index(self, f: object) -> None:
+        """
+        Write the index and footer at the current position of a file.
+        Args:
+            f (object): The file, opened in binary mode.
+        """
+        offset = f.tell()
+        data = json.dumps({key: value for key, value in self.index.items() if key != 'offset'}).encode()
+        f.write(data)
+        f.write(FOOTER.pack(offset, len(data)))
+        f.write(MAGIC)
+        self.index['offset'] = offset
+
+    def read_index(self) -> dict:
+        """
+        Read the index of the file. If the file ends in an incomplete append, the last complete index before it
+        is read.
+        Returns:
+            dict: The index.
+        Raises:
+            ValueError: If the file is not a chunked experiment file or holds no complete index.
+        """
+        with open(self.file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('Not a chunked experiment file: ' + str(self.file))
+            end = f.seek(0, os.SEEK_END)
+            found = self.find_index(f, end)
+            if found is None:
+                f.seek(0)
+                data = f.read()
+                end = data.rfind(MAGIC)
+                while found is None and end > len(MAGIC):
+                    found = self.find_index(f, end + len(MAGIC))
+                    end = data.rfind(MAGIC, 0, end)
+            if found is None:
+                raise ValueError('No complete index in ' + str(self.file))
+        self.index, offset = found
+        self.index['offset'] = offset
+        return self.index
+
+    @staticmethod
+    def find_index(f: object, end: int) -> tuple:
+        """
+        Read the index whose footer ends at a position of a file.
+        Args:
+            f (object): The file, opened in binary mode.
+            end (int): The position just after the closing MAGIC.
+        Returns:
+            tuple: The index and its offset, or None if no complete index ends there.
+        """
+        start = end - FOOTER.size - len(MAGIC)
+        if start < len(MAGIC):
+            return None
+        f.seek(start)
+        footer = f.read(FOOTER.size + len(MAGIC))
+        if footer[FOOTER.size:] != MAGIC:
+            return None
+        offset, length = FOOTER.unpack(footer[:FOOTER.size])
+        if offset < len(MAGIC) or offset + length != start:
+            return None
+        f.seek(offset)
+        try:
+            return json.loads(f.read(length)), offset
+        except ValueError:
+            return None
+
+    def keys(self) -> list:
+        """
+        Get the keys held by the file.
+        Returns:
+            list: The keys, 'experiment' followed by the job hashes.
+        """
+        if self.index is None:
+            self.read_index()
+        return list(self.index['keys'].keys())
+
+    def read(self, keys: list = None) -> dict:
+        """
+        Read keys from the file, decompressing only the chunks which hold them.
+        Args:
+            keys (list): The keys to read. Defaults to every key.
+        Returns:
+            dict: The requested part of the experiment dictionary.
+        Raises:
+            KeyError: If a key is not in the file.
+        """
+        if self.index is None:
+            self.read_index()
+        if keys is None:
+            keys = self.keys()
+        chunks = sorted({self.index['keys'][key] for key in keys})
+        with open(self.file, 'rb') as f:
+            data = []
+            for chunk in chunks:
+                offset, length, _ = self.index['chunks'][chunk]
+                f.seek(offset)
+                data.append(f.read(length))
+
+        out = {}
+        with ThreadPoolExecutor(self.workers) as pool:
+            for raw in pool.map(lambda d: json.loads(self.decompress(d)), data):
+                out.update(raw)
+        return {key: out[key] for key in keys}
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the chunked store against the mgzip stream written by Results.save_dict before.
+    """
+    import sys
+    import time
+    import mgzip
+    import secrets
+    import numpy as np
+
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    device = os.path.join(os.getcwd(), 'standard_device')
+    with open(os.path.join(device, 'sim_info.dat'), 'r') as f:
+        sim_info = json.load(f)
+    v = np.loadtxt(os.path.join(device, 'jv.csv'), comments='#')
+    rng = np.random.default_rng(0)
+    hashes = [secrets.token_urlsafe(8) for _ in range(jobs)]
+    exp_dict = {'experiment': {'name': 'bench', 'dimensions': 1, 'variable': {'intensity': list(range(jobs))},
+                               'points': jobs, 'hashes': hashes}}
+    for h in hashes:
+        exp_dict[h] = {'sim_info': sim_info, 'jv': {'v': v[:, 0].tolist(), 'j': (v[:, 1] * rng.uniform(0.5, 1.5)).tolist()}}
+    raw = len(json.dumps(exp_dict, indent=4))
+
+    def timed(fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    def mgzip_write():
+        with mgzip.open('bench_mgzip.exp', 'wt+') as j:
+            json.dump(exp_dict, j, indent=4)
+
+    def mgzip_read():
+        with mgzip.open('bench_mgzip.exp', 'r') as j:
+            json.load(j)
+
+    rows = [('mgzip', timed(mgzip_write), timed(mgzip_read), None, os.path.getsize('bench_mgzip.exp'))]
+    for codec in CODECS:
+        store = ExpStore('bench_' + codec + '.exp', codec=codec)
+        one = hashes[jobs // 2]
+        rows.append((codec, timed(lambda: store.write(exp_dict)), timed(store.read), timed(lambda: ExpStore(store.file).read([one])),
+                     os.path.getsize(store.file)))
+        assert store.read() == json.loads(json.dumps(exp_dict))
+
+    print(f'{jobs} jobs, {raw / 1e6:.1f} MB of JSON')
+    for name, write, read, one, size in rows:
+        single = f'{one * 1e3:8.2f} ms' if one is not None else '       -   '
+        print(f'{name:<6} write {write:6.3f} s  read {read:6.3f} s  one job {single}  ratio {raw / size:5.1f}')
+    for name, *_ in rows:
+        os.remove('bench_' + name + '.exp')
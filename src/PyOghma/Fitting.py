@@ -4,11 +4,13 @@ variables, rules, and datasets. It supports creating, modifying, and saving fitt
 and settings, as well as handling data import and export for simulations.
 """
 import os
-import glob
-import secrets
 import json
 import numpy as np 
-import pandas as pd
+
+from .Defaults import load_default, resource_path
+from .Identifiers import new_id, token_hex
+from .PathIndex import path_index, resolve_param
+from .SimFile import update_sim
 
 
 class Fitting:
@@ -58,9 +60,7 @@ class Fitting:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.' + self.json_name, file + '.json')
 
     def find_file(self, file: str) -> str:
         """
@@ -70,10 +70,9 @@ class Fitting:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','*','*', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.' + self.json_name, file)
+        self.loaded_filename = filename
+        return filename
 
     def set_format(self) -> None:
         """
@@ -95,14 +94,7 @@ class Fitting:
         """
         Update the JSON file with the current data.
         """
-        with open(os.path.join(self.dest_dir,'sim.json'), "r") as j:
-            data = json.load(j)
-
-        data['fits'].update(self.json_format)
-
-
-        with open(os.path.join(self.dest_dir,'sim.json'), "w") as j:
-            j.write(json.dumps(data, indent=4))
+        update_sim(self.dest_dir, self.json_format, 'fits')
 
         return
 
@@ -156,7 +148,7 @@ class Duplicate(Fitting):
         super(Fitting, self).__init__()
         self.json_name = 'duplicate'
         self.data = {}
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.data['segments'] = 0
         self.set_format()
     
@@ -167,7 +159,7 @@ class Duplicate(Fitting):
             *duplications: Variable-length list of duplication objects.
         """
         self.segments = len(duplications)
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.data = {'segments': self.segments}
         for idx, duplication in enumerate(duplications): 
             self.data.update({'segment' + str(idx): duplication.data})
@@ -194,9 +186,9 @@ class Dupe:
         self.dest_dir = dest_dir
         self.json_name = 'duplicate'
         self.data = self.load_config('default')
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
-        with open(os.path.join(self.dest_dir,'sim.json'), "r") as j:
-            self.ob = json.load(j)
+        self.data['id'] = new_id(type(self).__name__)
+        self.index = path_index(self.dest_dir)
+        self.ob = self.index.sim
     
     def find_file(self, file: str) -> str:
         """
@@ -206,10 +198,9 @@ class Dupe:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','Sim_Defaults','Fits', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.duplicate', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -219,26 +210,22 @@ class Dupe:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.duplicate', file + '.json')
     
         
     def set_duplication(self, src: str, dest: str, multiplier: str = 'x') -> None:
         """
         Set the duplication parameters.
         Args:
-            src (str): The source path.
-            dest (str): The destination path.
+            src (str): The source parameter: a key, partial path, full path or human readable path.
+            dest (str): The destination parameter.
             multiplier (str): The duplication multiplier.
         """
-        json_src = src
-        json_dest = dest
-        self.data['human_src'] = json_src
-        self.data['human_dest'] = json_dest
+        self.data['human_src'] = self.index.human_path(src)
+        self.data['human_dest'] = self.index.human_path(dest)
         self.data['multiplier'] = multiplier
-        self.data['json_src'] = json_src
-        self.data['json_dest'] = json_dest
+        self.data['json_src'] = self.index.json_path(src, '/')
+        self.data['json_dest'] = self.index.json_path(dest, '/')
 
 
 
@@ -292,9 +279,9 @@ class Variable:
         self.dest_dir = dest_dir
         self.json_name = 'vars'
         self.data = self.load_config('default')
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
-        with open(os.path.join(self.dest_dir,'sim.json'), "r") as j:
-            self.ob = json.load(j)
+        self.data['id'] = new_id(type(self).__name__)
+        self.index = path_index(self.dest_dir)
+        self.ob = self.index.sim
 
     def find_file(self, file: str) -> str:
         """
@@ -304,10 +291,9 @@ class Variable:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','Sim_Defaults','Fits', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.vars', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -317,36 +303,27 @@ class Variable:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.vars', file + '.json')
         
-    def get_path_from_dict(self, ob: dict, base_path: str = '', base_name: str = '', path: str = '') -> str:
+    def get_path_from_dict(self, base_name: str, sep: str = '/') -> str:
         """
-        Get the path from a dictionary based on the base name.
+        Get the full JSON path of a parameter of sim.json from the index of the simulation.
         Args:
-            ob (dict): The dictionary object.
-            base_path (str): The base path.
-            base_name (str): The base name to search for.
-            path (str): The current path.
+            base_name (str): The key, partial path, full path or human readable path of the parameter.
+            sep (str): The separator of the returned path.
         Returns:
-            str: The constructed path.
+            str: The full path, e.g. 'epitaxy/layer2/shape_dos/mue_y'.
+        Raises:
+            KeyError: If no parameter, or more than one, matches the name.
         """
-        if ob and base_name in list(ob.keys()):
-            path = f"{base_path}{path}/{base_name}"
-            return path
-        elif not ob:
-            pass
-        else:
-            for key, value in sorted(ob.items()):
-                return self.get_path_from_dict(base_path, base_name, value, f'{path}/{key}')
+        return self.index.json_path(base_name, sep)
     
     def set_variable(self, state: bool = True, param: str = '', min: float = 0, max: float = 100, log_fit: bool = False) -> None:
         """
         Set the variable parameters.
         Args:
             state (bool): Whether the variable is enabled.
-            param (str): The parameter name.
+            param (str): The parameter: a key, partial path (e.g. 'PM6:Y6/mue_y'), full path or human readable path.
             min (float): The minimum value.
             max (float): The maximum value.
             log_fit (bool): Whether to use logarithmic fitting.
@@ -357,10 +334,8 @@ class Variable:
             self.data['fit_var_enabled'] = 'False'
             return
         
-        var = param
-        
-        self.data['human_var'] = var
-        self.data['json_var'] = var
+        self.data['human_var'] = self.index.human_path(param)
+        self.data['json_var'] = self.get_path_from_dict(param)
 
         self.data['min'] =  min
         self.data['max'] = max
@@ -419,9 +394,9 @@ class Rule:
         self.dest_dir = dest_dir
         self.json_name = 'rules'
         self.data = self.load_config('default')
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
-        with open(os.path.join(self.dest_dir,'sim.json'), "r") as j:
-            self.ob = json.load(j)
+        self.data['id'] = new_id(type(self).__name__)
+        self.index = path_index(self.dest_dir)
+        self.ob = self.index.sim
 
     def find_file(self, file: str) -> str:
         """
@@ -431,10 +406,9 @@ class Rule:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','*','*', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.rules', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -444,37 +418,28 @@ class Rule:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.rules', file + '.json')
         
-    def get_path_from_dict(self, ob: dict, base_path: str = '', base_name: str = '', path: str = '') -> str:
+    def get_path_from_dict(self, base_name: str, sep: str = '/') -> str:
         """
-        Get the path from a dictionary based on the base name.
+        Get the full JSON path of a parameter of sim.json from the index of the simulation.
         Args:
-            ob (dict): The dictionary object.
-            base_path (str): The base path.
-            base_name (str): The base name to search for.
-            path (str): The current path.
+            base_name (str): The key, partial path, full path or human readable path of the parameter.
+            sep (str): The separator of the returned path.
         Returns:
-            str: The constructed path.
+            str: The full path, e.g. 'epitaxy/layer2/shape_dos/mue_y'.
+        Raises:
+            KeyError: If no parameter, or more than one, matches the name.
         """
-        if ob and base_name in list(ob.keys()):
-            path = f"{base_path}{path}/{base_name}"
-            return path
-        elif not ob:
-            pass
-        else:
-            for key, value in sorted(ob.items()):
-                return self.get_path_from_dict(base_path, base_name, value, f'{path}/{key}')
+        return self.index.json_path(base_name, sep)
     
     def set_rule(self, state: bool = True, param_x: str = '', param_y: str = '', funciton: str = '') -> None:
         """
         Set the rule parameters.
         Args:
             state (bool): Whether the rule is enabled.
-            param_x (str): The x parameter name.
-            param_y (str): The y parameter name.
+            param_x (str): The x parameter: a key, partial path, full path or human readable path.
+            param_y (str): The y parameter.
             funciton (str): The function to apply.
         """
         if state:
@@ -483,14 +448,11 @@ class Rule:
             self.data['fit_rule_enabled'] = 'False'
             return
 
-        x = self.get_path_from_dict(base_name=param_x)
-        y = self.get_path_from_dict(base_name=param_y)
-
-        self.data['json_x'] = x
-        self.data['json_y'] = y
+        self.data['json_x'] = self.get_path_from_dict(param_x)
+        self.data['json_y'] = self.get_path_from_dict(param_y)
 
-        self.data['human_x'] = x
-        self.data['human_y'] = y
+        self.data['human_x'] = self.index.human_path(param_x)
+        self.data['human_y'] = self.index.human_path(param_y)
 
         self.data['function'] = funciton
         
@@ -550,13 +512,13 @@ class Dataset:
         for idx, fitpatch in enumerate(fitpathces): 
             self.data['fit_patch'].update({'segment' + str(idx): fitpatch.data})
         self.data['duplicate'] = {}
-        self.data['duplicate']['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['duplicate']['id'] = new_id(type(self).__name__ + '/duplicate')
         self.data['duplicate']['segments'] = 0
         self.data['config'] = config.data
         self.data['import_config'] = import_config.data
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
-        with open(os.path.join(self.dest_dir,'sim.json'), "r") as j:
-            self.ob = json.load(j)
+        self.data['id'] = new_id(type(self).__name__)
+        self.index = path_index(self.dest_dir)
+        self.ob = self.index.sim
 
     def find_file(self, file: str) -> str:
         """
@@ -566,10 +528,9 @@ class Dataset:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','*','*','*', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.fits', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -579,15 +540,13 @@ class Dataset:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.fits', file + '.json')
     
     def set_local_duplicate(self) -> None:
         """
         Set the local duplicate parameters.
         """
-        self.data['duplicate']['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['duplicate']['id'] = new_id(type(self).__name__ + '/duplicate')
         self.data['duplicate']['segments'] = 0
 
 
@@ -595,13 +554,18 @@ class FitPatch:
     """
     Class to handle individual fit patch operations.
     Attributes:
+        dest_dir (str): The simulation the patched parameters are resolved against, or None.
         json_name (str): The name of the JSON configuration.
         data (dict): The fit patch data.
     """
-    def __init__(self) -> None:
+    def __init__(self, dest_dir: str = None) -> None:
         """
         Initialize the FitPatch class.
+        Args:
+            dest_dir (str): The simulation the patched parameters are resolved against. Without it, parameters
+                must be given as full paths.
         """
+        self.dest_dir = dest_dir
         self.json_name = 'fit_patch'
         self.data = self.load_config('default')
 
@@ -613,10 +577,9 @@ class FitPatch:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','*','*','fits', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.fits.fit_patch', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -626,19 +589,16 @@ class FitPatch:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.fits.fit_patch', file + '.json')
     
     def set_patch(self, param: str, val: str) -> None:
         """
         Set the patch parameters.
         Args:
-            param (str): The parameter name.
+            param (str): The parameter: a key, partial path (e.g. 'PM6:Y6/mue_y'), full path or human readable path.
             val (str): The value to set.
         """
-        self.data['json_path'] = param
-        self.data['human_path'] = param
+        self.data['json_path'], self.data['human_path'] = resolve_param(self.dest_dir, param, sep='/')
         self.data['val'] = val
 
 class Config:
@@ -669,10 +629,9 @@ class Config:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','*','*','*', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.fits.config', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -682,9 +641,7 @@ class Config:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.fits.config', file + '.json')
     
     def set_fit_params(self, **kwargs: dict) -> None:
         """
@@ -722,8 +679,8 @@ class ImportConfig:
         self.data['import_xlable'] = self.get_combo_pos(x_data)[1]
         self.data['import_data_label'] = self.get_combo_pos(y_data)[1]
         self.data['import_title'] = self.data['import_xlable'] + ' - ' + self.data['import_data_label']
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
-        self.data['data_file'] = 'fit_data#' + str(secrets.token_hex(8)) + '.inp'
+        self.data['id'] = new_id(type(self).__name__)
+        self.data['data_file'] = 'fit_data#' + token_hex('fit_data') + '.inp'
         self.create_inp()
 
     def get_combo_pos(self, x: str) -> tuple:
@@ -757,6 +714,7 @@ class ImportConfig:
         oghma_csv["data_units"] = self.data['import_data_label']
         oghma_csv["time"] = np.nan
         oghma_csv["Vexternal"] = np.nan
+        import pandas as pd
         data = pd.read_csv(self.data['import_file_path'],sep=' ', index_col=None, header=None)
         data_raw = data.to_numpy()
         data_shape = np.shape(data_raw)
@@ -788,10 +746,9 @@ class ImportConfig:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*','*','*','*', self.json_name, file)
-        filename = glob.glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Fits.fits.import_config', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -801,9 +758,7 @@ class ImportConfig:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Fits.fits.import_config', file + '.json')
 
 
     
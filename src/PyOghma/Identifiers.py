@@ -0,0 +1,146 @@
+"""
+This module generates the IDs stamped into sim.json by the components (e.g. 'id' + 16 hex digits) and the hashes
+naming jobs. By default they are random, as OghmaNano makes them. In deterministic mode they are derived from a
+seed, from what they label and from how many IDs were already made for the same label since the last reset, so
+the same configuration steps produce byte-identical files, and the same sweep point the same job hash. This lets
+identical clones be deduplicated and results be cached by file or job hash. OghmaNano resets the count whenever
+it clones or loads a simulation, so the IDs of a clone do not depend on the clones made before it.
+"""
+
+import base64
+import hashlib
+import secrets
+import ujson as json
+
+_state = {'mode': 'random', 'seed': '', 'counts': {}}
+
+
+def set_mode(mode: str = 'random', seed: object = 0) -> None:
+    """
+    Set how IDs are generated, for the whole process.
+    Args:
+        mode (str): 'random' for fresh random IDs, or 'deterministic' for IDs derived from the seed and label.
+        seed (object): The seed of deterministic IDs.
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode not in ('random', 'deterministic'):
+        raise ValueError('Unknown ID mode: ' + str(mode))
+    _state['mode'] = mode
+    _state['seed'] = str(seed)
+    reset()
+
+
+def get_mode() -> tuple:
+    """
+    Get how IDs are generated.
+    Returns:
+        tuple: The mode and the seed.
+    """
+    return _state['mode'], _state['seed']
+
+
+def deterministic() -> bool:
+    """
+    Check whether IDs are deterministic.
+    Returns:
+        bool: True in deterministic mode.
+    """
+    return _state['mode'] == 'deterministic'
+
+
+def reset() -> None:
+    """
+    Restart the count of IDs made for each label, e.g. before configuring a new clone.
+    """
+    _state['counts'] = {}
+
+
+def digest(content: object = None, nbytes: int = 8) -> bytes:
+    """
+    Make the bytes of an ID.
+    Args:
+        content (object): What the ID labels, e.g. a name or the configuration it is stamped into. Only used in
+            deterministic mode; anything ujson can serialise.
+        nbytes (int): The number of bytes.
+    Returns:
+        bytes: Random bytes, or bytes derived from the seed, the content and its count since the last reset.
+    """
+    if _state['mode'] == 'random':
+        return secrets.token_bytes(nbytes)
+    key = content if isinstance(content, str) else json.dumps(content, sort_keys=True)
+    count = _state['counts'].get(key, 0)
+    _state['counts'][key] = count + 1
+    return hashlib.sha256((_state['seed'] + '\x00' + key + '\x00' + str(count)).encode('utf-8')).digest()[:nbytes]
+
+
+def token_hex(content: object = None, nbytes: int = 8) -> str:
+    """
+    Make a hexadecimal token, as secrets.token_hex does.
+    Args:
+        content (object): What the token labels.
+        nbytes (int): The number of bytes.
+    Returns:
+        str: The token.
+    """
+    return digest(content, nbytes).hex()
+
+
+def new_id(content: object = None) -> str:
+    """
+    Make an ID as stamped into sim.json by OghmaNano.
+    Args:
+        content (object): What the ID labels.
+    Returns:
+        str: The ID, 'id' followed by 16 hexadecimal digits.
+    """
+    return 'id' + token_hex(content)
+
+
+def job_hashes(points: list, names: list = None, source: str = None) -> list:
+    """
+    Make the hashes naming the jobs of a sweep, as secrets.token_urlsafe(8) does. In deterministic mode a hash
+    depends only on the seed, the source simulation, the names and values of the variables at its point (and on
+    its repeat, for points appearing twice), so the same point of the same sweep of a simulation gets the same
+    hash, and sweeps of different variables or simulations do not share hashes.
+    Args:
+        points (list): The values of the variables at each sweep point; NumPy scalars and arrays hash as the
+            equivalent Python numbers.
+        names (list): The names of the variables, in the order of the values.
+        source (str): The source simulation directory, whose sim.json is part of the key.
+    Returns:
+        list: The hashes, 11 URL safe characters each.
+    """
+    if _state['mode'] == 'random':
+        return [secrets.token_urlsafe(8) for _ in points]
+    prefix = _state['seed'] + '\x00job\x00'
+    if source is not None:
+        from .SimFile import read_source
+        prefix += hashlib.sha256(read_source(source)[0].encode('utf-8')).hexdigest() + '\x00'
+    hashes = []
+    counts = {}
+    for point in points:
+        if hasattr(point, 'tolist'):
+            point = point.tolist()
+        values = list(point) if isinstance(point, (tuple, list)) else [point]
+        values = [value.item() if hasattr(value, 'item') else value for value in values]
+        pairs = sorted(zip(names, values), key=lambda pair: pair[0]) if names is not None else values
+        key = json.dumps(pairs)
+        count = counts.get(key, 0)
+        counts[key] = count + 1
+        token = hashlib.sha256((prefix + key + '\x00' + str(count)).encode('utf-8')).digest()[:8]
+        hashes.append(base64.urlsafe_b64encode(token).rstrip(b'=').decode('ascii'))
+    return hashes
+
+
+if __name__ == '__main__':
+    """
+    Example usage: the same configuration steps give the same IDs in deterministic mode.
+    """
+    names = ['temperature', 'intensity']
+    print(new_id(), new_id(), job_hashes([(300, 1.0)], names))
+    set_mode('deterministic', seed=1)
+    first = [new_id('light'), new_id('light'), new_id('layer/PM6:Y6'), job_hashes([(300, 1.0)], names)]
+    reset()
+    second = [new_id('light'), new_id('light'), new_id('layer/PM6:Y6'), job_hashes([(300, 1.0)], names)]
+    print(first, first == second)
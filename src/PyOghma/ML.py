@@ -6,15 +6,19 @@ simulation parameters, and network configurations for machine learning tasks.
 
 
 
-from glob import glob
 import ujson as json
 import numpy as np
 import difflib
-import secrets
 import copy
 import os
+import shutil
 
-from importlib import resources
+from .Defaults import LazyComponent, load_default, propagate, resource_path
+from .Identifiers import new_id, token_hex
+from .PathIndex import path_index, resolve_param
+from .OghmaCSV import read_oghma_csv
+from .Server import Server
+from .SimFile import update_sim
 
 
 class ml:
@@ -30,18 +34,19 @@ class ml:
         ml_config (ml_config): Instance of the ml_config class.
         ml_networks (ml_networks): Instance of the ml_networks class.
     """
+    ml_random = LazyComponent('ml_random')
+    ml_patch = LazyComponent('ml_patch')
+    duplicate = LazyComponent('duplicate')
+    ml_sim = LazyComponent('ml_sim')
+    ml_config = LazyComponent('ml_config')
+    ml_networks = LazyComponent('ml_networks')
+
     def __init__(self) -> None:
         """
-        Initialize the ml class and its subcomponents.
+        Initialize the ml class. The subcomponents are constructed when first accessed.
         """
         self.name = ""
         self.icon = "ml"
-        self.ml_random = ml_random()
-        self.ml_patch = ml_patch()
-        self.duplicate = duplicate()
-        self.ml_sim = ml_sim()
-        self.ml_config = ml_config()
-        self.ml_networks = ml_networks()
         return
 
     def propegate_dest_dir(self, dest_dir: str) -> None:
@@ -50,12 +55,7 @@ class ml:
         Args:
             dest_dir (str): The destination directory.
         """
-        self.dest_dir = dest_dir
-        self.ml_random.dest_dir = dest_dir
-        self.ml_patch.dest_dir = dest_dir
-        self.duplicate.dest_dir = dest_dir
-        self.ml_config.dest_dir = dest_dir
-        self.ml_sim.dest_dir = dest_dir
+        propagate(self, dest_dir, ('ml_random', 'ml_patch', 'duplicate', 'ml_config', 'ml_sim'))
 
     def load_config(self, file: str) -> dict:
         """
@@ -65,9 +65,7 @@ class ml:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Ml.' + self.json_name, file + '.json')
 
     def find_file(self, file: str) -> str:
         """
@@ -77,9 +75,7 @@ class ml:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(
-            resources.files("PyOghma.Sim_Defaults.Ml.configs" + self.json_name).joinpath(file)).args[0]
-        return config_dir
+        return resource_path('Ml.' + self.json_name, file)
 
     def set_format(self) -> None:
         """
@@ -105,13 +101,7 @@ class ml:
         """
         Update the JSON file with the current data.
         """
-        with open(os.path.join(self.dest_dir, 'sim.json'), "r") as j:
-            data = json.load(j)
-
-        data['ml']['segment0'].update(self.json_format)
-
-        with open(os.path.join(self.dest_dir, 'sim.json'), "w") as j:
-            j.write(json.dumps(data, indent=4))
+        update_sim(self.dest_dir, self.json_format, 'ml', 'segment0')
 
         return
 
@@ -142,7 +132,7 @@ class ml_random(ml):
             *inputs: Variable-length list of input objects.
         """
         self.segments = len(inputs)
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.data = {'segments': self.segments}
         for idx, duplication in enumerate(inputs):
             self.data.update({'segment' + str(idx): duplication.data})
@@ -175,10 +165,9 @@ class ml_input:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join(os.getcwd(), 'pyOghma','Sim_Defaults', 'Ml', self.json_name, file)
-        filename = glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Ml.ml_random', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -188,16 +177,14 @@ class ml_input:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Ml.ml_random', file + '.json')
 
     def set_input(self, state: bool = True, param: str = '', param_min: float = -1, param_max: float = 1) -> None:
         """
         Set the input parameters.
         Args:
             state (bool): Whether the input is enabled.
-            param (str): The parameter name.
+            param (str): The parameter: a key, partial path (e.g. 'PM6:Y6/mue_y'), full path or human readable path.
             param_min (float): The minimum value.
             param_max (float): The maximum value.
         """
@@ -214,8 +201,7 @@ class ml_input:
         else:
             self.data['random_distribution'] = 'linear'
 
-        self.data['json_var'] = param
-        self.data['human_var'] = ''
+        self.data['json_var'], self.data['human_var'] = resolve_param(self.dest_dir, param)
 
 
 class ml_patch(ml):
@@ -254,7 +240,7 @@ class duplicate(ml):
         super(ml, self).__init__()
         self.json_name = 'duplicate'
         self.data = {}
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.data['segments'] = 0
         self.set_format()
 
@@ -276,7 +262,7 @@ class ml_sim(ml):
         self.json_name = 'ml_sims'
         self.data = {}
         self.data['segments'] = 0
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.set_format()
 
     def set_sim(self, Sims: list) -> None:
@@ -285,9 +271,9 @@ class ml_sim(ml):
         Args:
             Sims (list): A list of simulation configurations.
         """
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.data = {'segments': len(Sims)}
-        sim_names = [str(secrets.token_hex(8)) for i in range(len(Sims))]
+        sim_names = [token_hex('ml_sim/sim_name') for i in range(len(Sims))]
         for idx in range(len(Sims)):
             segment_data = {}
             segment_data['ml_sim_enabled'] = "True"
@@ -309,7 +295,7 @@ class ml_sim(ml):
                 output_vector.update({'segment' + str(jdx): output_segment_data})
 
             segment_data['ml_output_vectors'] = output_vector
-            segment_data['id'] = 'id' + str(secrets.token_hex(8))
+            segment_data['id'] = new_id('ml_sim/segment')
             self.data.update({'segment' + str(idx): segment_data})
 
         self.set_format()
@@ -323,6 +309,7 @@ class ml_sim_patch:
         dest_dir (str): The destination directory.
         json_name (str): The name of the JSON configuration.
         data (dict): The patch configuration data.
+        value (float): The value set, unrounded; ml_patch_val holds it with five decimals for OghmaNano.
     """
     def __init__(self, dest_dir: str) -> None:
         """
@@ -331,6 +318,7 @@ class ml_sim_patch:
             dest_dir (str): The destination directory.
         """
         self.dest_dir = dest_dir
+        self.value = None
         self.json_name = 'ml_patch'
         self.data = self.load_config('default')
 
@@ -342,10 +330,9 @@ class ml_sim_patch:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*', 'Sim_Defaults', 'Ml','ml_sims', self.json_name, file)
-        filename = glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Ml.ml_sims.ml_patch', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -355,16 +342,14 @@ class ml_sim_patch:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Ml.ml_sims.ml_patch', file + '.json')
 
     def set_patch(self, state: bool, param: str, param_val: float) -> None:
         """
         Set the patch parameters.
         Args:
             state (bool): Whether the patch is enabled.
-            param (str): The parameter name.
+            param (str): The parameter: a key, partial path (e.g. 'PM6:Y6/mue_y'), full path or human readable path.
             param_val (float): The parameter value.
         """
         if state:
@@ -372,9 +357,9 @@ class ml_sim_patch:
         else:
             self.data['ml_patch_enabled'] = "False"
 
-        self.data['json_var'] = param
-        self.data['human_var'] = param
+        self.data['json_var'], self.data['human_var'] = resolve_param(self.dest_dir, param)
 
+        self.value = param_val
         self.data['ml_patch_val'] = "{:.5f}".format(param_val)
 
 
@@ -404,10 +389,9 @@ class ml_sim_output_vector:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*', 'Sim_Defaults', 'Ml','ml_sims', self.json_name, file)
-        filename = glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Ml.ml_sims.ml_output_vectors', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -417,9 +401,7 @@ class ml_sim_output_vector:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Ml.ml_sims.ml_output_vectors', file + '.json')
 
     def set_output_vector(self, state: bool, file_name: str, vector_start: float, vector_end: float, vector_step: float, import_config: object) -> None:
         """
@@ -449,7 +431,7 @@ class ml_sim_output_vector:
         self.data["vectors"] = vector_string
 
         self.data["import_config"] = import_config.data
-        self.data["id"] = "id" + str(secrets.token_hex(8))
+        self.data["id"] = new_id(type(self).__name__)
 
     def set_name(self, name: str) -> None:
         """
@@ -487,10 +469,9 @@ class ml_sim_output_vector_import_cofig:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*', 'Sim_Defaults', 'Ml', 'ml_sims','ml_output_vectors',self.json_name, file)
-        filename = glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Ml.ml_sims.ml_output_vectors.import_config', file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -500,9 +481,7 @@ class ml_sim_output_vector_import_cofig:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Ml.ml_sims.ml_output_vectors.import_config', file + '.json')
 
     def set_import_cofig(self, import_dir: str = 'jv.dat', x_data: str = 'J (A/cm^2)', y_data: str = 'V (Voltage)', import_area: float = 0.104, x_spin: int = 0, data_spin: int = 1) -> None:
         """
@@ -527,7 +506,7 @@ class ml_sim_output_vector_import_cofig:
         self.data['import_data_invert'] = "False"
         self.data['import_x_invert'] = "False"
         self.data['data_file'] = ''
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
 
     def set_name(self, file_name: str, sim_name: str) -> None:
         """
@@ -587,18 +566,6 @@ class ml_config(ml):
         self.data['ml_number_of_archives'] = num_archives
         self.data['ml_sims_per_archive'] = sim_per_archive
 
-    def find_file(self, file: str) -> str:
-        """
-        Find a file in the directory structure.
-        Args:
-            file (str): The name of the file to find.
-        Returns:
-            str: The path to the found file.
-        """
-        config_dir = resources.as_file(
-            resources.files("PyOghma.Sim_Defaults.Ml." + self.json_name).joinpath(file)).args[0]
-        return config_dir
-
 
 class ml_networks(ml):
     """
@@ -617,7 +584,7 @@ class ml_networks(ml):
         self.json_name = 'ml_sim'
         self.data = {}
         self.data['segments'] = 0
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
         self.set_format()
 
 
@@ -645,7 +612,7 @@ class ml_network:
             self.data["enabled"] = "False"
         self.data["ml_network_inputs"] = inputs.data
         self.data["ml_network_outputs"] = outputs.data
-        self.data['id'] = 'id' + str(secrets.token_hex(8))
+        self.data['id'] = new_id(type(self).__name__)
 
 
 class ml_network_input:
@@ -691,6 +658,311 @@ class ml_network_output:
             self.data['segment'+str(idx)] = segment_data
 
 
+class ml_dataset:
+    """
+    Class to generate a training dataset from Python, without OghmaNano's ML tooling. Random parameter sets are
+    drawn from the ranges of ml_input objects, every simulation of ml_sim is run for each set as a patched job on
+    the Server pool, and each output vector is interpolated onto its fixed grid. The samples are written in
+    shards of NumPy arrays, with the input labels, so that datasets of millions of samples are produced and read
+    a shard at a time.
+
+    Layout:
+        <dest_dir>/dataset.json
+        <dest_dir>/shard_<n>.npz    inputs (samples, inputs), valid (samples,), and per simulation and vector
+                                    '<sim>/<file>' (samples, grid points)
+    Attributes:
+        src_dir (str): The source simulation.
+        dest_dir (str): The directory of the dataset.
+        work_dir (str): The directory the jobs of a shard are run in.
+        inputs (list): The enabled ml_input objects.
+        sims (dict): Simulation name -> (ml_sim_patch objects, ml_sim_output_vector objects).
+        seed (int): The seed of the random draws; each shard is drawn from its own stream.
+        server (Server): The server running the jobs.
+    """
+    def __init__(self, src_dir: str, dest_dir: str, work_dir: str = None, seed: int = 0) -> None:
+        """
+        Initialize the ml_dataset class.
+        Args:
+            src_dir (str): The source simulation.
+            dest_dir (str): The directory of the dataset.
+            work_dir (str): The directory the jobs are run in. Defaults to 'jobs' in dest_dir; a tmpfs is faster.
+            seed (int): The seed of the random draws.
+        """
+        self.src_dir = src_dir
+        self.dest_dir = dest_dir
+        self.work_dir = work_dir or os.path.join(dest_dir, 'jobs')
+        self.inputs = []
+        self.sims = {}
+        self.seed = seed
+        self.server = Server()
+
+    def set_inputs(self, *inputs: object) -> None:
+        """
+        Set the random inputs. Disabled inputs are ignored.
+        Args:
+            *inputs: ml_input objects.
+        """
+        self.inputs = [i for i in inputs if i.data['random_var_enabled'] == 'True']
+
+    def add_sim(self, name: str, patches: list, vectors: list) -> None:
+        """
+        Add a simulation run for every sample, as in ml_sim.set_sim.
+        Args:
+            name (str): The name of the simulation.
+            patches (list): ml_sim_patch objects setting the simulation up (e.g. the light intensity).
+            vectors (list): ml_sim_output_vector objects naming the output files and their grids. The files are
+                read in the SI units oghma_core writes; their import configurations describe experimental data
+                and are not applied.
+        """
+        self.sims[name] = (patches, vectors)
+
+    def outputs(self) -> list:
+        """
+        Get the enabled output vectors.
+        Returns:
+            list: (simulation name, ml_sim_output_vector) pairs.
+        """
+        return [(name, v) for name, (_, vectors) in self.sims.items() for v in vectors
+                if v.data['ml_output_vector_item_enabled'] == 'True']
+
+    def input_names(self) -> list:
+        """
+        Get the labels of the inputs.
+        Returns:
+            list: The json_var of each input.
+        """
+        return [i.data['json_var'] for i in self.inputs]
+
+    def sample(self, samples: int, shard: int = 0) -> np.ndarray:
+        """
+        Draw random parameter sets. Inputs with a log distribution are drawn uniformly in log10.
+        Args:
+            samples (int): The number of sets.
+            shard (int): The shard, selecting the random stream, so a shard always gets the same draws.
+        Returns:
+            numpy.ndarray: The sets, shaped (samples, inputs).
+        """
+        rng = np.random.default_rng([self.seed, shard])
+        low = np.array([float(i.data['min']) for i in self.inputs])
+        high = np.array([float(i.data['max']) for i in self.inputs])
+        log = np.array([i.data['random_distribution'] == 'log' for i in self.inputs], dtype=bool)
+        low[log] = np.log10(low[log])
+        high[log] = np.log10(high[log])
+        draws = low + (high - low) * rng.random((samples, len(self.inputs)))
+        draws[:, log] = 10 ** draws[:, log]
+        return draws
+
+    def patches(self, values: np.ndarray) -> dict:
+        """
+        Build the JSON Patch of each simulation for one parameter set.
+        Args:
+            values (numpy.ndarray): The value of each input.
+        Returns:
+            dict: Simulation name -> patch against the source sim.json.
+        """
+        index = path_index(self.src_dir)
+        common = [{'op': 'replace', 'path': index.pointer(i.data['json_var']), 'value': float(v)}
+                  for i, v in zip(self.inputs, values)]
+        out = {}
+        for name, (patches, _) in self.sims.items():
+            ops = list(common)
+            for patch in patches:
+                if patch.data['ml_patch_enabled'] != 'True':
+                    continue
+                value = patch.value
+                if value is None:
+                    value = patch.data['ml_patch_val']
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        pass
+                ops.append({'op': 'replace', 'path': index.pointer(patch.data['json_var']), 'value': value})
+            out[name] = ops
+        return out
+
+    def run(self, samples: int, shard_size: int = 10000, keep: bool = False) -> None:
+        """
+        Generate the dataset. Shards already written are skipped, so an interrupted run can be resumed, or a
+        dataset extended with more samples.
+        Args:
+            samples (int): The number of samples.
+            shard_size (int): The number of samples per shard.
+            keep (bool): Whether to keep the job directories after their outputs are read.
+        Raises:
+            ValueError: If the shards already written were generated with other settings.
+        """
+        os.makedirs(self.dest_dir, exist_ok=True)
+        shards = (samples + shard_size - 1) // shard_size
+        index = self.describe(samples, shard_size)
+        self.check_index(index)
+        with open(os.path.join(self.dest_dir, 'dataset.json'), 'w') as f:
+            json.dump(index, f, indent=4)
+        for shard in range(shards):
+            file = self.shard_file(shard)
+            if os.path.isfile(file):
+                continue
+            count = min(shard_size, samples - shard * shard_size)
+            draws = self.sample(count, shard)
+            self.server.clear_jobs()
+            for row, values in enumerate(draws):
+                for name, patch in self.patches(values).items():
+                    self.server.dest_dir = os.path.join(self.work_dir, str(shard), str(row), name)
+                    self.server.add_job(self.server.dest_dir, str(shard) + '/' + str(row) + '/' + name, patch=patch,
+                                        src_dir=self.src_dir)
+            self.server.run()
+            arrays = self.harvest(shard, count)
+            arrays['inputs'] = draws
+            np.savez(file, **arrays)
+            if not keep:
+                shutil.rmtree(os.path.join(self.work_dir, str(shard)), ignore_errors=True)
+
+    def harvest(self, shard: int, count: int) -> dict:
+        """
+        Read the output vectors of the jobs of a shard onto their grids.
+        Args:
+            shard (int): The shard.
+            count (int): The number of samples in the shard.
+        Returns:
+            dict: '<sim>/<file>' -> features shaped (samples, grid points), and 'valid', True for the samples
+                whose every output was read.
+        """
+        arrays = {}
+        valid = np.ones(count, dtype=bool)
+        for name, vector in self.outputs():
+            grid = output_grid(vector)
+            features = np.full((count, grid.size), np.nan, dtype=np.float32)
+            for row in range(count):
+                features[row] = output_features(os.path.join(self.work_dir, str(shard), str(row), name),
+                                                vector.data['file_name'], grid)
+            valid &= np.isfinite(features).all(axis=1)
+            arrays[name + '/' + vector.data['file_name']] = features
+        arrays['valid'] = valid
+        return arrays
+
+    def shard_file(self, shard: int) -> str:
+        """
+        Get the path of a shard.
+        Args:
+            shard (int): The shard.
+        Returns:
+            str: The path of the .npz file.
+        """
+        return os.path.join(self.dest_dir, 'shard_' + str(shard).zfill(5) + '.npz')
+
+    def describe(self, samples: int, shard_size: int) -> dict:
+        """
+        Describe the dataset: inputs, ranges, simulations, grids and shards, as written to dataset.json.
+        Args:
+            samples (int): The number of samples.
+            shard_size (int): The number of samples per shard.
+        Returns:
+            dict: The description.
+        """
+        index = {
+            'src_dir': self.src_dir,
+            'seed': self.seed,
+            'samples': samples,
+            'shard_size': shard_size,
+            'inputs': [{'json_var': i.data['json_var'], 'min': i.data['min'], 'max': i.data['max'],
+                        'random_distribution': i.data['random_distribution']} for i in self.inputs],
+            'patches': {name: [[p.data['json_var'], p.data['ml_patch_val'] if p.value is None else p.value]
+                               for p in patches if p.data['ml_patch_enabled'] == 'True']
+                        for name, (patches, _) in self.sims.items()},
+            'outputs': {name + '/' + v.data['file_name']: output_grid(v).tolist() for name, v in self.outputs()},
+            'shards': [os.path.basename(self.shard_file(n)) for n in range((samples + shard_size - 1) // shard_size)],
+        }
+        return json.loads(json.dumps(index))
+
+    def check_index(self, index: dict) -> None:
+        """
+        Check that the shards already written can be resumed with a new description of the dataset.
+        Args:
+            index (dict): The new description, from describe.
+        Raises:
+            ValueError: If the seed, shard size, inputs, patches or outputs differ from those of dataset.json, or
+                a shard written would hold a different number of samples.
+        """
+        file = os.path.join(self.dest_dir, 'dataset.json')
+        if not os.path.isfile(file):
+            return
+        with open(file, 'r') as f:
+            old = json.load(f)
+        written = [n for n in range(len(old['shards'])) if os.path.isfile(self.shard_file(n))]
+        if not written:
+            return
+        changed = [key for key in ('seed', 'shard_size', 'inputs', 'patches', 'outputs') if old.get(key) != index[key]]
+        size = index['shard_size']
+        counts = [n for n in written if n < len(index['shards'])
+                  and min(size, old['samples'] - n * size) != min(size, index['samples'] - n * size)]
+        if counts:
+            changed.append('samples (shard ' + str(counts[0]) + ' would change size)')
+        if changed:
+            raise ValueError('Dataset in ' + self.dest_dir + ' was generated with other ' + ', '.join(changed)
+                             + '; use another dest_dir or remove its shards')
+
+    def load(self, shards: list = None, valid_only: bool = True) -> dict:
+        """
+        Read shards of the dataset into memory.
+        Args:
+            shards (list): The shards to read. Defaults to every shard written.
+            valid_only (bool): Whether to drop the samples with missing outputs.
+        Returns:
+            dict: 'inputs', 'input_names', and '<sim>/<file>' features, concatenated over the shards.
+        """
+        with open(os.path.join(self.dest_dir, 'dataset.json'), 'r') as f:
+            index = json.load(f)
+        shards = range(len(index['shards'])) if shards is None else shards
+        parts = {}
+        for shard in shards:
+            if not os.path.isfile(self.shard_file(shard)):
+                continue
+            with np.load(self.shard_file(shard)) as data:
+                keep = data['valid'] if valid_only else slice(None)
+                for key in data.files:
+                    if key != 'valid':
+                        parts.setdefault(key, []).append(data[key][keep])
+        out = {key: np.concatenate(value) for key, value in parts.items()}
+        out['input_names'] = [i['json_var'] for i in index['inputs']]
+        return out
+
+
+def output_grid(vector: object) -> np.ndarray:
+    """
+    Get the grid of an output vector.
+    Args:
+        vector (ml_sim_output_vector): The output vector.
+    Returns:
+        numpy.ndarray: The points of the vector.
+    """
+    return np.array([float(v) for v in vector.data['vectors'].split(',') if v])
+
+
+def output_features(path: str, file_name: str, grid: np.ndarray) -> np.ndarray:
+    """
+    Interpolate an output file of a job onto a grid. The file is read as oghma_core writes it, in SI units: the
+    axis of the vector is its y column and the features its data column.
+    Args:
+        path (str): The job directory.
+        file_name (str): The oghma_csv output file (e.g. 'jv.csv').
+        grid (numpy.ndarray): The points of the output vector.
+    Returns:
+        numpy.ndarray: The data at each point, NaN where the file is missing or does not cover the grid.
+    """
+    file = os.path.join(path, file_name)
+    if not os.path.isfile(file):
+        return np.full(grid.size, np.nan)
+    try:
+        csv = read_oghma_csv(file)
+    except ValueError:
+        return np.full(grid.size, np.nan)
+    if csv.y is None or np.size(csv.y) == 0:
+        return np.full(grid.size, np.nan)
+    x = np.ravel(csv.y)
+    y = np.asarray(csv.data).reshape(-1, x.size)[0]
+    order = np.argsort(x, kind='stable')
+    return np.interp(grid, x[order], y[order], left=np.nan, right=np.nan)
+
+
 if __name__ == '__main__':
     """
     Main function to demonstrate the usage of the classes.
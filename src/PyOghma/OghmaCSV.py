@@ -0,0 +1,228 @@
+"""
+This module provides a fast reader for the `#oghma_csv` files written by OghmaNano, such as jv.csv,
+charge.csv and the files in optical_output. The JSON header is parsed once and the numeric body is
+loaded directly into a NumPy array, shaped according to the header, without any per-row Python work.
+"""
+
+import os
+import ujson as json
+import numpy as np
+
+
+class OghmaCSV:
+    """
+    Class to hold the data and metadata of a single oghma_csv file.
+    Attributes:
+        file (str): The path to the file.
+        header (dict): The raw JSON header of the file.
+        title (str): The title of the data set.
+        type (str): The type of the data set ('xy' or 'zxy-d').
+        cols (str): The column layout of the body (e.g. 'yd').
+        x_len (int): The number of points along x.
+        y_len (int): The number of points along y.
+        z_len (int): The number of points along z.
+        x_mul (float): The display multiplier for the x axis.
+        y_mul (float): The display multiplier for the y axis.
+        z_mul (float): The display multiplier for the z axis.
+        labels (dict): The axis and data labels.
+        units (dict): The axis and data units.
+        columns (numpy.ndarray): The raw body, one row per line and one column per entry in cols.
+        data (numpy.ndarray): The data column, shaped (y_len,) for 'xy' and (z_len, x_len, y_len) for 'zxy-d'.
+        x (numpy.ndarray): The x positions, if present in the body.
+        y (numpy.ndarray): The y positions.
+        z (numpy.ndarray): The z positions, if present in the body.
+    """
+    types = ('xy', 'zxy-d')
+
+    def __init__(self, file: str = '') -> None:
+        """
+        Initialize the OghmaCSV class.
+        Args:
+            file (str): The path to the file. If given, the file is loaded immediately.
+        """
+        self.file = file
+        self.header = {}
+        self.columns = None
+        self.data = None
+        self.x = None
+        self.y = None
+        self.z = None
+        if file != '':
+            self.load(file)
+
+    def load(self, file: str) -> 'OghmaCSV':
+        """
+        Load an oghma_csv file.
+        Args:
+            file (str): The path to the file.
+        Returns:
+            OghmaCSV: The loaded object.
+        Raises:
+            ValueError: If the file is not an oghma_csv file or has an unsupported type.
+        """
+        self.file = file
+        with open(file, 'rb') as f:
+            raw = f.read()
+        return self.loads(raw)
+
+    def loads(self, raw: bytes) -> 'OghmaCSV':
+        """
+        Load the contents of an oghma_csv file from memory.
+        Args:
+            raw (bytes): The contents of the file.
+        Returns:
+            OghmaCSV: The loaded object.
+        Raises:
+            ValueError: If the contents are not an oghma_csv file or have an unsupported type.
+        """
+        if isinstance(raw, str):
+            raw = raw.encode()
+        end = raw.find(b'\n')
+        if end == -1:
+            end = len(raw)
+        self.set_header(parse_header(raw[:end].decode()))
+
+        pos = end + 1
+        while raw.startswith(b'#', pos):
+            end = raw.find(b'\n', pos)
+            if end == -1:
+                pos = len(raw)
+                break
+            pos = end + 1
+
+        try:
+            flat = np.array(raw[pos:].split(), dtype=float)
+        except ValueError as e:
+            raise ValueError('Body of ' + str(self.file) + ' is not numeric: ' + str(e)) from None
+        self.set_body(flat)
+        return self
+
+    def set_header(self, header: dict) -> None:
+        """
+        Set the typed metadata from a parsed header.
+        Args:
+            header (dict): The parsed JSON header.
+        Raises:
+            ValueError: If the type of the data set is not supported.
+        """
+        self.header = header
+        self.title = header.get('title', '')
+        self.type = header.get('type', '')
+        if self.type not in self.types:
+            raise ValueError('Unsupported oghma_csv type: ' + str(self.type))
+        self.cols = header.get('cols', 'yd')
+        self.x_len = int(header.get('x_len', 1))
+        self.y_len = int(header.get('y_len', -1))
+        self.z_len = int(header.get('z_len', 1))
+        self.x_mul = float(header.get('x_mul', 1.0))
+        self.y_mul = float(header.get('y_mul', 1.0))
+        self.z_mul = float(header.get('z_mul', 1.0))
+        self.labels = {axis: header.get(axis + '_label', '') for axis in ('x', 'y', 'z', 'data')}
+        self.units = {axis: header.get(axis + '_units', '') for axis in ('x', 'y', 'z', 'data')}
+
+    def set_body(self, flat: np.ndarray) -> None:
+        """
+        Shape the flat numeric body according to the header.
+        Args:
+            flat (numpy.ndarray): The numeric body as a flat array.
+        Raises:
+            ValueError: If the size of the body does not match the header, e.g. because the file is truncated.
+        """
+        ncols = len(self.cols)
+        if flat.size % ncols != 0:
+            raise ValueError('Body of ' + str(self.file) + ' does not match columns ' + self.cols)
+        self.columns = flat.reshape(-1, ncols)
+        rows = self.columns.shape[0]
+
+        match self.type:
+            case 'xy':
+                if self.y_len >= 0 and rows != self.y_len:
+                    raise ValueError('Body of ' + str(self.file) + ' has ' + str(rows) + ' rows, y_len is '
+                                     + str(self.y_len))
+                shape = (rows,)
+            case 'zxy-d':
+                x_len = max(self.x_len, 1)
+                z_len = max(self.z_len, 1)
+                if rows != z_len * x_len * max(self.y_len, 1):
+                    raise ValueError('Body of ' + str(self.file) + ' does not match z_len, x_len and y_len')
+                shape = (z_len, x_len, rows // (z_len * x_len))
+
+        for axis in ('x', 'y', 'z'):
+            if axis in self.cols:
+                setattr(self, axis, self.column(axis).reshape(shape))
+        self.data = self.column('d').reshape(shape)
+
+        if self.type == 'zxy-d':
+            self.y = self.y[0, 0, :]
+            if self.x is not None:
+                self.x = self.x[0, :, 0]
+            if self.z is not None:
+                self.z = self.z[:, 0, 0]
+
+    def column(self, col: str) -> np.ndarray:
+        """
+        Get a single column of the body.
+        Args:
+            col (str): The column name as it appears in cols (e.g. 'y' or 'd').
+        Returns:
+            numpy.ndarray: A view of the column.
+        """
+        return self.columns[:, self.cols.index(col)]
+
+
+def parse_header(line: str) -> dict:
+    """
+    Parse the `#oghma_csv {json}*` header line.
+    Args:
+        line (str): The first line of the file.
+    Returns:
+        dict: The parsed JSON header.
+    Raises:
+        ValueError: If the line is not an oghma_csv header.
+    """
+    line = line.strip()
+    if not line.startswith('#oghma_csv'):
+        raise ValueError('Not an oghma_csv file')
+    line = line[len('#oghma_csv'):].strip()
+    if line.endswith('*'):
+        line = line[:-1]
+    return json.loads(line)
+
+
+def read_oghma_csv(file: str) -> OghmaCSV:
+    """
+    Read an oghma_csv file.
+    Args:
+        file (str): The path to the file.
+    Returns:
+        OghmaCSV: The data and metadata of the file.
+    """
+    return OghmaCSV(file)
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the reader against the pandas path used previously.
+    """
+    import sys
+    import timeit
+    import pandas as pd
+
+    device = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.getcwd(), 'standard_device')
+    files = ['jv.csv', 'charge.csv', os.path.join('optical_output', 'G_y.csv'), os.path.join('optical_output', 'G_zxy.csv')]
+    for name in files:
+        file = os.path.join(device, name)
+
+        def pandas_path():
+            with open(file, 'r') as r:
+                data = pd.read_csv(r, comment='#', delimiter=' ', header=None)
+                return data[0].to_numpy(), data[1].to_numpy()
+
+        A = read_oghma_csv(file)
+        pd_y, pd_d = pandas_path()
+        assert np.allclose(A.y.ravel(), pd_y, rtol=1e-12) and np.allclose(A.data.ravel(), pd_d, rtol=1e-12)
+
+        n = 200
+        t_pd = timeit.timeit(pandas_path, number=n) / n
+        t_og = timeit.timeit(lambda: read_oghma_csv(file), number=n) / n
+        print(f'{name:<28} {A.type:<6} {str(A.data.shape):<14} pandas {t_pd * 1e6:8.1f} us  oghma_csv {t_og * 1e6:8.1f} us  x{t_pd / t_og:.1f}')
@@ -7,7 +7,6 @@ job execution and cleanup of simulation results.
 
 import os
 import shutil
-import secrets
 import itertools
 
 import numpy as np
@@ -19,6 +18,12 @@ from .Thermal import Thermal
 from .Server import Server
 from .Epitaxy import Epitaxy
 from .ML import ml
+from .Defaults import LazyComponent, propagate
+import ujson as json
+
+from .SimFile import clone_archive, read_source, stage, staged, unstage
+from .JsonPatch import diff
+from . import Identifiers
 
 
 class OghmaNano:
@@ -36,22 +41,27 @@ class OghmaNano:
         variables (dict): Dictionary of variables for simulations.
         points (int): Number of points in the variable space.
         hashes (list): List of unique hashes for simulations.
+        iterator (str): The iterator used to combine the variables ('product' or 'zip').
+        archive (str): The archive the last clone was written into, or None.
     """
+    Optical = LazyComponent('Optical')
+    Sims = LazyComponent('Sims')
+    Thermal = LazyComponent('Thermal')
+    Server = LazyComponent('Server')
+    Epitaxy = LazyComponent('Epitaxy')
+    ML = LazyComponent('ml')
+
     def __init__(self) -> None:
         """
-        Initialize the OghmaNano class and its subcomponents.
+        Initialize the OghmaNano class. The subcomponents are constructed when first accessed.
         """
         self.results_dir = self.check_results()
-        self.Optical = Optical()
-        self.Sims = Sims()
-        self.Thermal = Thermal()
-        self.Server = Server()
-        self.Epitaxy = Epitaxy()
-        self.ML = ml()
         self.dimensions = None
         self.variables = None
         self.points = None
         self.hashes = None
+        self.iterator = None
+        self.archive = None
 
     def check_results(self) -> str:
         """
@@ -101,19 +111,10 @@ class OghmaNano:
 
     def propagate_dest_dir(self) -> None:
         """
-        Propagate the destination directory to all subcomponents.
+        Propagate the destination directory to all subcomponents which have been constructed. Subcomponents
+        constructed later receive it when they are created.
         """
-        self.Epitaxy.dest_dir = self.dest_dir
-        self.Optical.dest_dir = self.dest_dir
-        self.Optical.Light.dest_dir = self.dest_dir
-        self.Optical.LightSources.dest_dir = self.dest_dir
-
-        self.Sims.dest_dir = self.dest_dir
-        self.Sims.SunsVoc.dest_dir = self.dest_dir
-        self.Sims.JV.dest_dir = self.dest_dir
-
-        self.Thermal.dest_dir = self.dest_dir
-        self.Server.dest_dir = self.dest_dir
+        propagate(self, self.dest_dir, ('Epitaxy', 'Optical', 'Sims', 'Thermal', 'Server'))
 
     def set_variables(self, iter_used: str = 'product', **kwargs: dict) -> None:
         """
@@ -127,36 +128,77 @@ class OghmaNano:
         for key, value in self.variables.items():
             if type(value) != list:
                 self.variables[key] = value.tolist()
+        self.iterator = iter_used
         match iter_used:
             case 'product':
                 self.product = itertools.product(*self.variables.values())
                 self.points = len(list(itertools.product(*self.variables.values())))
-                self.hashes = [secrets.token_urlsafe(8) for i in range(self.points)]
+                self.hashes = Identifiers.job_hashes(list(itertools.product(*self.variables.values())),
+                                                     list(self.variables), getattr(self, 'src_dir', None))
             case 'zip':
                 self.product = list(itertools.zip_longest(*self.variables.values()))
                 self.points = len(list(self.product))
-                self.hashes = [secrets.token_urlsafe(8) for i in range(self.points)]
+                self.hashes = Identifiers.job_hashes(self.product, list(self.variables), getattr(self, 'src_dir', None))
             case _:
                 print('Iterator has not been implemented')
 
+    def preflight(self, *configs: object) -> None:
+        """
+        Check every path and value a sweep will write against the source simulation, before any job is queued.
+        Args:
+            *configs: ML and fitting configurations (e.g. ml_input, ml_sim_patch, Variable, Rule, Dupe), lists of
+                them, or dictionaries of path -> values set by the sweep.
+        Raises:
+            PreflightError: Listing every problem found.
+        """
+        from .Preflight import Preflight
+        Preflight(self.src_dir).validate(*configs)
+
+    def set_id_mode(self, mode: str = 'deterministic', seed: object = 0) -> None:
+        """
+        Set how the IDs stamped into sim.json and the job hashes are generated, for every component.
+        Args:
+            mode (str): 'random', as OghmaNano does, or 'deterministic' so that the same configuration steps write
+                byte-identical files and the same sweep point gets the same job hash.
+            seed (object): The seed of deterministic IDs.
+        """
+        Identifiers.set_mode(mode, seed)
+
     def gen_hashes(self, points: int) -> None:
         """
-        Generate unique hashes for the given number of points.
+        Generate unique hashes for the given number of points. In deterministic mode they are keyed on the
+        experiment name, the source simulation and the index of each point.
         Args:
             points (int): The number of points to generate hashes for.
         """
-        self.hashes = [secrets.token_urlsafe(8) for i in range(points)]
+        name = getattr(self, 'experiment_name', None)
+        self.hashes = Identifiers.job_hashes([(name, n) for n in range(points)], ['experiment', 'point'],
+                                             getattr(self, 'src_dir', None))
 
-    def clone(self, dest_dir: str) -> None:
+    def clone(self, dest_dir: str, archive: str = None, patch: bool = False) -> None:
         """
         Clone the source simulation to the destination directory.
         Args:
             dest_dir (str): The name of the destination directory.
+            archive (str): The name of an archive (e.g. 'sim.oghma'). If given, the clone holds only its sim.json,
+                compressed in the archive, instead of a copy of the source directory. Components update it in
+                place; use this only with cores which read archived simulations.
+            patch (bool): Whether to stage the clone in memory instead of writing it. Components configure it as
+                usual, and add_job turns it into a JSON Patch against the source which the worker applies just
+                before the core starts. The job directory then holds only the patched sim.json (in the archive,
+                if given).
         """
         dest = os.path.join(os.getcwd(), self.results_dir, dest_dir)
         self.dest_dir = dest
         self.propagate_dest_dir()
-        shutil.copytree(self.src_dir, dest)
+        Identifiers.reset()
+        self.archive = archive
+        if patch:
+            stage(dest, json.loads(read_source(self.src_dir)[0]))
+        elif archive:
+            clone_archive(self.src_dir, dest, archive=archive)
+        else:
+            shutil.copytree(self.src_dir, dest)
         return
 
     def load(self, dest_dir: str) -> None:
@@ -168,14 +210,22 @@ class OghmaNano:
         dest = os.path.join(os.getcwd(), self.results_dir, dest_dir)
         self.dest_dir = dest
         self.propagate_dest_dir()
+        Identifiers.reset()
 
     def add_job(self, hash: str = '') -> None:
         """
-        Add a job to the server for execution.
+        Add a job to the server for execution. A clone staged with clone(patch=True) is added as a JSON Patch
+        against the source.
         Args:
             hash (str): The unique hash for the job. Defaults to an empty string.
         """
-        self.Server.add_job(os.path.join(os.getcwd(), self.results_dir, self.dest_dir, 'sim.json'), hash, args="")
+        dest = os.path.join(os.getcwd(), self.results_dir, self.dest_dir)
+        if staged(dest):
+            patch = diff(read_source(self.src_dir)[1], unstage(dest))
+            self.Server.add_job(os.path.join(dest, 'sim.json'), hash, args="", patch=patch, src_dir=self.src_dir,
+                                archive=self.archive)
+            return
+        self.Server.add_job(os.path.join(dest, 'sim.json'), hash, args="")
         return
 
     def clean_up(self) -> None:
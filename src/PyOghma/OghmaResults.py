@@ -7,6 +7,7 @@ experiment dictionaries and extracting specific parameters from simulation data.
 
 import os
 import glob
+import hashlib
 import secrets
 
 import shutil
@@ -20,7 +21,15 @@ match platform.system():
         import gzip
 import ujson as json
 import numpy as np
-import pandas as pd
+
+from .OghmaCSV import OghmaCSV, read_oghma_csv
+from .SimInfo import SimInfo
+from .ExpStore import ExpStore, is_chunked
+from .SnapshotStore import SnapshotStore
+from .SimFile import read_sim, exists
+
+APPEND_MARKER = '\n#oghma_append\n'
+"""Separator written before each record appended to an experiment file by save_dict(mode='a')."""
 
 class Results:
     """
@@ -35,6 +44,12 @@ class Results:
         exp_dict (dict): Dictionary to store experiment results.
         rjl (list): List of indices of jobs to be removed.
         product (list): Cartesian product of variable values.
+        sim_info_table (SimInfo): Typed sim_info of every job, built on first use by get_sim_info.
+        pending (list): Hashes added by merge which have not been saved yet.
+        dropped (list): Hashes replaced by merge which are still in the saved file.
+        snapshot_harvest (dict): The snapshot quantities to keep when the experiment dictionary is created, set by
+            set_snapshot_harvest. None keeps no snapshot data.
+        optical_harvest (list): The optical_output files to keep, set by set_optical_harvest. None keeps none.
     """
     def __init__(self) -> None:
         """
@@ -42,6 +57,11 @@ class Results:
         """
         self.dest_dir = ""
         self.system = platform.system()
+        self.sim_info_table = None
+        self.pending = []
+        self.dropped = []
+        self.snapshot_harvest = None
+        self.optical_harvest = None
         
     def load_experiment(self, A: object) -> None:
         """
@@ -51,8 +71,7 @@ class Results:
         """
         self.experiment = A
         self.src_dir = A.src_dir
-        with open(os.path.join(self.src_dir,'sim.json'), 'r') as j:
-            self.src_json = json.load(j)
+        self.src_json = read_sim(self.src_dir)
         self.jobs = A.Server.jobs
 
     def find_results(self) -> None:
@@ -64,18 +83,55 @@ class Results:
             self.find_snapshot(j)
             self.find_sim(j)
             self.find_jv(j)
+            self.find_optical(j)
     
 
     def find_snapshot(self, j: object) -> None:
         """
-        Check if snapshots exist for a job.
+        Check if snapshots and optical snapshots exist for a job.
         Args:
             j (object): The job object.
         """
-        j.snapshots = False
-        test = os.path.join(j.path,'snapshots')
-        if os.path.isdir(test):
-            j.snapshots = True
+        j.snapshots = os.path.isdir(os.path.join(j.path, 'snapshots'))
+        j.optical_snapshots = os.path.isdir(os.path.join(j.path, 'optical_snapshots'))
+
+    def set_snapshot_harvest(self, quantities: list, kind: str = 'optical_snapshots', stride: int = 1,
+                             snapshot_stride: int = 1, dtype: str = 'float32') -> None:
+        """
+        Keep snapshot quantities of every job when the experiment dictionary is created. The data is saved to a
+        SnapshotStore in the directory '<experiment name>_snapshots' before the clone directories are removed.
+        Args:
+            quantities (list): The quantities to keep, named after their files (e.g. ['G', 'n', 'alpha']).
+            kind (str): The snapshot directory, 'snapshots' or 'optical_snapshots'.
+            stride (int): Keep every stride-th position, to limit the size of the store.
+            snapshot_stride (int): Keep every snapshot_stride-th snapshot.
+            dtype (str): The dtype of the stored arrays.
+        """
+        self.snapshot_harvest = {'quantities': list(quantities), 'kind': kind, 'stride': stride,
+                                 'snapshot_stride': snapshot_stride, 'dtype': dtype}
+
+    def harvest_snapshots(self) -> None:
+        """
+        Save the snapshot quantities chosen with set_snapshot_harvest from the jobs of the experiment dictionary.
+        """
+        harvest = dict(self.snapshot_harvest)
+        kind = harvest['kind']
+        jobs = [(j.hash, j.path) for j in self.jobs if j.hash in self.exp_dict and getattr(j, kind, False)]
+        if not jobs:
+            return
+        path = self.exp_dict['experiment']['name'] + '_snapshots'
+        SnapshotStore(path).harvest(jobs, harvest.pop('quantities'), **harvest)
+        self.exp_dict['experiment']['snapshots'] = path
+
+    def get_snapshots(self) -> SnapshotStore:
+        """
+        Open the snapshot store of the experiment.
+        Returns:
+            SnapshotStore: The store, read lazily.
+        Raises:
+            KeyError: If no snapshots were harvested for the experiment.
+        """
+        return SnapshotStore(self.exp_dict['experiment']['snapshots'])
 
 
     def find_sim_info(self, j: object) -> None:
@@ -96,10 +152,7 @@ class Results:
         Args:
             j (object): The job object.
         """
-        j.sim = False
-        test = os.path.join(j.path, 'sim.json')
-        if os.path.isfile(test):
-            j.sim = True
+        j.sim = exists(j.path)
 
     def find_jv(self, j: object) -> None:
         """
@@ -113,6 +166,68 @@ class Results:
             j.jv = True
 
 
+    def find_optical(self, j: object) -> None:
+        """
+        Check if optical outputs exist for a job.
+        Args:
+            j (object): The job object.
+        """
+        j.optical = os.path.isdir(os.path.join(j.path, 'optical_output'))
+
+    def set_optical_harvest(self, files: list = None) -> None:
+        """
+        Keep the optical outputs of every job when the experiment dictionary is created. Each unique file is stored
+        once in exp_dict['optical'] under the digest of its contents, and jobs reference it by digest, so outputs
+        which are identical across jobs (e.g. in electrical-only sweeps) are not repeated.
+        Args:
+            files (list): The optical_output files to keep, without extension (e.g. ['G_y', 'reflect']).
+                Defaults to every oghma_csv file in optical_output.
+        """
+        self.optical_harvest = list(files) if files is not None else []
+
+    def write_optical_to_job(self, j: object) -> None:
+        """
+        Write the digests of the optical outputs of a job to the job dictionary, storing unseen outputs once.
+        Args:
+            j (object): The job object.
+        """
+        path = os.path.join(j.path, 'optical_output')
+        files = self.optical_harvest or sorted(f[:-len('.csv')] for f in os.listdir(path) if f.endswith('.csv'))
+        store = self.exp_dict.setdefault('optical', {})
+        digests = {}
+        for name in files:
+            file = os.path.join(path, name + '.csv')
+            if not os.path.isfile(file):
+                continue
+            with open(file, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            if digest not in store:
+                try:
+                    csv = OghmaCSV().loads(raw)
+                except ValueError:
+                    continue
+                store[digest] = {'header': csv.header, 'columns': csv.columns.ravel().tolist()}
+            digests[name] = digest
+        self.exp_dict[j.hash]['optical'] = digests
+
+    def get_optical(self, hash: str, name: str) -> OghmaCSV:
+        """
+        Get an optical output of a job kept by set_optical_harvest.
+        Args:
+            hash (str): The hash of the job.
+            name (str): The optical_output file, without extension (e.g. 'G_y').
+        Returns:
+            OghmaCSV: The typed data and metadata of the file.
+        Raises:
+            KeyError: If the output was not kept for the job.
+        """
+        stored = self.exp_dict['optical'][self.exp_dict[hash]['optical'][name]]
+        csv = OghmaCSV()
+        csv.set_header(stored['header'])
+        csv.set_body(np.asarray(stored['columns'], dtype=np.float64))
+        return csv
+
     def save_results_ml(self, light: object) -> str:
         """
         Save results for machine learning experiments.
@@ -148,6 +263,7 @@ class Results:
         """
         self.exp_dict = {}
         self.exp_dict['experiment'] = {}
+        self.sim_info_table = None
         exp = self.exp_dict['experiment']
         self.find_results()
         self.rjl = []
@@ -156,39 +272,174 @@ class Results:
                 self.write_job(j)
             else:
                 self.remove_job_list(j)
-        self.remove_jobs()
         self.write_exp_data(exp)
+        if self.snapshot_harvest is not None:
+            self.harvest_snapshots()
+        self.remove_jobs()
         return
     
-    def save_dict(self) -> None:
+    def save_dict(self, mode: str = 'w', codec: str = None) -> None:
         """
-        Save the experiment dictionary to a file.
-        """
-        match self.system:
-            case 'Linux':
-                with mgzip.open(self.exp_dict['experiment']['name'] + '.exp', 'wt+') as j:
-                    json.dump(self.exp_dict, j, indent=4)
-                    j.close()
-            case 'Windows':
-                with gzip.open(self.exp_dict['experiment']['name'] + '.exp', 'wt+') as j:
-                    json.dump(self.exp_dict, j, indent=4)
-                    j.close()
+        Save the experiment dictionary to a chunked experiment file (see ExpStore).
+        Args:
+            mode (str): 'w' to write the whole dictionary, or 'a' to append only the jobs added by merge since the
+                last save, together with the updated experiment metadata. Appending leaves the stored data untouched,
+                except that jobs replaced by merge are dropped from the file.
+            codec (str): The codec used for the chunks ('gzip', 'zstd' or 'lz4'). Defaults to the codec of the
+                existing file, or the fastest available.
+        """
+        file = self.exp_dict['experiment']['name'] + '.exp'
+        if mode == 'a' and os.path.isfile(file):
+            keys = ['experiment'] + list(dict.fromkeys(self.pending))
+            if is_chunked(file):
+                ExpStore(file, codec=codec).append(self.exp_dict, keys, drop=self.dropped)
+            else:
+                record = {key: self.exp_dict[key] for key in keys}
+                record.update({key: None for key in self.dropped})
+                with self.open_exp(file, 'at') as j:
+                    j.write(APPEND_MARKER + json.dumps(record))
+        else:
+            ExpStore(file, codec=codec).write(self.exp_dict)
+        self.pending = []
+        self.dropped = []
         return
-    
-    def load_dict(self, dict_name: str) -> None:
+
+    def load_dict(self, dict_name: str, hashes: list = None) -> None:
         """
-        Load an experiment dictionary from a file.
+        Load an experiment dictionary from a chunked experiment file, or from a gzip stream written by earlier
+        versions, applying any records appended by save_dict(mode='a').
         Args:
             dict_name (str): The name of the dictionary file.
+            hashes (list): Only load these jobs, decompressing only the chunks which hold them. Defaults to every
+                job. Only supported by chunked files.
+        """
+        file = os.path.join(os.getcwd(), dict_name)
+        if is_chunked(file):
+            store = ExpStore(file)
+            keys = None
+            if hashes is not None:
+                keys = ['experiment'] + [h for h in hashes if h is not None]
+                keys += [key for key in ('optical',) if key in store.keys()]
+            data = store.read(keys)
+        else:
+            with self.open_exp(file, 'r') as j:
+                raw = j.read()
+            records = raw.split(APPEND_MARKER.encode())
+            data = json.loads(records[0])
+            for record in records[1:]:
+                for key, value in json.loads(record).items():
+                    if value is None:
+                        data.pop(key, None)
+                    else:
+                        data[key] = value
+        self.exp_dict = data
+        self.pending = []
+        self.dropped = []
+        self.sim_info_table = None
+
+    def open_exp(self, file: str, mode: str) -> object:
+        """
+        Open a compressed experiment file with the compressor used on this platform.
+        Args:
+            file (str): The path to the file.
+            mode (str): The file mode.
+        Returns:
+            object: The open file object.
         """
         match self.system:
             case 'Linux':
-                with mgzip.open(os.path.join(os.getcwd(), dict_name), "r") as j:
-                    data = json.load(j)
+                return mgzip.open(file, mode)
             case 'Windows':
-                with gzip.open(os.path.join(os.getcwd(), dict_name), "r") as j:
-                    data = json.load(j)
-        self.exp_dict = data
+                return gzip.open(file, mode)
+
+    def merge(self, other: object, on_duplicate: str = 'skip') -> list:
+        """
+        Merge the points of another experiment with the same variables into this one.
+        New variable values are appended to the existing ones and the hashes are laid out again so that to_frame
+        and to_cube cover the extended experiment. Points of the grid which were never simulated hold None.
+        Args:
+            other (Results): The results to merge, or an experiment dictionary.
+            on_duplicate (str): What to do with points present in both experiments: 'skip' keeps the existing
+                job, 'replace' uses the new one, dropping the old job, and 'error' raises a ValueError.
+        Returns:
+            list: The variable values of the duplicate points found.
+        Raises:
+            ValueError: If the experiments do not share variables and iterator, or on a duplicate with on_duplicate='error'.
+        """
+        other_dict = other.exp_dict if isinstance(other, Results) else other
+        new = Results()
+        new.exp_dict = other_dict
+
+        exp = self.exp_dict['experiment']
+        variables = exp['variable']
+        other_variables = other_dict['experiment']['variable']
+        if list(variables.keys()) != list(other_variables.keys()):
+            raise ValueError('Experiments must share the same variables to be merged')
+        iterator = self.iterator()
+        if new.iterator() != iterator:
+            raise ValueError('Experiments must use the same iterator to be merged')
+
+        old_coords = list(zip(*[value.tolist() for value in self.coordinates().values()]))
+        new_coords = list(zip(*[value.tolist() for value in new.coordinates().values()]))
+        old_hashes = exp['hashes']
+        new_hashes = other_dict['experiment']['hashes']
+
+        match iterator:
+            case 'product':
+                merged = {key: list(value) for key, value in variables.items()}
+                for key, value in other_variables.items():
+                    known = set(merged[key])
+                    merged[key] += [v for v in value if v not in known and not known.add(v)]
+                lookup = [{v: i for i, v in enumerate(value)} for value in merged.values()]
+                shape = tuple(len(value) for value in merged.values())
+
+                hashes = [None] * int(np.prod(shape))
+                for coord, h in zip(old_coords, old_hashes):
+                    hashes[np.ravel_multi_index(tuple(l[c] for l, c in zip(lookup, coord)), shape)] = h
+                positions = [np.ravel_multi_index(tuple(l[c] for l, c in zip(lookup, coord)), shape) for coord in new_coords]
+            case 'zip':
+                merged = {key: list(value) for key, value in zip(variables, zip(*old_coords))}
+                hashes = list(old_hashes)
+                index = {coord: i for i, coord in enumerate(old_coords)}
+                positions = []
+                for coord in new_coords:
+                    if coord not in index:
+                        index[coord] = len(hashes)
+                        hashes.append(None)
+                        for key, c in zip(merged, coord):
+                            merged[key].append(c)
+                    positions.append(index[coord])
+
+        if on_duplicate not in ('skip', 'replace', 'error'):
+            raise ValueError('on_duplicate must be one of skip, replace or error')
+        incoming = [(coord, position, h) for coord, position, h in zip(new_coords, positions, new_hashes) if h is not None and h in other_dict]
+        duplicates = [coord for coord, position, h in incoming if hashes[position] is not None and hashes[position] in self.exp_dict]
+        if duplicates and on_duplicate == 'error':
+            raise ValueError('Duplicate point in merge: ' + str(dict(zip(variables.keys(), duplicates[0]))))
+
+        if 'optical' in other_dict:
+            self.exp_dict.setdefault('optical', {}).update(other_dict['optical'])
+            self.pending.append('optical')
+
+        for coord, position, h in incoming:
+            if on_duplicate == 'skip' and hashes[position] is not None and hashes[position] in self.exp_dict:
+                continue
+            old = hashes[position]
+            if old is not None and old != h and old in self.exp_dict:
+                del self.exp_dict[old]
+                self.pending = [key for key in self.pending if key != old]
+                self.dropped.append(old)
+            hashes[position] = h
+            self.exp_dict[h] = other_dict[h]
+            self.pending.append(h)
+
+        exp['variable'] = merged
+        exp['hashes'] = hashes
+        exp['points'] = len(hashes)
+        exp['dimensions'] = len(merged)
+        exp['iterator'] = iterator
+        self.sim_info_table = None
+        return duplicates
 
     def write_exp_data(self, exp: dict) -> None:
         """
@@ -208,6 +459,9 @@ class Results:
 
         if self.experiment.hashes != None:
             exp['hashes'] = self.experiment.hashes
+
+        if getattr(self.experiment, 'iterator', None) != None:
+            exp['iterator'] = self.experiment.iterator
     
     def variables(self) -> dict:
         """
@@ -225,6 +479,149 @@ class Results:
         """
         return self.exp_dict['experiment']['hashes']
 
+    def iterator(self) -> str:
+        """
+        Get the iterator used to combine the variables of the experiment.
+        Older experiment files do not record it, in which case it is inferred from the number of points.
+        Returns:
+            str: 'product' or 'zip'.
+        """
+        exp = self.exp_dict['experiment']
+        if 'iterator' in exp:
+            return exp['iterator']
+        lengths = [len(v) for v in exp['variable'].values()]
+        if len(exp['hashes']) == int(np.prod(lengths)):
+            return 'product'
+        return 'zip'
+
+    def coordinates(self, idx: np.ndarray = None) -> dict:
+        """
+        Get the value of every variable at each point of the experiment.
+        Args:
+            idx (numpy.ndarray): The indices of the points to return. Defaults to all points.
+        Returns:
+            dict: The variable values, one array per variable, aligned with the hashes.
+        """
+        variables = self.exp_dict['experiment']['variable']
+        points = len(self.exp_dict['experiment']['hashes'])
+        if idx is None:
+            idx = np.arange(points)
+        match self.iterator():
+            case 'product':
+                shape = tuple(len(v) for v in variables.values())
+                axes = np.unravel_index(idx, shape)
+                return {key: np.asarray(value)[axis] for (key, value), axis in zip(variables.items(), axes)}
+            case 'zip':
+                coords = {}
+                for key, value in variables.items():
+                    if len(value) < points:
+                        value = np.asarray(list(value) + [None] * (points - len(value)), dtype=object)
+                    coords[key] = np.asarray(value)[idx]
+                return coords
+
+    def point_indices(self, **conditions: dict) -> np.ndarray:
+        """
+        Find the points of the experiment matching conditions on the variables.
+        Only the variable values are inspected, so no job data is touched.
+        Args:
+            **conditions: One condition per variable. A condition is a single value, a list, tuple or set of values,
+                a slice giving an inclusive (start, stop) range, or a callable returning a boolean mask.
+        Returns:
+            numpy.ndarray: The indices of the matching points, in experiment order.
+        Raises:
+            KeyError: If a condition names a variable that is not part of the experiment.
+        """
+        variables = self.exp_dict['experiment']['variable']
+        for key in conditions:
+            if key not in variables:
+                raise KeyError('Variable not in experiment: ' + str(key))
+
+        match self.iterator():
+            case 'product':
+                shape = tuple(len(v) for v in variables.values())
+                axes = [np.flatnonzero(self.match_values(np.asarray(value), conditions[key])) if key in conditions
+                        else np.arange(len(value)) for key, value in variables.items()]
+                grid = np.meshgrid(*axes, indexing='ij')
+                return np.ravel_multi_index(grid, shape).ravel()
+            case 'zip':
+                coords = self.coordinates()
+                mask = np.ones(len(self.exp_dict['experiment']['hashes']), dtype=bool)
+                for key, condition in conditions.items():
+                    mask &= self.match_values(coords[key], condition)
+                return np.flatnonzero(mask)
+
+    @staticmethod
+    def match_values(values: np.ndarray, condition: object) -> np.ndarray:
+        """
+        Evaluate a condition against an array of variable values.
+        Args:
+            values (numpy.ndarray): The variable values.
+            condition (object): A value, a list, tuple or set of values, a slice or a callable.
+        Returns:
+            numpy.ndarray: Boolean mask of the matching values.
+        """
+        if callable(condition):
+            return np.asarray(condition(values), dtype=bool)
+        if isinstance(condition, slice):
+            mask = np.ones(len(values), dtype=bool)
+            if condition.start is not None:
+                mask &= values >= condition.start
+            if condition.stop is not None:
+                mask &= values <= condition.stop
+            return mask
+        if isinstance(condition, (list, tuple, set, np.ndarray)):
+            return np.isin(values, list(condition))
+        return values == condition
+
+    def to_frame(self, fields: list = None, idx: np.ndarray = None) -> 'pandas.DataFrame':
+        """
+        Get the typed sim_info of the experiment as a DataFrame indexed by the variables.
+        Args:
+            fields (list): The sim_info fields to include. Defaults to every numeric field.
+            idx (numpy.ndarray): The indices of the points to include. Defaults to all points.
+        Returns:
+            pandas.DataFrame: One row per point with a MultiIndex built from experiment['variable'], a 'hash'
+                column and one float64 column per sim_info field. Points without results hold NaN.
+        """
+        hashes = self.exp_dict['experiment']['hashes']
+        if idx is None:
+            if fields is None:
+                sim_info = self.get_sim_info()
+            else:
+                sim_info = SimInfo(self.exp_dict, fields=fields)
+            idx = np.arange(len(hashes))
+        else:
+            sim_info = SimInfo(self.exp_dict, hashes=[hashes[i] for i in idx], fields=fields)
+
+        coords = self.coordinates(idx)
+        import pandas as pd
+        index = pd.MultiIndex.from_arrays(list(coords.values()), names=list(coords.keys()))
+        frame = pd.DataFrame(sim_info.values, index=index, columns=sim_info.fields)
+        frame.insert(0, 'hash', sim_info.hashes)
+        return frame
+
+    def select(self, fields: list = None, **conditions: dict) -> 'pandas.DataFrame':
+        """
+        Get the typed sim_info of the points matching conditions on the variables.
+        The conditions are resolved against the variable values first, so only the matching jobs are converted.
+        Args:
+            fields (list): The sim_info fields to include. Defaults to every numeric field.
+            **conditions: One condition per variable, see point_indices.
+        Returns:
+            pandas.DataFrame: The matching rows of to_frame.
+        """
+        return self.to_frame(fields, self.point_indices(**conditions))
+
+    def get_sim_info(self) -> SimInfo:
+        """
+        Get the sim_info of every job as a typed array. The conversion is done once and cached.
+        Returns:
+            SimInfo: The typed sim_info, one row per hash in the experiment.
+        """
+        if self.sim_info_table is None:
+            self.sim_info_table = SimInfo(self.exp_dict)
+        return self.sim_info_table
+
     def remove_job_list(self, j: object) -> None:
         """
         Mark a job for removal.
@@ -264,6 +661,9 @@ class Results:
             self.write_jv_to_job(j)
         else:
             pass
+
+        if j.optical and self.optical_harvest is not None:
+            self.write_optical_to_job(j)
         
     def write_sim_to_job(self, j: object) -> None:
         """
@@ -271,9 +671,7 @@ class Results:
         Args:
             j (object): The job object.
         """
-        with open(os.path.join(j.path,'sim.json'), 'r') as r:
-            sim = json.load(r)
-        results = sim
+        results = read_sim(j.path)
         self.exp_dict[j.hash]['sim'] = results
 
     def write_sim_info_to_job(self, j: object) -> None:
@@ -292,37 +690,65 @@ class Results:
         Args:
             j (object): The job object.
         """
-        with open(os.path.join(j.path,'jv.csv'), 'r') as r:
-            jv = pd.read_csv(r, comment='#', delimiter=' ', header=None)
-            v_jv = list(jv[0].to_numpy())
-            j_jv = list(jv[1].to_numpy())
+        jv = read_oghma_csv(os.path.join(j.path,'jv.csv'))
+        v_jv = jv.y.tolist()
+        j_jv = jv.data.tolist()
         self.exp_dict[j.hash]['jv'] = {}
         self.exp_dict[j.hash]['jv']['j'] = j_jv
         self.exp_dict[j.hash]['jv']['v'] = v_jv
 
 
     
+    def to_cube(self, param: str) -> np.ndarray:
+        """
+        Reshape a sim_info parameter into an array with one axis per variable.
+        Args:
+            param (str): The sim_info parameter.
+        Returns:
+            numpy.ndarray: The values, shaped by the lengths of experiment['variable'] in order. Missing points are NaN.
+        Raises:
+            ValueError: If the experiment was not built with the 'product' iterator.
+        """
+        if self.iterator() != 'product':
+            raise ValueError('A cube can only be built for experiments using the product iterator')
+        shape = tuple(len(v) for v in self.exp_dict['experiment']['variable'].values())
+        sim_info = self.get_sim_info()
+        if param in sim_info.fields:
+            column = sim_info.column(param)
+        else:
+            column = SimInfo(self.exp_dict, fields=[param]).column(param)
+        return column.reshape(shape)
+
+    def cube_slices(self, params: list) -> object:
+        """
+        Iterate over 1-D slices along the first variable for one or more sim_info parameters.
+        Args:
+            params (list): The sim_info parameters.
+        Yields:
+            tuple: The values of the other variables, the values of the first variable and an array of shape
+                (len(first variable), len(params)) holding the parameters along the slice.
+        """
+        values = list(self.exp_dict['experiment']['variable'].values())
+        cubes = np.stack([self.to_cube(param) for param in params], axis=-1)
+        x = np.asarray(values[0])
+        for idx in np.ndindex(cubes.shape[1:-1]):
+            prod = tuple(values[i + 1][k] for i, k in enumerate(idx))
+            yield prod, x, cubes[(slice(None),) + idx]
+
     def convert_exp_file_to_igor(self, exp_dict_dir: str = '', param: str = '') -> None:
         """
         Convert experiment results to IGOR format.
+        One file is written per combination of the variables other than the first, holding the first variable
+        and every requested parameter as columns.
         Args:
             exp_dict_dir (str): The directory of the experiment dictionary.
-            param (str): The parameter to convert.
+            param (str): The parameter to convert, or a list of parameters to write together.
         """
-        keys = self.exp_dict['experiment']['variable'].keys()
-        values = self.exp_dict['experiment']['variable'].values()
-        Zeroth_key = list(keys)[0]
-        Zeroth_values =list(values)[0]
-        x = Zeroth_values
-        list_values = list(values)[1:]
-        product = list(itertools.product(*values))
-        product_miZ = list(itertools.product(*list_values))
-        for prod in product_miZ:
-            idx = [self.match_conditions(prod, p) for p in product]
-            idx = [i for i, x in enumerate(idx) if x]
-            y = [self.exp_dict[self.exp_dict['experiment']['hashes'][i]]['sim_info'][param] for i in idx]
-            self.save_as_igor_file(list(keys), param, product[idx[-1]], x, y)
-    
+        params = [param] if isinstance(param, str) else list(param)
+        keys = list(self.exp_dict['experiment']['variable'].keys())
+        for prod, x, y in self.cube_slices(params):
+            self.save_as_igor_file(keys, params, (x[-1],) + prod, x, y)
+
     @staticmethod
     def match_conditions(prod: tuple, product: tuple) -> bool:
         """
@@ -336,31 +762,28 @@ class Results:
         if prod[:] == product[1:]:
             return True
         return False
-    
+
     @staticmethod
     def save_as_igor_file(keys: list, param: str, last_prod: tuple, x: list, y: list) -> None:
         """
         Save experiment results as an IGOR file.
         Args:
             keys (list): The variable keys.
-            param (str): The parameter name.
+            param (str): The parameter name, or a list of parameter names.
             last_prod (tuple): The last product values.
             x (list): The x-axis values.
-            y (list): The y-axis values.
+            y (list): The y-axis values, one column per parameter.
         """
-        header = '##columns='+str(keys[0])+' '+ str(param) + ';\n' 
-        data = pd.DataFrame()
-        data[0] = x
-        data[1] = y
+        params = [param] if isinstance(param, str) else list(param)
+        header = '##columns=' + str(keys[0]) + ' ' + ' '.join(str(p) for p in params) + ';'
+        data = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
         ctime = datetime.datetime.now()
         strtime = ctime.strftime("%Y%m%d%H")
         file_name = strtime + "_"
         for i in range(1,len(keys)):
             file_name +=  str(last_prod[i]) + str(keys[i]) + '_'
         file_name += 'exp.dat'
-        with open(file_name, 'w') as fp:
-            fp.write(header)
-            data.to_csv(fp, sep=' ',index=False, header=None, lineterminator='\n')
+        np.savetxt(file_name, data, fmt='%.15g', delimiter=' ', header=header, comments='')
 
     def read_sim_info(self, param: str) -> object:
         """
@@ -6,9 +6,10 @@ and saving configurations for simulations involving optical components.
 
 import ujson as json
 import os
-import secrets
-from glob import glob
-from importlib import resources
+
+from .Defaults import LazyComponent, load_default, resource_path
+from .Identifiers import new_id
+from .SimFile import update_sim
 
 
 class Optical:
@@ -24,18 +25,18 @@ class Optical:
         Lasers (Lasers): Instance of the Lasers class.
         dest_dir (str): The destination directory for saving or loading data.
     """
+    Light = LazyComponent('Light')
+    LightSources = LazyComponent('LightSources')
+    LightSource = LazyComponent('LightSource')
+    LightIntensity = LazyComponent('LightIntensity')
+    Lasers = LazyComponent('Lasers')
+
     def __init__(self) -> None:
         """
-        Initialize the Optical class and its subcomponents.
+        Initialize the Optical class. The subcomponents are constructed when first accessed.
         """
         self.json_name = ''
         self.name = ''
-
-        self.Light = Light()
-        self.LightSources = LightSources()
-        self.LightSource = LightSource()
-        self.LightIntensity = LightIntensity()
-        self.Lasers = Lasers()
         self.dest_dir = ''
 
     def load_config(self, file: str) -> dict:
@@ -46,9 +47,7 @@ class Optical:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Optical.configs.' + self.json_name, file + '.json')
 
     def find_file(self, file: str) -> str:
         """
@@ -58,8 +57,7 @@ class Optical:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(resources.files("PyOghma.Sim_Defaults.Optical.configs."+self.json_name).joinpath(file)).args[0]
-        return config_dir
+        return resource_path('Optical.configs.' + self.json_name, file)
 
     def set_format(self) -> None:
         """
@@ -81,13 +79,7 @@ class Optical:
         """
         Update the JSON file with the current data.
         """
-        with open(os.path.join(self.dest_dir,'sim.json'), 'r') as j:
-            data = json.load(j)
-
-        data['optical'].update(self.json_format)
-
-        with open(os.path.join(self.dest_dir,'sim.json'), 'w') as j:
-            j.write(json.dumps(data, indent=4))
+        update_sim(self.dest_dir, self.json_format, 'optical')
 
         return
 
@@ -213,8 +205,8 @@ class LightSource:
         self.json_name = 'light_sources'
         self.json_sub_heading = 'lights'
         self.light = self.load_config('default')
-        self.light['id'] = 'id' + str(secrets.token_hex(8))
-        self.light['virtual_spectra']['id'] = 'id' + str(secrets.token_hex(8))
+        self.light['id'] = new_id('LightSource')
+        self.light['virtual_spectra']['id'] = new_id('LightSource/virtual_spectra')
 
     def load_config(self, file: str) -> dict:
         """
@@ -224,9 +216,7 @@ class LightSource:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Optical.configs.' + self.json_name, file + '.json')
 
     def find_file(self, file: str) -> str:
         """
@@ -236,8 +226,7 @@ class LightSource:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(resources.files("PyOghma.Sim_Defaults.Optical.configs."+self.json_name).joinpath(file)).args[0]
-        return config_dir
+        return resource_path('Optical.configs.' + self.json_name, file)
 
     def set_light_spectra(self, spectra_name: str) -> None:
         """
@@ -300,11 +289,9 @@ class Laser:
         Returns:
             str: The path to the found file.
         """
-        config_dir = os.path.join('*', 'Optical', 'configs', self.json_name, file)
-        print(config_dir)
-        filename = glob(config_dir)[0]
-        self.loaded_filename = str(filename)
-        return str(filename)
+        filename = resource_path('Optical.configs.' + self.json_name, file)
+        self.loaded_filename = filename
+        return filename
 
     def load_config(self, file: str) -> dict:
         """
@@ -314,9 +301,7 @@ class Laser:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Optical.configs.' + self.json_name, file + '.json')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,336 @@
+"""
+This module indexes the parameters of a sim.json once, so that a parameter given by its key (e.g. 'mue_y'), a
+partial path (e.g. 'PM6:Y6/mue_y' or 'layer2.mue_y'), a full path or the human readable name shown by
+OghmaNano (e.g. 'epitaxy/PM6:Y6/Drift diffusion/Electron mobility y') resolves to its full JSON path with a
+dictionary lookup instead of a walk of the document. Names matching more than one parameter raise an error
+listing them. Paths are returned in the form used by OghmaNano: layers of the epitaxy are named layerN and
+parts are separated by '.' for ML configurations and by '/' for fits.
+"""
+
+import os
+import difflib
+import ujson as json
+
+from .SimFile import locate, exists, read_text, read_sim, staged, staged_cache
+from .JsonPatch import pointer
+
+LABELS = {
+    'shape_dos': 'Drift diffusion',
+    'mue_y': 'Electron mobility y',
+    'muh_y': 'Hole mobility y',
+    'Nc': 'Effective density of free electron states',
+    'Nv': 'Effective density of free hole states',
+    'Ntrape': 'Electron trap density',
+    'Ntraph': 'Hole trap density',
+    'Etrape': 'Electron tail slope',
+    'Etraph': 'Hole tail slope',
+    'srhsigman_e': 'Free electron to Trapped electron',
+    'srhsigmap_e': 'Trapped electron to Free hole',
+    'srhsigman_h': 'Trapped hole to Free electron',
+    'srhsigmap_h': 'Free hole to Trapped hole',
+    'Xi': 'Electron affinity',
+    'Eg': 'Band gap',
+    'epsilonr': 'Relative permittivity',
+    'dx': 'Thickness',
+    'Rcontact': 'Series resistance',
+    'Rshunt': 'Shunt resistance',
+    'Dphotoneff': 'Photon efficiency',
+}
+"""Human readable names of sim.json keys, as shown by OghmaNano. Other keys are shown as they are; the human paths
+stored by OghmaNano in the fits section of a sim.json take precedence."""
+
+HUMAN_FIELDS = ('var', 'x', 'y', 'src', 'dest', 'path')
+"""Suffixes of the json_* and human_* field pairs of fitting configurations."""
+
+
+class AmbiguousPathError(KeyError):
+    """
+    Raised when a name matches more than one parameter.
+    Attributes:
+        name (str): The name.
+        paths (list): The full paths matching it.
+    """
+    def __init__(self, name: str, paths: list) -> None:
+        self.name = name
+        self.paths = paths
+        super().__init__(repr(name) + ' matches ' + str(len(paths)) + ' parameters, qualify it with a layer or section: ' + ', '.join(paths))
+
+
+class PathIndex:
+    """
+    Class to resolve parameter names of a sim.json to full JSON paths.
+    Attributes:
+        sim (dict): The parsed sim.json.
+        paths (dict): Full path as a tuple of keys -> the value.
+        keys (dict): Key or lower case human readable name -> the full paths ending with it.
+        aliases (dict): Lower case key, layer name, layer attribute name or human readable name -> the key.
+        human (dict): Full path -> human readable path.
+        cache (dict): Name -> full path, for names already resolved.
+    """
+    def __init__(self, sim: dict) -> None:
+        """
+        Initialize the PathIndex class, walking the document once.
+        Args:
+            sim (dict): The parsed sim.json.
+        """
+        self.sim = sim
+        self.paths = {}
+        self.keys = {}
+        self.aliases = {}
+        self.human = {}
+        self.cache = {}
+
+        names = {}
+        epitaxy = sim.get('epitaxy', {})
+        for idx in range(int(epitaxy.get('segments', 0))):
+            name = epitaxy['segment' + str(idx)].get('name', '')
+            names['layer' + str(idx)] = name
+            for alias in ('segment' + str(idx), name, name.lower().replace(':', '')):
+                self.aliases.setdefault(alias.lower(), set()).add('layer' + str(idx))
+        contacts = {}
+        for idx in range(int(epitaxy.get('contacts', {}).get('segments', 0))):
+            name = epitaxy['contacts'].get('segment' + str(idx), {}).get('name', '')
+            if name:
+                contacts['segment' + str(idx)] = name
+                self.aliases.setdefault(name.lower(), set()).add('segment' + str(idx))
+        for key, label in LABELS.items():
+            self.aliases.setdefault(label.lower(), set()).add(key)
+
+        stack = [((), sim)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                if prefix == ('epitaxy',) and key.startswith('segment') and key[7:].isdigit():
+                    key = 'layer' + key[7:]
+                path = prefix + (key,)
+                if isinstance(value, dict):
+                    stack.append((path, value))
+                    continue
+                self.paths[path] = value
+                self.keys.setdefault(key, []).append(path)
+                if key in LABELS:
+                    self.keys.setdefault(LABELS[key].lower(), []).append(path)
+                self.human[path] = '/'.join(self.label(path, i, names, contacts) for i in range(len(path)))
+        self.learn(sim.get('fits', {}))
+        for path, human in self.human.items():
+            self.keys.setdefault(human.lower(), []).append(path)
+
+    @staticmethod
+    def label(path: tuple, i: int, names: dict, contacts: dict) -> str:
+        """
+        Get the human readable name of a key of a path.
+        Args:
+            path (tuple): The full path.
+            i (int): The position of the key.
+            names (dict): layerN -> layer name.
+            contacts (dict): segmentN -> contact name, for the contacts of the epitaxy.
+        Returns:
+            str: The layer or contact name, the label of the key, or the key.
+        """
+        key = path[i]
+        if path[0] == 'epitaxy' and i == 1:
+            return names.get(key, key)
+        if path[:2] == ('epitaxy', 'contacts') and i == 2:
+            return contacts.get(key, key)
+        return LABELS.get(key, key)
+
+    def learn(self, node: object) -> None:
+        """
+        Take the human readable paths OghmaNano stored with fitting configurations, e.g. 'light/Photon
+        efficiency' for 'optical/light/Dphotoneff', as the human paths of their parameters.
+        Args:
+            node (object): The fits section of the sim.json, searched recursively.
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            for field in HUMAN_FIELDS:
+                json_path, human = node.get('json_' + field), node.get('human_' + field)
+                if not isinstance(json_path, str) or not isinstance(human, str) or not human:
+                    continue
+                path = tuple(self.split(json_path))
+                if path not in self.paths:
+                    try:
+                        path = self.find(json_path)
+                    except KeyError:
+                        continue
+                self.human[path] = human
+                label = human.split('/')[-1]
+                if label != path[-1]:
+                    self.aliases.setdefault(label.lower(), set()).add(path[-1])
+            stack.extend(node.values())
+
+    def split(self, name: str) -> list:
+        """
+        Split a name into its parts. Names holding '/' are split on it, others on '.'.
+        Args:
+            name (str): The name.
+        Returns:
+            list: The parts.
+        """
+        name = name.replace('\\/', '/')
+        return [part for part in name.split('/' if '/' in name else '.') if part]
+
+    def matches(self, part: str, key: str) -> bool:
+        """
+        Check whether a part of a name refers to a key.
+        Args:
+            part (str): The part.
+            key (str): The key.
+        Returns:
+            bool: True if the part is the key or one of its aliases.
+        """
+        return part == key or key in self.aliases.get(part.lower(), ())
+
+    def find(self, name: str) -> tuple:
+        """
+        Find the parameter a name refers to.
+        Args:
+            name (str): A key, partial path, full path or human readable path, separated by '.' or '/'.
+        Returns:
+            tuple: The full path as a tuple of keys.
+        Raises:
+            KeyError: If no parameter matches; the message names the closest keys.
+            AmbiguousPathError: If several parameters match.
+        """
+        if name in self.cache:
+            return self.cache[name]
+        if name.lower() in self.keys and len(self.keys[name.lower()]) == 1:
+            self.cache[name] = self.keys[name.lower()][0]
+            return self.cache[name]
+        parts = self.split(name)
+        if not parts:
+            raise KeyError('Empty parameter name')
+        leaves = [parts[-1]] + sorted(self.aliases.get(parts[-1].lower(), ()))
+        candidates = list(dict.fromkeys(path for key in leaves for path in self.keys.get(key, [])))
+        found = []
+        for path in candidates:
+            position = 0
+            for part in parts[:-1]:
+                while position < len(path) - 1 and not self.matches(part, path[position]):
+                    position += 1
+                if position == len(path) - 1:
+                    break
+                position += 1
+            else:
+                found.append(path)
+        if len(found) > 1:
+            exact = [path for path in found if len(path) == len(parts)]
+            found = exact if len(exact) == 1 else found
+        if not found:
+            options = difflib.get_close_matches(parts[-1], list(self.keys), n=3)
+            hint = ' (did you mean ' + ', '.join(options) + '?)' if options else ''
+            raise KeyError('No parameter ' + repr(name) + ' in sim.json' + hint)
+        if len(found) > 1:
+            raise AmbiguousPathError(name, sorted('.'.join(path) for path in found))
+        self.cache[name] = found[0]
+        return found[0]
+
+    def json_path(self, name: str, sep: str = '.') -> str:
+        """
+        Resolve a name to its full JSON path.
+        Args:
+            name (str): The name.
+            sep (str): The separator, '.' for ML configurations and '/' for fits.
+        Returns:
+            str: The JSON path, e.g. 'epitaxy.layer2.shape_dos.mue_y'.
+        """
+        return sep.join(self.find(name))
+
+    def pointer(self, name: str) -> str:
+        """
+        Resolve a name to the JSON Pointer of the parameter in sim.json, where layers are named segmentN.
+        Args:
+            name (str): The name.
+        Returns:
+            str: The pointer, e.g. '/epitaxy/segment2/shape_dos/mue_y'.
+        """
+        keys = list(self.find(name))
+        if keys[0] == 'epitaxy' and keys[1].startswith('layer'):
+            keys[1] = 'segment' + keys[1][5:]
+        return pointer(keys)
+
+    def human_path(self, name: str) -> str:
+        """
+        Resolve a name to the human readable path shown by OghmaNano.
+        Args:
+            name (str): The name.
+        Returns:
+            str: The human readable path, e.g. 'epitaxy/PM6:Y6/Drift diffusion/Electron mobility y'.
+        """
+        return self.human[self.find(name)]
+
+    def value(self, name: str) -> object:
+        """
+        Get the value of a parameter in the indexed sim.json.
+        Args:
+            name (str): The name.
+        Returns:
+            object: The value.
+        """
+        return self.paths[self.find(name)]
+
+
+_indexes = {}
+
+
+def path_index(source: str) -> PathIndex:
+    """
+    Get the index of a simulation. Indexes are built once per sim.json and rebuilt only if the file changes. The
+    index of a staged simulation is kept with it, rebuilt after each write and dropped when it is unstaged.
+    Args:
+        source (str): The simulation directory, staged or not, or the path to its sim.json.
+    Returns:
+        PathIndex: The index.
+    """
+    if staged(source):
+        cache = staged_cache(source)
+        if 'index' not in cache:
+            cache['index'] = PathIndex(read_sim(source))
+        return cache['index']
+    sim_dir = source if os.path.isdir(source) else os.path.dirname(source)
+    file = locate(sim_dir)[1]
+    stamp = os.stat(file).st_mtime_ns
+    if file not in _indexes or _indexes[file][0] != stamp:
+        _indexes[file] = (stamp, PathIndex(json.loads(read_text(sim_dir))))
+    return _indexes[file][1]
+
+
+def resolve_param(dest_dir: str, param: str, sep: str = '.') -> tuple:
+    """
+    Resolve a parameter against the sim.json of a simulation if it has one. Without a sim.json the parameter is
+    taken to be a full path already, as configurations may be written before the simulation exists.
+    Args:
+        dest_dir (str): The simulation directory.
+        param (str): The parameter.
+        sep (str): The separator of the returned path.
+    Returns:
+        tuple: The full JSON path and the human readable path.
+    """
+    if not dest_dir or not exists(dest_dir):
+        return param, param
+    index = path_index(dest_dir)
+    return index.json_path(param, sep), index.human_path(param)
+
+
+if __name__ == '__main__':
+    """
+    Example usage: resolve parameters of the standard device and time the lookups.
+    """
+    import time
+
+    start = time.perf_counter()
+    A = path_index(os.path.join(os.getcwd(), 'standard_device'))
+    print(f'indexed {len(A.paths)} parameters in {(time.perf_counter() - start) * 1e3:.1f} ms')
+    for name in ('PM6:Y6/mue_y', 'layer2.Etraph', 'pm6y6.dx', 'epitaxy/PM6:Y6/Drift diffusion/Electron mobility y',
+                 'epitaxy/layer2/shape_dos/mue_y', 'mue_y', 'mue_yy'):
+        try:
+            print(f'{name:<52} {A.json_path(name):<36} {A.human_path(name)}')
+        except KeyError as e:
+            print(f'{name:<52} {e.args[0]}')
+    start = time.perf_counter()
+    for _ in range(100000):
+        A.json_path('PM6:Y6/mue_y')
+    print(f'{(time.perf_counter() - start) * 10:.2f} us per lookup')
@@ -0,0 +1,272 @@
+"""
+This module checks a sweep before any job is queued. The JSON paths written into sim.json by ML inputs and
+patches, fit variables, rules and duplicates, and the values a sweep will set, are resolved against the source
+sim.json, and their types and ranges are checked. Every problem of the sweep is collected in one pass and
+reported together, instead of failing one job at a time when oghma_core runs.
+"""
+
+import os
+import difflib
+import numpy as np
+
+from .PathIndex import PathIndex, path_index
+
+RANGES = {
+    'mue_x': (0.0, np.inf), 'mue_y': (0.0, np.inf), 'mue_z': (0.0, np.inf),
+    'muh_x': (0.0, np.inf), 'muh_y': (0.0, np.inf), 'muh_z': (0.0, np.inf),
+    'Nc': (0.0, np.inf), 'Nv': (0.0, np.inf), 'Ntrape': (0.0, np.inf), 'Ntraph': (0.0, np.inf),
+    'Etrape': (0.0, np.inf), 'Etraph': (0.0, np.inf),
+    'srhsigman_e': (0.0, np.inf), 'srhsigmap_e': (0.0, np.inf), 'srhsigman_h': (0.0, np.inf), 'srhsigmap_h': (0.0, np.inf),
+    'Eg': (0.0, np.inf), 'epsilonr': (0.0, np.inf), 'dx': (0.0, np.inf),
+    'Psun': (0.0, np.inf), 'set_point': (0.0, np.inf),
+}
+"""Allowed (minimum, maximum) of values by key, checked wherever the key appears."""
+
+PATH_FIELDS = ('json_var', 'json_x', 'json_y', 'json_src', 'json_dest')
+"""Fields of ML and fitting configurations which hold a path into sim.json."""
+
+
+class PreflightError(ValueError):
+    """
+    Raised when a sweep fails its checks.
+    Attributes:
+        problems (list): Tuples of (source, path, message), one per problem.
+    """
+    def __init__(self, problems: list) -> None:
+        self.problems = problems
+        lines = [str(source) + ': ' + str(path) + ': ' + message for source, path, message in problems]
+        super().__init__(str(len(problems)) + ' problem(s) found before launching the sweep:\n' + '\n'.join(lines))
+
+
+def is_number(value: object) -> bool:
+    """
+    Check whether a sim.json value is a number. OghmaNano stores some numbers as strings.
+    Args:
+        value (object): The value.
+    Returns:
+        bool: True for numbers and numeric strings, False for booleans, other strings and sections.
+    """
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class Preflight:
+    """
+    Class to check a sweep against the source simulation before launching it.
+    Attributes:
+        index (PathIndex): The index of the source simulation, through which every path is resolved.
+        sim (dict): The parsed sim.json of the source simulation.
+        problems (list): Tuples of (source, path, message) found so far.
+    """
+    def __init__(self, source: object) -> None:
+        """
+        Initialize the Preflight class.
+        Args:
+            source (object): The source simulation directory, the path to its sim.json, or the parsed sim.json.
+        """
+        self.index = PathIndex(source) if isinstance(source, dict) else path_index(source)
+        self.sim = self.index.sim
+        self.problems = []
+
+    def report(self, source: str, path: str, message: str) -> None:
+        """
+        Record a problem.
+        Args:
+            source (str): What the path came from.
+            path (str): The path.
+            message (str): The problem.
+        """
+        self.problems.append((source, path, message))
+
+    def full_path(self, path: str) -> tuple:
+        """
+        Split a path into the keys oghma_core follows. Only full paths are resolved by the core; layers of the
+        epitaxy may be named layerN or segmentN.
+        Args:
+            path (str): The path, e.g. 'epitaxy/layer2/shape_dos/mue_y' or 'optical.light.sun'.
+        Returns:
+            tuple: The keys, with layers named layerN as in the index.
+        """
+        keys = self.index.split(path)
+        if len(keys) > 1 and keys[0] == 'epitaxy' and keys[1].startswith('segment') and keys[1][7:].isdigit():
+            keys[1] = 'layer' + keys[1][7:]
+        return tuple(keys)
+
+    def explain(self, path: str, keys: tuple) -> str:
+        """
+        Describe why a path is not a full path to a value of sim.json.
+        Args:
+            path (str): The path.
+            keys (tuple): Its keys, from full_path.
+        Returns:
+            str: The problem, suggesting the full path when the path names a parameter partially.
+        """
+        if any(known[:len(keys)] == keys for known in self.index.paths):
+            return 'points at a section, not a value'
+        try:
+            return 'not a full path, did you mean ' + self.index.json_path(path, '/' if '/' in path else '.') + '?'
+        except KeyError as e:
+            return e.args[0]
+
+    def check_path(self, path: str, values: object = None, source: str = 'sweep', log: bool = False) -> bool:
+        """
+        Check that a path points at a value of sim.json and, if given, that the values a sweep sets there have the
+        right type and are in range.
+        Args:
+            path (str): The path.
+            values (object): A value or array of values to be set at the path.
+            source (str): What the path came from, for the report.
+            log (bool): Whether the values are sampled logarithmically, so must be positive.
+        Returns:
+            bool: True if no problem was found.
+        """
+        count = len(self.problems)
+        if not isinstance(path, str) or not path:
+            self.report(source, path, 'empty path')
+            return False
+        keys = self.full_path(path)
+        if keys not in self.index.paths:
+            self.report(source, path, self.explain(path, keys))
+            return False
+        current = self.index.paths[keys]
+        if isinstance(current, list):
+            self.report(source, path, 'points at a list, not a value')
+            return False
+        if values is None:
+            return True
+
+        key = keys[-1]
+        if isinstance(values, str) or isinstance(values, bool):
+            values = [values]
+        values = np.asarray(values, dtype=object).ravel()
+        if is_number(current):
+            numeric = np.array([is_number(v) for v in values], dtype=bool)
+            if not numeric.all():
+                self.report(source, path, str(int((~numeric).sum())) + ' value(s) are not numbers, e.g. ' + repr(values[~numeric][0]))
+            numbers = np.array([float(v) for v in values[numeric]], dtype=float)
+            if not np.isfinite(numbers).all():
+                self.report(source, path, 'values are not finite')
+            numbers = numbers[np.isfinite(numbers)]
+            lo, hi = RANGES.get(key, (-np.inf, np.inf))
+            if log:
+                lo = max(lo, 0.0)
+            outside = (numbers < lo) | (numbers > hi) | (log & (numbers <= 0))
+            if outside.any():
+                self.report(source, path, str(int(outside.sum())) + ' value(s) outside [' + str(lo) + ', ' + str(hi) + '], e.g. ' + repr(numbers[outside][0]))
+        elif str(current) in ('True', 'False', 'true', 'false'):
+            bad = [v for v in values if str(v) not in ('True', 'False', 'true', 'false')]
+            if bad:
+                self.report(source, path, 'expects True or False, got ' + repr(bad[0]))
+        return len(self.problems) == count
+
+    def check_range(self, path: str, low: object, high: object, source: str, log: bool = False) -> None:
+        """
+        Check a minimum and maximum given for a path.
+        Args:
+            path (str): The path.
+            low (object): The minimum.
+            high (object): The maximum.
+            source (str): What the range came from.
+            log (bool): Whether the range is sampled logarithmically.
+        """
+        if not (is_number(low) and is_number(high)):
+            self.report(source, path, 'minimum and maximum must be numbers')
+        elif float(low) > float(high):
+            self.report(source, path, 'minimum ' + str(low) + ' is above maximum ' + str(high))
+        else:
+            self.check_path(path, [low, high], source, log)
+
+    def check_config(self, config: object, source: str = None) -> None:
+        """
+        Check an ML or fitting configuration: ml_input, ml_sim_patch, Variable, Rule, Dupe or any object whose data
+        holds json_var, json_x, json_y, json_src or json_dest. Disabled entries are skipped.
+        Args:
+            config (object): The object, or its data dictionary.
+            source (str): What the configuration is, for the report. Defaults to its class name.
+        """
+        data = getattr(config, 'data', config)
+        source = source or type(config).__name__
+        if any(str(data.get(flag)) == 'False' for flag in ('random_var_enabled', 'ml_patch_enabled', 'fit_var_enabled',
+                                                            'fit_rule_enabled', 'duplicate_var_enabled')):
+            return
+        for field in PATH_FIELDS:
+            if field not in data:
+                continue
+            path = data[field]
+            if field == 'json_var' and 'min' in data and 'max' in data:
+                log = data.get('random_distribution') == 'log' or str(data.get('log_fit')) == 'True'
+                if self.check_path(path, source=source):
+                    self.check_range(path, data['min'], data['max'], source, log)
+            elif field == 'json_var' and 'ml_patch_val' in data:
+                self.check_path(path, data['ml_patch_val'], source)
+            else:
+                self.check_path(path, source=source)
+
+    def check_layers(self, *names: str, source: str = 'epitaxy') -> None:
+        """
+        Check that layers exist, by name or by the attribute name Epitaxy.load_existing gives them.
+        Args:
+            *names: The layer names.
+            source (str): What the names came from.
+        """
+        epitaxy = self.sim['epitaxy']
+        layers = [epitaxy['segment' + str(idx)]['name'] for idx in range(epitaxy['segments'])]
+        attributes = [layer.lower().replace(':', '') for layer in layers]
+        for name in names:
+            if name not in layers and name.lower().replace(':', '') not in attributes:
+                options = difflib.get_close_matches(name.lower().replace(':', ''), attributes, n=3)
+                hint = ' (did you mean ' + ', '.join(options) + '?)' if options else ''
+                self.report(source, name, 'layer not found; layers are ' + ', '.join(layers) + hint)
+
+    def check(self, *configs: object) -> list:
+        """
+        Check every configuration and every swept path, collecting all problems.
+        Args:
+            *configs: ML and fitting configurations, lists of them, or dictionaries of path -> values for sweeps.
+        Returns:
+            list: The problems found.
+        """
+        for config in configs:
+            if isinstance(config, dict) and not any(field in config for field in PATH_FIELDS):
+                for path, values in config.items():
+                    self.check_path(path, values)
+            elif isinstance(config, (list, tuple)):
+                self.check(*config)
+            else:
+                self.check_config(config)
+        return self.problems
+
+    def validate(self, *configs: object) -> None:
+        """
+        Check every configuration and raise if anything is wrong.
+        Args:
+            *configs: ML and fitting configurations, lists of them, or dictionaries of path -> values for sweeps.
+        Raises:
+            PreflightError: Listing every problem found.
+        """
+        self.check(*configs)
+        if self.problems:
+            raise PreflightError(self.problems)
+
+
+if __name__ == '__main__':
+    """
+    Example usage: check a few paths and values against the standard device.
+    """
+    A = Preflight(os.path.join(os.getcwd(), 'standard_device'))
+    problems = A.check(
+        {'optical.light.Psun': [0.1, 1.0, 2.0], 'epitaxy.layer2.shape_dos.mue_y': np.geomspace(1e-9, 1e-3, 20)},
+        {'json_var': 'epitaxy/layer2/shape_dos/mue_yy', 'min': 1e-10, 'max': 1e-3, 'log_fit': 'True'},
+        {'json_var': 'epitaxy.layer7.shape_dos.Ntrape', 'min': 1e20, 'max': 1e26, 'random_distribution': 'log'},
+        {'json_var': 'epitaxy.layer2.shape_dos.Etrape', 'min': -0.1, 'max': 0.1, 'random_distribution': 'linear'},
+    )
+    A.check_layers('pm6y6', 'PM6Y7')
+    for problem in A.problems:
+        print(problem)
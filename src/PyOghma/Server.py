@@ -2,17 +2,22 @@
 This module provides functionality for managing and executing simulation jobs on a server. 
 It includes methods for adding jobs, running them in parallel using multiple CPUs, generating 
 commands for execution, and cleaning up simulation directories. The module also defines a 
-job class to represent individual simulation tasks.
+job class to represent individual simulation tasks. A job may carry a JSON Patch against the source
+sim.json instead of a clone; its sim.json is then written by the worker just before the core starts.
+Jobs can be recorded in a journal, one JSON line per job, from which unfinished jobs are reloaded.
 """
 
 import os
 import glob
 import time
-import tqdm
 import shutil
 import secrets
 import platform
 import multiprocessing as mp
+import ujson as json
+
+from .SimFile import read_source, write_sim
+from .JsonPatch import apply
 
 
 class Server:
@@ -31,6 +36,7 @@ class Server:
         sim_dir (str): Directory for simulation files.
         operating_system (str): The operating system of the platform.
         dest_dir (str): The destination directory for job files.
+        journal (str): The journal file jobs are recorded in, or None.
     """
     def __init__(self) -> None:
         """
@@ -48,6 +54,7 @@ class Server:
         self.sim_dir = ""
         self.operating_system = platform.system()
         self.dest_dir = ""
+        self.journal = None
 
     def update_cpu_count(self) -> None:
         """
@@ -64,13 +71,18 @@ class Server:
         """
         self.jobs = []
 
-    def add_job(self, dest_dir: str, hash: str = '', args: str = '') -> None:
+    def add_job(self, dest_dir: str, hash: str = '', args: str = '', patch: list = None, src_dir: str = None,
+                archive: str = None) -> None:
         """
         Add a new job to the server.
         Args:
             dest_dir (str): The destination directory for the job.
             hash (str): The unique hash for the job. Defaults to an empty string.
             args (str): Additional arguments for the job. Defaults to an empty string.
+            patch (list): A JSON Patch against the sim.json of src_dir. If given, the job directory holds nothing
+                until the worker writes the patched sim.json into it.
+            src_dir (str): The source simulation the patch applies to.
+            archive (str): The name of an archive to write the patched sim.json into, as in SimFile.write_sim.
         """
         j = job()
         j.path = self.dest_dir
@@ -79,21 +91,79 @@ class Server:
         j.status = 0
         j.name = hash
         j.hash = hash
+        j.patch = patch
+        j.src_dir = src_dir
+        j.archive = archive
         self.jobs.append(j)
+        if self.journal:
+            with open(self.journal, 'a') as f:
+                f.write(json.dumps(j.spec()) + '\n')
+
+    def set_journal(self, file: str) -> None:
+        """
+        Record every job added from now on, and every job finished by run, in a journal.
+        Args:
+            file (str): The journal, appended to if it exists.
+        """
+        self.journal = file
+
+    def load_journal(self, file: str) -> int:
+        """
+        Add the jobs of a journal which have not finished, e.g. to resume a sweep or to run it on another machine.
+        Args:
+            file (str): The journal.
+        Returns:
+            int: The number of jobs added.
+        """
+        specs = {}
+        done = set()
+        with open(file, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get('status') == 'done':
+                    done.add(entry['hash'])
+                elif 'status' not in entry:
+                    specs[entry['hash']] = entry
+        journal, dest_dir, self.journal = self.journal, self.dest_dir, None
+        for hash, spec in specs.items():
+            if hash not in done:
+                self.dest_dir = spec['path']
+                self.add_job(spec['path'], hash, spec.get('args', ''), spec.get('patch'), spec.get('src_dir'),
+                             spec.get('archive'))
+        self.journal, self.dest_dir = journal, dest_dir
+        return len(specs) - len(done & set(specs))
 
-    def run(self) -> None:
+    def run(self) -> list:
         """
-        Execute all jobs on the server.
+        Execute all jobs on the server. Only jobs whose core exits with status 0 are journalled as done, so jobs
+        which crashed or timed out are added again by load_journal.
+        Returns:
+            list: The hashes of the jobs which failed.
         """
         self.start_time = time.time()
         self.stop_work = False
 
         for i in range(len(self.jobs)):
             self.generate_job_command(self.jobs[i])
+        import tqdm
         pbar = tqdm.tqdm(self.jobs)
+        failed = []
         with mp.Pool(processes=self.cpus) as p:
-            for _ in p.imap_unordered(self.worker, self.jobs):
-               pbar.update()
+            for hash, code, error in p.imap_unordered(self.worker, self.jobs):
+                pbar.update()
+                if code != 0:
+                    failed.append(hash)
+                if self.journal:
+                    entry = {'hash': hash, 'status': 'done'}
+                    if code != 0:
+                        entry.update(status='failed', code=code)
+                    if error:
+                        entry['error'] = error
+                    with open(self.journal, 'a') as f:
+                        f.write(json.dumps(entry) + '\n')
+        return failed
 
     def generate_job_command(self, job: 'job') -> 'job':
         """
@@ -123,16 +193,22 @@ class Server:
         return job
     
     @staticmethod
-    def worker(job: 'job') -> int:
+    def worker(job: 'job') -> tuple:
         """
-        Execute a single job.
+        Execute a single job, writing its sim.json first if it carries a patch. An error writing the sim.json or
+        starting the command fails the job rather than the run.
         Args:
             job (job): The job object.
         Returns:
-            int: Status of the job execution.
+            tuple: The hash of the job, the exit code of its command (124 if the core timed out, -1 if the job could
+                not be started) and the error which stopped it, or None.
         """
-        os.system(job.full_command)
-        return 1
+        try:
+            materialise(job)
+            status = os.system(job.full_command)
+        except Exception as e:
+            return job.hash, -1, '{}: {}'.format(type(e).__name__, e)
+        return job.hash, os.waitstatus_to_exitcode(status) if os.name == 'posix' else status, None
     
     def run_command(self, command: str) -> None:
         """
@@ -160,6 +236,9 @@ class job:
         start_time (float): The start time of the job.
         cpus (int): Number of CPUs allocated for the job.
         status (int): The status of the job.
+        patch (list): A JSON Patch against the sim.json of src_dir, or None for a cloned job.
+        src_dir (str): The source simulation of the patch.
+        archive (str): The name of the archive the patched sim.json is written into, or None.
     """
     def __init__(self) -> None:
         """
@@ -171,6 +250,33 @@ class job:
         self.start_time = 0
         self.cpus = 1
         self.status = 0
+        self.hash = ''
+        self.patch = None
+        self.src_dir = None
+        self.archive = None
+
+    def spec(self) -> dict:
+        """
+        Describe the job for a journal.
+        Returns:
+            dict: The hash, path, arguments, source, patch and archive of the job.
+        """
+        return {'hash': self.hash, 'path': self.path, 'args': self.args, 'src_dir': self.src_dir,
+                'patch': self.patch, 'archive': self.archive}
+
+
+def materialise(job: job) -> None:
+    """
+    Write the sim.json of a job carrying a patch: the source sim.json, read once per process, is patched in memory
+    and written into the job directory. Jobs without a patch are left as they are.
+    Args:
+        job (job): The job.
+    """
+    if job.patch is None:
+        return
+    data = apply(json.loads(read_source(job.src_dir)[0]), job.patch, in_place=True)
+    os.makedirs(job.path, exist_ok=True)
+    write_sim(job.path, data, job.archive)
 
 
 if __name__ == "__main__":
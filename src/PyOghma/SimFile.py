@@ -0,0 +1,293 @@
+"""
+This module reads and writes the sim.json of a simulation wherever it is stored: as a plain file, or as a member
+of the sim.oghma or sim.zip archive next to it. Archives are read and rewritten in memory, without extracting
+them, so components can update a simulation held in an archive exactly as they update a plain sim.json. Clones
+can be written as a single compressed archive holding sim.json (about 14 KB instead of 120 KB for the standard
+device) for cores which accept archived simulations. A simulation can also be staged: its sim.json is held in
+memory under its directory, configured by the components as usual, and never written, e.g. to turn it into a
+JSON Patch against its source.
+"""
+
+import io
+import os
+import zipfile
+import ujson as json
+
+SIM_FILE = 'sim.json'
+"""The name of the simulation file, plain or inside an archive."""
+
+ARCHIVES = ('sim.oghma', 'sim.zip')
+"""The archives searched for sim.json, in order, when there is no plain sim.json."""
+
+_archives = {}
+_sources = {}
+_staged = {}
+_staged_cache = {}
+
+
+def stage(sim_dir: str, data: dict) -> None:
+    """
+    Hold the sim.json of a simulation in memory. Until it is unstaged, reading and writing the simulation use this
+    document instead of the disk; readers share it rather than receiving copies.
+    Args:
+        sim_dir (str): The simulation directory, which need not exist.
+        data (dict): The parsed sim.json.
+    """
+    _staged[os.path.normpath(sim_dir)] = data
+    _staged_cache.pop(os.path.normpath(sim_dir), None)
+
+
+def staged(sim_dir: str) -> bool:
+    """
+    Check whether a simulation is staged in memory.
+    Args:
+        sim_dir (str): The simulation directory.
+    Returns:
+        bool: True if it is staged.
+    """
+    return os.path.normpath(sim_dir) in _staged
+
+
+def unstage(sim_dir: str) -> dict:
+    """
+    Stop holding a simulation in memory.
+    Args:
+        sim_dir (str): The simulation directory.
+    Returns:
+        dict: Its parsed sim.json.
+    """
+    _staged_cache.pop(os.path.normpath(sim_dir), None)
+    return _staged.pop(os.path.normpath(sim_dir))
+
+
+def staged_cache(sim_dir: str) -> dict:
+    """
+    Get a cache of values derived from a staged simulation, e.g. its PathIndex. The cache is emptied whenever the
+    simulation is written and dropped when it is unstaged.
+    Args:
+        sim_dir (str): The staged simulation directory.
+    Returns:
+        dict: The cache.
+    """
+    return _staged_cache.setdefault(os.path.normpath(sim_dir), {})
+
+
+def read_source(sim_dir: str) -> tuple:
+    """
+    Read the sim.json of a source simulation once. It is read again only when the file changes.
+    Args:
+        sim_dir (str): The source simulation directory.
+    Returns:
+        tuple: The text of sim.json and the parsed document, which must not be modified.
+    """
+    file = locate(sim_dir)[1]
+    key = (file, os.stat(file).st_mtime_ns)
+    if key not in _sources:
+        text = read_text(sim_dir)
+        _sources[key] = (text, json.loads(text))
+    return _sources[key]
+
+
+def locate(sim_dir: str) -> tuple:
+    """
+    Find where the sim.json of a simulation is stored. A plain sim.json takes precedence over archives.
+    Args:
+        sim_dir (str): The simulation directory.
+    Returns:
+        tuple: The path of the archive holding sim.json, or None for a plain file, and the path of the file read.
+    Raises:
+        FileNotFoundError: If neither a sim.json nor an archive holding one is found.
+    """
+    plain = os.path.join(sim_dir, SIM_FILE)
+    if os.path.isfile(plain):
+        return None, plain
+    for name in ARCHIVES:
+        archive = os.path.join(sim_dir, name)
+        if os.path.isfile(archive) and zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive, 'r') as z:
+                if SIM_FILE in z.namelist():
+                    return archive, archive
+    raise FileNotFoundError('No ' + SIM_FILE + ' in ' + sim_dir + ' or its ' + ' or '.join(ARCHIVES))
+
+
+def exists(sim_dir: str) -> bool:
+    """
+    Check whether a directory holds a simulation.
+    Args:
+        sim_dir (str): The directory.
+    Returns:
+        bool: True if it holds a sim.json, plain or archived.
+    """
+    if staged(sim_dir):
+        return True
+    try:
+        locate(sim_dir)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def read_text(sim_dir: str) -> str:
+    """
+    Read the sim.json of a simulation as text.
+    Args:
+        sim_dir (str): The simulation directory.
+    Returns:
+        str: The contents of sim.json.
+    """
+    if staged(sim_dir):
+        return json.dumps(_staged[os.path.normpath(sim_dir)], indent=4)
+    archive, file = locate(sim_dir)
+    if archive is None:
+        with open(file, 'r') as j:
+            return j.read()
+    with zipfile.ZipFile(archive, 'r') as z:
+        return z.read(SIM_FILE).decode('utf-8')
+
+
+def read_sim(sim_dir: str) -> dict:
+    """
+    Read the sim.json of a simulation.
+    Args:
+        sim_dir (str): The simulation directory.
+    Returns:
+        dict: The parsed sim.json.
+    """
+    if staged(sim_dir):
+        return _staged[os.path.normpath(sim_dir)]
+    return json.loads(read_text(sim_dir))
+
+
+def archive_bytes(members: dict, existing: str = None, level: int = 6) -> bytes:
+    """
+    Build a zip archive in memory. Members are stored with a fixed timestamp, so the same contents always give
+    the same bytes.
+    Args:
+        members (dict): File name -> text or bytes of the members to write.
+        existing (str): An archive whose other members are kept.
+        level (int): The deflate compression level.
+    Returns:
+        bytes: The archive.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as out:
+        if existing is not None and os.path.isfile(existing) and zipfile.is_zipfile(existing):
+            with zipfile.ZipFile(existing, 'r') as z:
+                for info in z.infolist():
+                    if info.filename not in members:
+                        out.writestr(info, z.read(info))
+        for name, content in members.items():
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            out.writestr(info, content, compresslevel=level)
+    return buffer.getvalue()
+
+
+def write_archive(file: str, members: dict, level: int = 6) -> None:
+    """
+    Write members into an archive, keeping its other members. The archive is replaced atomically.
+    Args:
+        file (str): The archive.
+        members (dict): File name -> text or bytes.
+        level (int): The deflate compression level.
+    """
+    data = archive_bytes(members, file, level)
+    with open(file + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(file + '.tmp', file)
+
+
+def write_sim(sim_dir: str, data: object, archive: str = None) -> None:
+    """
+    Write the sim.json of a simulation where it is stored: a plain file, or the archive holding it.
+    Args:
+        sim_dir (str): The simulation directory.
+        data (object): The parsed sim.json, or its text.
+        archive (str): The name of an archive (e.g. 'sim.oghma') to write sim.json into instead. A plain
+            sim.json is then removed, so that it does not take precedence over the archive.
+    """
+    if staged(sim_dir):
+        stage(sim_dir, json.loads(data) if isinstance(data, str) else data)
+        return
+    text = data if isinstance(data, str) else json.dumps(data, indent=4)
+    if archive is None:
+        try:
+            archive = locate(sim_dir)[0]
+        except FileNotFoundError:
+            pass
+    if archive is None:
+        with open(os.path.join(sim_dir, SIM_FILE), 'w') as j:
+            j.write(text)
+        return
+    write_archive(os.path.join(sim_dir, os.path.basename(archive)), {SIM_FILE: text})
+    plain = os.path.join(sim_dir, SIM_FILE)
+    if os.path.isfile(plain):
+        os.remove(plain)
+
+
+def update_sim(sim_dir: str, values: dict, *section: str) -> None:
+    """
+    Update a section of the sim.json of a simulation in memory and write it back where it is stored.
+    Args:
+        sim_dir (str): The simulation directory.
+        values (dict): The keys and values to update.
+        *section: The keys of the section to update (e.g. 'ml', 'segment0'). The whole document if none.
+    """
+    data = read_sim(sim_dir)
+    node = data
+    for key in section:
+        node = node[key]
+    node.update(values)
+    write_sim(sim_dir, data)
+
+
+def clone_archive(src_dir: str, dest_dir: str, data: object = None, archive: str = 'sim.oghma') -> str:
+    """
+    Clone a simulation as a single archive holding its sim.json. The archive of an unmodified source is built
+    once and reused for every clone while the source does not change.
+    Args:
+        src_dir (str): The source simulation directory.
+        dest_dir (str): The directory of the clone, created if needed.
+        data (object): The parsed sim.json or text of the clone. Defaults to the sim.json of the source.
+        archive (str): The name of the archive.
+    Returns:
+        str: The path of the archive written.
+    """
+    if data is None:
+        text = read_source(src_dir)[0]
+        if text not in _archives:
+            _archives.clear()
+            _archives[text] = archive_bytes({SIM_FILE: text})
+        content = _archives[text]
+    else:
+        content = archive_bytes({SIM_FILE: data if isinstance(data, str) else json.dumps(data, indent=4)})
+    os.makedirs(dest_dir, exist_ok=True)
+    file = os.path.join(dest_dir, archive)
+    with open(file, 'wb') as f:
+        f.write(content)
+    return file
+
+
+if __name__ == '__main__':
+    """
+    Example usage: clone the standard device as archives, update them in memory and compare with plain clones.
+    """
+    import time
+    import shutil
+    import tempfile
+
+    device = os.path.join(os.getcwd(), 'standard_device')
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for n in range(200):
+            clone_archive(device, os.path.join(tmp, 'zip', str(n)))
+        print(f'archive clone {(time.perf_counter() - start) * 5:.2f} ms, {os.path.getsize(os.path.join(tmp, "zip", "0", "sim.oghma"))} bytes')
+        start = time.perf_counter()
+        for n in range(200):
+            os.makedirs(os.path.join(tmp, 'plain', str(n)))
+            shutil.copyfile(os.path.join(device, SIM_FILE), os.path.join(tmp, 'plain', str(n), SIM_FILE))
+        print(f'plain clone   {(time.perf_counter() - start) * 5:.2f} ms, {os.path.getsize(os.path.join(device, SIM_FILE))} bytes')
+
+        update_sim(os.path.join(tmp, 'zip', '0'), {'set_point': 310.0}, 'thermal')
+        print(locate(os.path.join(tmp, 'zip', '0'))[0], read_sim(os.path.join(tmp, 'zip', '0'))['thermal']['set_point'])
@@ -0,0 +1,155 @@
+"""
+This module provides typed access to the sim_info.dat results of an experiment. OghmaNano stores every
+value in sim_info.dat as a string, including values such as "-nan". The SimInfo class converts the
+sim_info of every job to a single float64 array once, with a fixed field order and a validity mask, so
+that analyses can index columns directly instead of walking dictionaries of strings.
+"""
+
+import numpy as np
+
+
+SIM_INFO_FIELDS = (
+    'j_pmax', 'v_pmax', 'ff', 'pce', 'Pmax', 'voc', 'sigma', 'jsc', 'k_voc', 'Q_np_pmax',
+    'voc_nt', 'voc_pt', 'voc_nf', 'voc_pf', 'jv_jsc_n', 'jv_vbi', 'jv_gen', 'voc_np_tot',
+    'mu_jsc', 'mu_pmax', 'mu_voc', 'mu_geom_jsc', 'mu_geom_pmax', 'mu_geom_voc',
+    'mu_geom_micro_jsc', 'mu_geom_micro_pmax', 'mu_geom_micro_voc', 'mue_pmax', 'muh_pmax',
+    'mue_jsc', 'muh_jsc', 'tau_voc', 'tau_pmax', 'tau_all_voc', 'tau_all_pmax', 'R_pmax', 'R_voc',
+    'theta_srh_free', 'theta_srh_free_trap', 'theta_jsc', 'theta_voc', 'theta_pmax',
+    'conductivity_n_pmax', 'conductivity_p_pmax', 'conductivity_avg_pmax', 'device_C',
+)
+"""The fixed order of the numeric fields written to sim_info.dat by OghmaNano."""
+
+NON_NUMERIC_FIELDS = ('icon',)
+"""Fields of sim_info.dat which do not hold numbers."""
+
+
+class SimInfo:
+    """
+    Class to hold the sim_info of every job of an experiment as a float64 array.
+    Attributes:
+        hashes (list): The job hashes, one per row.
+        fields (list): The field names, one per column.
+        values (numpy.ndarray): The values, shaped (len(hashes), len(fields)). Missing or unparsable values are NaN.
+        valid (numpy.ndarray): Boolean mask of the same shape, True where the value is present and finite.
+    """
+    def __init__(self, exp_dict: dict = None, hashes: list = None, fields: list = None) -> None:
+        """
+        Initialize the SimInfo class.
+        Args:
+            exp_dict (dict): The experiment dictionary. If given, its sim_info is loaded immediately.
+            hashes (list): The hashes to load. Defaults to exp_dict['experiment']['hashes'].
+            fields (list): The fields to load. Defaults to SIM_INFO_FIELDS followed by any other numeric fields found.
+        """
+        self.hashes = []
+        self.fields = list(fields) if fields is not None else []
+        self.values = np.empty((0, len(self.fields)))
+        self.valid = np.empty((0, len(self.fields)), dtype=bool)
+        self.index = {}
+        if exp_dict is not None:
+            self.load(exp_dict, hashes, fields)
+
+    def load(self, exp_dict: dict, hashes: list = None, fields: list = None) -> 'SimInfo':
+        """
+        Convert the sim_info of the jobs in an experiment dictionary.
+        Args:
+            exp_dict (dict): The experiment dictionary.
+            hashes (list): The hashes to load. Defaults to exp_dict['experiment']['hashes'].
+            fields (list): The fields to load. Defaults to SIM_INFO_FIELDS followed by any other numeric fields found.
+        Returns:
+            SimInfo: The loaded object.
+        """
+        if hashes is None:
+            hashes = exp_dict['experiment']['hashes']
+        records = []
+        for h in hashes:
+            job = exp_dict.get(h) if h is not None else None
+            sim_info = job.get('sim_info') if isinstance(job, dict) else None
+            records.append(sim_info if isinstance(sim_info, dict) else {})
+        return self.load_records(records, hashes, fields)
+
+    def load_records(self, records: list, hashes: list, fields: list = None) -> 'SimInfo':
+        """
+        Convert a list of sim_info dictionaries.
+        Args:
+            records (list): The sim_info dictionaries, one per job. Empty dictionaries mark missing jobs.
+            hashes (list): The hashes of the jobs.
+            fields (list): The fields to load. Defaults to SIM_INFO_FIELDS followed by any other numeric fields found.
+        Returns:
+            SimInfo: The loaded object.
+        """
+        if fields is None:
+            fields = list(SIM_INFO_FIELDS)
+            known = set(fields)
+            for record in records:
+                for key in record:
+                    if key not in known and key not in NON_NUMERIC_FIELDS:
+                        fields.append(key)
+                        known.add(key)
+        self.fields = list(fields)
+        self.hashes = list(hashes)
+        self.index = {h: idx for idx, h in enumerate(self.hashes)}
+
+        raw = [record.get(field, 'nan') for record in records for field in self.fields]
+        present = np.fromiter((field in record for record in records for field in self.fields), dtype=bool, count=len(raw))
+        shape = (len(records), len(self.fields))
+        try:
+            values = np.asarray(raw, dtype=str).astype(np.float64)
+        except ValueError:
+            values = np.fromiter((to_float(value) for value in raw), dtype=np.float64, count=len(raw))
+
+        self.values = values.reshape(shape)
+        self.valid = present.reshape(shape) & np.isfinite(self.values)
+        return self
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Get the values of a field for every job.
+        Args:
+            field (str): The field name.
+        Returns:
+            numpy.ndarray: A view of the column.
+        """
+        return self.values[:, self.fields.index(field)]
+
+    def mask(self, field: str) -> np.ndarray:
+        """
+        Get the validity mask of a field for every job.
+        Args:
+            field (str): The field name.
+        Returns:
+            numpy.ndarray: A view of the mask column.
+        """
+        return self.valid[:, self.fields.index(field)]
+
+    def row(self, hash: str) -> np.ndarray:
+        """
+        Get the values of every field for a job.
+        Args:
+            hash (str): The hash of the job.
+        Returns:
+            numpy.ndarray: A view of the row.
+        """
+        return self.values[self.index[hash]]
+
+    def to_records(self) -> np.ndarray:
+        """
+        Get the values as a NumPy structured array with one named float64 field per sim_info field.
+        Returns:
+            numpy.ndarray: The structured array, one record per job.
+        """
+        dtype = np.dtype([(field, np.float64) for field in self.fields])
+        return np.ascontiguousarray(self.values).view(dtype).reshape(len(self.hashes))
+
+
+def to_float(value: object) -> float:
+    """
+    Convert a single sim_info value to a float.
+    Args:
+        value (object): The value, usually a string such as "8.447504e-01" or "-nan".
+    Returns:
+        float: The value, or NaN if it cannot be converted.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
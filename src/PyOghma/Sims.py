@@ -5,12 +5,14 @@ simulations. The module allows for configuring simulation parameters, updating J
 and handling specific simulation modes such as JV curves, SunsVoc, CELIV, and more.
 """
 import os
-import secrets
 from glob import glob
 
 import numpy as np
 import ujson as json
-from importlib import resources
+
+from .Defaults import LazyComponent, load_default, resource_path
+from .Identifiers import new_id
+from .SimFile import update_sim
 
 
 class Sims:
@@ -37,40 +39,40 @@ class Sims:
         CV (CV): Instance of the CV class.
         CE (CE): Instance of the CE class.
         PL_SS (PL_SS): Instance of the PL_SS class.
-        EQE (EQE): Instance of the EQE class.
+        EQE (EQE): The EQE class.
     """
+    # steady state
+    JV = LazyComponent('JV')
+    SunsVoc = LazyComponent('SunsVoc')
+    SunsJsc = LazyComponent('SunsJsc')
+
+    # time domain
+    CELIV = LazyComponent('CELIV')
+    PhotoCELIV = LazyComponent('PhotoCELIV')
+    TPC = LazyComponent('TPC')
+    TPV = LazyComponent('TPV')
+
+    # frequency domain
+    IMPS = LazyComponent('IMPS')
+    IMVS = LazyComponent('IMVS')
+    IS = LazyComponent('IS')
+
+    # Other
+    CV = LazyComponent('CV')
+    CE = LazyComponent('CE')
+    PL_SS = LazyComponent('PL_SS')
+
     def __init__(self) -> None:
         """
-        Initialize the Sims class and its subcomponents.
+        Initialize the Sims class. The subcomponents are constructed when first accessed.
         """
         self.name = ""
         self.icon = ""
         self.json_name = ""
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
         self.segment_number = 0
         self.segments_number = 1
         self.dest_dir = ""
-
-        # steady state
-        self.JV = JV()
-        self.SunsVoc = SunsVoc()
-        self.SunsJsc = SunsJsc()
-
-        # time domain
-        self.CELIV = CELIV()
-        self.PhotoCELIV = PhotoCELIV()
-        self.TPC = TPC()
-        self.TPV = TPV()
-
-        # frequency domain
-        self.IMPS = IMPS()
-        self.IMVS = IMVS()
-        self.IS = IS()
-
-        # Other
-        self.CV = CV()
-        self.CE = CE()
-        self.PL_SS = PL_SS()
         self.EQE = EQE
 
     def set_format(self) -> None:
@@ -111,11 +113,19 @@ class Sims:
         Args:
             file (str): The name of the configuration file.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            self.config = json.loads(j.read())
+        self.config = load_default(self.config_package(), file + '.json')
         return
 
+    def config_package(self) -> str:
+        """
+        Get the package of Sim_Defaults holding the configuration files of the simulation.
+        Returns:
+            str: The package, relative to Sim_Defaults.
+        """
+        if self.json_name == self.icon.replace("_", "") or self.json_name.replace("_", "") == self.icon:
+            return "Sims.configs." + self.json_name
+        return "Sims.configs." + self.json_name + "." + self.name.lower().replace("\n", "_")
+
     def find_file(self, file: str) -> str:
         """
         Find a file in the directory structure.
@@ -124,24 +134,13 @@ class Sims:
         Returns:
             str: The path to the found file.
         """
-        if self.json_name == self.icon.replace("_", "") or self.json_name.replace("_", "") == self.icon:
-            config_dir = resources.as_file(resources.files("PyOghma.Sim_Defaults.Sims.configs."+self.json_name).joinpath(file)).args[0]
-        else:
-            config_dir = resources.as_file(
-                resources.files("PyOghma.Sim_Defaults.Sims.configs." + self.json_name + "."+ self.name.lower().replace("\n", "_")).joinpath(file)).args[0]
-        return config_dir
+        return resource_path(self.config_package(), file)
 
     def update(self) -> None:
         """
         Update the JSON file with the current data.
         """
-        with open(os.path.join(self.dest_dir,'sim.json'), 'r') as j:
-            data = json.load(j)
-
-        data['sims'].update(self.json_format)
-
-        with open(os.path.join(self.dest_dir,'sim.json'), 'w') as j:
-            j.write(json.dumps(data, indent=4))
+        update_sim(self.dest_dir, self.json_format, 'sims')
 
         return
 
@@ -154,13 +153,7 @@ class Sims:
         exp_name = str(exp_name).lower()
         file = 'default.json'
         exp = {'simmode': 'segment0@'+exp_name}
-        with open(os.path.join(self.dest_dir,'sim.json'),'r') as j:
-            data = json.load(j)
-
-        data['sim'].update(exp)
-
-        with open(os.path.join(self.dest_dir,'sim.json'), 'w') as j:
-            j.write(json.dumps(data, indent=4))
+        update_sim(self.dest_dir, exp, 'sim')
 
 
 class JV(Sims):
@@ -179,7 +172,7 @@ class JV(Sims):
         self.json_name = "jv"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
         self.set_format()
@@ -234,7 +227,7 @@ class SunsVoc(Sims):
         self.icon = "sunsvoc"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
         self.set_format()
@@ -289,7 +282,7 @@ class SunsJsc(Sims):
         self.json_name = "suns_jsc"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
         self.set_format()
@@ -334,9 +327,7 @@ class TimeDomainMesh:
         Args:
             file (str): The name of the configuration file.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            self.mesh = json.loads(j.read())
+        self.mesh = load_default('Sims.configs.time_domain', file + '.json')
         return
 
     def find_file(self, file: str) -> str:
@@ -347,10 +338,7 @@ class TimeDomainMesh:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(
-            resources.files("PyOghma.Sim_Defaults.Sims.configs.time_domain").joinpath(file)).args[0]
-
-        return config_dir
+        return resource_path('Sims.configs.time_domain', file)
 
     def set_loop(self, loop: bool = False, loop_times: int = 0, loop_reset_time: bool = False) -> 'TimeDomainMesh':
         """
@@ -365,6 +353,77 @@ class TimeDomainMesh:
         self.mesh['time_loop_reset_time'] = loop_reset_time
         return
 
+    def set_waveform(self, t: np.ndarray, voltage: np.ndarray = None, sun: np.ndarray = None, laser: np.ndarray = None,
+                     tol: float = 1e-3, max_change: float = 0.01, min_steps: int = 1, max_dt: float = None) -> 'TimeDomainMesh':
+        """
+        Set the mesh from sampled waveforms of the voltage, sun and laser intensity. The waveforms are reduced to
+        the fewest linear ramps which follow every sample within the tolerance, and each ramp becomes one segment.
+        The time step of a segment is chosen so that no signal changes by more than max_change of its range in
+        one step, so flat parts of the waveform take few solver steps and fast edges take many. A step change is
+        given by two samples at the same time.
+        Args:
+            t (numpy.ndarray): The sample times, in increasing order.
+            voltage (numpy.ndarray): The voltage at each time. Defaults to 0.
+            sun (numpy.ndarray): The sun intensity at each time. Defaults to 0.
+            laser (numpy.ndarray): The laser intensity at each time. Defaults to 0.
+            tol (float): The largest deviation from a sample, as a fraction of the range of its signal.
+            max_change (float): The largest change of a signal in one time step, as a fraction of its range.
+            min_steps (int): The smallest number of time steps in a segment.
+            max_dt (float): The largest time step. Defaults to no limit.
+        Returns:
+            TimeDomainMesh: The mesh.
+        Raises:
+            ValueError: If the times decrease or a waveform does not match the times.
+        """
+        t = np.asarray(t, dtype=float).ravel()
+        if np.any(np.diff(t) < 0):
+            raise ValueError('Sample times must not decrease')
+        signals = np.zeros((3, len(t)))
+        for row, signal in enumerate((voltage, sun, laser)):
+            if signal is not None:
+                signal = np.asarray(signal, dtype=float).ravel()
+                if signal.shape != t.shape:
+                    raise ValueError('Waveforms must have one value per sample time')
+                signals[row] = signal
+        span = np.ptp(signals, axis=1) if len(t) else np.zeros(3)
+        span[span == 0] = 1.0
+
+        breaks = simplify_waveform(t, signals, tol * span)
+        template = load_default('Sims.configs.time_domain', 'segment.json')
+        mesh = {key: value for key, value in self.mesh['mesh'].items() if not key.startswith('segment')}
+        idx = 0
+        for a, b in zip(breaks[:-1], breaks[1:]):
+            length = t[b] - t[a]
+            if length <= 0:
+                continue
+            steps = max(min_steps, int(np.ceil(np.max(np.abs(signals[:, b] - signals[:, a]) / (max_change * span)))))
+            dt = length / steps if max_dt is None else min(length / steps, max_dt)
+            (v0, s0, l0), (v1, s1, l1) = signals[:, a].tolist(), signals[:, b].tolist()
+            mesh['segment' + str(idx)] = dict(template, len=float(length), dt=float(dt), mul=1.0, voltage_start=v0, voltage_stop=v1,
+                                              sun_start=s0, sun_stop=s1, laser_start=l0, laser_stop=l1)
+            idx += 1
+        mesh['segments'] = idx
+        self.mesh['mesh'] = mesh
+        self.segments_number = idx
+        return self
+
+    def waveform(self) -> tuple:
+        """
+        Get the waveforms described by the segments of the mesh, as the times and values at the ends of each ramp.
+        Returns:
+            tuple: The times, voltage, sun and laser intensity, as numpy.ndarray, two samples per segment.
+        """
+        mesh = self.mesh['mesh']
+        rows = []
+        time = 0.0
+        for idx in range(int(mesh['segments'])):
+            segment = mesh['segment' + str(idx)]
+            rows.append((time, segment['voltage_start'], segment['sun_start'], segment['laser_start']))
+            time += float(segment['len'])
+            rows.append((time, segment['voltage_stop'], segment['sun_stop'], segment['laser_stop']))
+        out = np.asarray(rows, dtype=float).reshape(-1, 4)
+        return out[:, 0], out[:, 1], out[:, 2], out[:, 3]
+
 
 class TimeDomainSegment:
     """
@@ -384,9 +443,7 @@ class TimeDomainSegment:
         Args:
             file (str): The name of the configuration file.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            self.segment = json.loads(j.read())
+        self.segment = load_default('Sims.configs.time_domain', file + '.json')
         return
 
     def find_file(self, file: str) -> str:
@@ -397,9 +454,7 @@ class TimeDomainSegment:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(
-            resources.files("PyOghma.Sim_Defaults.Sims.configs.time_domain").joinpath(file)).args[0]
-        return config_dir
+        return resource_path('Sims.configs.time_domain', file)
 
     def set_time(self, length: float, dt: float) -> 'TimeDomainSegment':
         """
@@ -448,6 +503,48 @@ class TimeDomainSegment:
         return
 
 
+def simplify_waveform(t: np.ndarray, signals: np.ndarray, atol: np.ndarray) -> list:
+    """
+    Find the fewest breakpoints, by a greedy scan, such that straight lines between them stay within atol of every
+    sample of every signal. Each line is extended as far as possible, with an exponential then binary search.
+    Args:
+        t (numpy.ndarray): The sample times, not decreasing.
+        signals (numpy.ndarray): The signals, shaped (signal, sample).
+        atol (numpy.ndarray): The tolerance of each signal.
+    Returns:
+        list: The indices of the breakpoints, starting with the first sample and ending with the last.
+    """
+    n = len(t)
+    if n == 0:
+        return []
+    atol = np.asarray(atol, dtype=float)[:, None]
+
+    def fits(i: int, j: int) -> bool:
+        if t[j] == t[i]:
+            return j == i + 1
+        frac = (t[i:j + 1] - t[i]) / (t[j] - t[i])
+        line = signals[:, i, None] + (signals[:, j] - signals[:, i])[:, None] * frac
+        return bool(np.all(np.abs(line - signals[:, i:j + 1]) <= atol))
+
+    breaks = [0]
+    i = 0
+    while i < n - 1:
+        good, step = i + 1, 1
+        while good + step < n and fits(i, good + step):
+            good += step
+            step *= 2
+        bad = min(good + step, n)
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if fits(i, mid):
+                good = mid
+            else:
+                bad = mid
+        breaks.append(good)
+        i = good
+    return breaks
+
+
 class CELIV(Sims):
     """
     Class to handle CELIV simulations.
@@ -464,7 +561,7 @@ class CELIV(Sims):
         self.json_name = "time_domain"
         self.segment_number = 0
         self.segments_number = 7
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -504,7 +601,7 @@ class PhotoCELIV(Sims):
         self.json_name = "time_domain"
         self.segment_number = 1
         self.segments_number = 7
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -544,7 +641,7 @@ class TPC(Sims):
         self.json_name = "time_domain"
         self.segment_number = 1
         self.segments_number = 7
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -582,7 +679,7 @@ class TPV(Sims):
         self.json_name = "time_domain"
         self.segment_number = 1
         self.segments_number = 7
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -610,9 +707,10 @@ class FrequencyDomainMesh:
         start (float): The starting frequency.
         stop (float): The stopping frequency.
         steps (int): The number of steps in the frequency range.
+        merge (bool): Whether runs of linearly or geometrically spaced frequencies are merged into one segment.
         mesh (dict): The mesh configuration data.
     """
-    def __init__(self, start: float, stop: float, steps: int, space: str) -> None:
+    def __init__(self, start: float, stop: float, steps: int, space: str, merge: bool = True) -> None:
         """
         Initialize the FrequencyDomainMesh class.
         Args:
@@ -620,10 +718,12 @@ class FrequencyDomainMesh:
             stop (float): The stopping frequency.
             steps (int): The number of steps in the frequency range.
             space (str): The type of frequency spacing ('lin', 'log', 'geo').
+            merge (bool): Whether runs of linearly or geometrically spaced frequencies are merged into one segment.
         """
         self.start = start
         self.stop = stop
         self.steps = steps
+        self.merge = merge
         self.mesh = {"mesh": {"segments": self.steps}}
         match space:
             case 'lin':
@@ -637,29 +737,50 @@ class FrequencyDomainMesh:
         """
         Generate a linear frequency mesh.
         """
-        frequecies = np.linspace(self.start, self.stop, self.steps)
-        for idx, freq in enumerate(frequecies):
-            self.mesh["mesh"].update({"segment" + str(idx): FrequencyDomainSegment(freq).segment})
+        self.set_frequencies(np.linspace(self.start, self.stop, self.steps), self.merge)
         return
 
     def logarithmic(self) -> None:
         """
         Generate a logarithmic frequency mesh.
         """
-        frequecies = np.logspace(self.start, self.stop, self.steps)
-        for idx, freq in enumerate(frequecies):
-            self.mesh["mesh"].update({"segment" + str(idx): FrequencyDomainSegment(freq).segment})
+        self.set_frequencies(np.logspace(self.start, self.stop, self.steps), self.merge)
         return
 
     def geometric(self) -> None:
         """
         Generate a geometric frequency mesh.
         """
-        frequecies = np.geomspace(self.start, self.stop, self.steps)
-        for idx, freq in enumerate(frequecies):
-            self.mesh["mesh"].update({"segment" + str(idx): FrequencyDomainSegment(freq).segment})
+        self.set_frequencies(np.geomspace(self.start, self.stop, self.steps), self.merge)
         return
 
+    def set_frequencies(self, frequencies: np.ndarray, merge: bool = True, rtol: float = 1e-9) -> 'FrequencyDomainMesh':
+        """
+        Set the mesh from any array of frequencies. Every segment is a copy of one cached segment template, and
+        with merge, runs of increasing frequencies with a constant step or a constant step ratio are written as a
+        single segment of several points, which OghmaNano expands to the same frequencies.
+        Args:
+            frequencies (numpy.ndarray): The frequencies, in the order they are simulated.
+            merge (bool): Whether to merge runs into multi-point segments.
+            rtol (float): The relative tolerance to which a merged segment must reproduce its frequencies.
+        Returns:
+            FrequencyDomainMesh: The mesh.
+        """
+        template = load_default('Sims.configs.fx_domain', 'segment.json')
+        segments = frequency_segments(frequencies, rtol) if merge else [(f, f, 1.0, 1.0) for f in np.ravel(frequencies).tolist()]
+        self.mesh = {"mesh": {"segments": len(segments)}}
+        for idx, (start, stop, points, mul) in enumerate(segments):
+            self.mesh["mesh"]["segment" + str(idx)] = dict(template, start=start, stop=stop, points=points, mul=mul)
+        return self
+
+    def frequencies(self) -> np.ndarray:
+        """
+        Get the frequencies the mesh expands to.
+        Returns:
+            numpy.ndarray: The frequencies.
+        """
+        return expand_frequency_mesh(self.mesh["mesh"])
+
 
 class FrequencyDomainSegment:
     """
@@ -694,9 +815,7 @@ class FrequencyDomainSegment:
         Args:
             file (str): The name of the configuration file.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            self.segment = json.loads(j.read())
+        self.segment = load_default('Sims.configs.fx_domain', file + '.json')
         return
 
     def find_file(self, file: str) -> str:
@@ -707,9 +826,108 @@ class FrequencyDomainSegment:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(
-            resources.files("PyOghma.Sim_Defaults.Sims.configs.fx_domain").joinpath(file)).args[0]
-        return str(config_dir)
+        return resource_path('Sims.configs.fx_domain', file)
+
+
+def expand_frequency_mesh(mesh: dict, max_points: int = 1000000) -> np.ndarray:
+    """
+    Expand a frequency domain mesh to its frequencies as OghmaNano does: a segment with start equal to stop is one
+    frequency; otherwise the frequency starts at start and grows by a step of (stop - start) / points, which is
+    multiplied by mul after each point, while it is below stop.
+    Args:
+        mesh (dict): The mesh, holding 'segments' and 'segment0', 'segment1', ...
+        max_points (int): The maximum number of points expanded from one segment.
+    Returns:
+        numpy.ndarray: The frequencies.
+    """
+    out = []
+    for idx in range(int(mesh['segments'])):
+        segment = mesh['segment' + str(idx)]
+        start, stop = float(segment['start']), float(segment['stop'])
+        points, mul = float(segment['points']), float(segment['mul'])
+        if start == stop or points == 0.0:
+            out.append(start)
+            continue
+        step = (stop - start) / points
+        pos = start
+        count = 0
+        while pos < stop and count < max_points:
+            out.append(pos)
+            pos += step
+            step *= mul
+            count += 1
+    return np.asarray(out, dtype=float)
+
+
+def frequency_segments(frequencies: np.ndarray, rtol: float = 1e-9) -> list:
+    """
+    Split frequencies into the fewest segments found by a greedy scan. A run of increasing frequencies whose steps
+    are constant or change by a constant ratio becomes one segment; its stop is placed half a step after the last
+    frequency, so that rounding cannot add or drop a point, and the segment is kept only if it expands back to the
+    run within rtol. Other frequencies become single-point segments.
+    Args:
+        frequencies (numpy.ndarray): The frequencies.
+        rtol (float): The relative tolerance to which a segment must reproduce its frequencies.
+    Returns:
+        list: Tuples of (start, stop, points, mul), one per segment.
+    """
+    f = np.asarray(frequencies, dtype=float).ravel()
+    steps = np.diff(f)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = steps[1:] / steps[:-1]
+    segments = []
+    i = 0
+    while i < len(f):
+        j = i
+        if i + 1 < len(f) and steps[i] > 0:
+            same = (steps[i + 1:] > 0) & np.isclose(ratios[i:], ratios[i] if i < len(ratios) else 1.0, rtol=rtol ** 0.5, atol=0)
+            j = i + 1 + (int(np.argmin(same)) if not same.all() else len(same))
+        while j > i:
+            segment = run_segment(f[i:j + 1])
+            if segment is not None and verify_segment(segment, f[i:j + 1], rtol):
+                break
+            j -= 1
+        if j == i:
+            segment = (float(f[i]), float(f[i]), 1.0, 1.0)
+        segments.append(segment)
+        i = j + 1
+    return segments
+
+
+def run_segment(run: np.ndarray) -> tuple:
+    """
+    Find the segment reproducing a run of increasing, linearly or geometrically spaced frequencies.
+    Args:
+        run (numpy.ndarray): The frequencies of the run, at least two.
+    Returns:
+        tuple: (start, stop, points, mul), or None if the run cannot be written as one segment.
+    """
+    steps = np.diff(run)
+    mul = (steps[-1] / steps[0]) ** (1.0 / (len(steps) - 1)) if len(steps) > 1 else 1.0
+    if not np.isfinite(mul) or mul <= 0:
+        return None
+    if abs(mul - 1.0) < 1e-12:
+        mul = 1.0
+    last = steps[0] * mul ** (len(steps) - 1)
+    start = float(run[0])
+    stop = float(run[-1] + 0.5 * last * mul)
+    return start, stop, (stop - start) / float(steps[0]), float(mul)
+
+
+def verify_segment(segment: tuple, run: np.ndarray, rtol: float) -> bool:
+    """
+    Check that a segment expands to a run of frequencies.
+    Args:
+        segment (tuple): (start, stop, points, mul).
+        run (numpy.ndarray): The frequencies.
+        rtol (float): The relative tolerance.
+    Returns:
+        bool: True if the segment reproduces the run.
+    """
+    start, stop, points, mul = segment
+    expanded = expand_frequency_mesh({'segments': 1, 'segment0': {'start': start, 'stop': stop, 'points': points, 'mul': mul}},
+                                     max_points=len(run) + 1)
+    return len(expanded) == len(run) and np.allclose(expanded, run, rtol=rtol, atol=0)
 
 
 class IMPS(Sims):
@@ -728,7 +946,7 @@ class IMPS(Sims):
         self.json_name = "fx_domain"
         self.segment_number = 0
         self.segments_number = 4
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -763,7 +981,7 @@ class IMVS(Sims):
         self.json_name = "fx_domain"
         self.segment_number = 1
         self.segments_number = 4
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -798,7 +1016,7 @@ class IS(Sims):
         self.json_name = "fx_domain"
         self.segment_number = 1
         self.segments_number = 4
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
@@ -833,7 +1051,7 @@ class CV(Sims):
         self.json_name = "cv"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
         self.set_format()
@@ -870,7 +1088,7 @@ class CE(Sims):
         self.json_name = "ce"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
         self.set_format()
@@ -909,7 +1127,7 @@ class PL_SS(Sims):
         self.json_name = "pl"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
         self.set_format()
@@ -930,7 +1148,7 @@ class EQE(Sims):
         self.json_name = "eqe"
         self.segment_number = 0
         self.segments_number = 1
-        self.id = "id" + str(secrets.token_hex(8))
+        self.id = new_id(type(self).__name__)
 
         self.load_config('default')
 
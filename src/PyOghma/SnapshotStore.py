@@ -0,0 +1,283 @@
+"""
+This module provides an on-disk store for the spatial snapshot data written by OghmaNano in the `snapshots`
+and `optical_snapshots` directories of a simulation. Each snapshot directory holds numbered folders, one per
+snapshot, with one oghma_csv file per quantity (e.g. G.csv, n.csv, alpha.csv) and a data.json describing the
+snapshot. Chosen quantities are gathered from every job into arrays shaped (job, snapshot, position), saved
+as .npy chunks of a fixed number of jobs and memory mapped on read, so slices of thousands of simulations
+can be explored without keeping the clone directories or loading everything into memory.
+
+Layout:
+    <dir>/index.json
+    <dir>/<kind>/<quantity>/<chunk>.npy
+"""
+
+import os
+import ujson as json
+import numpy as np
+
+from .OghmaCSV import read_oghma_csv
+
+SNAPSHOT_KINDS = ('snapshots', 'optical_snapshots')
+"""The snapshot directories written by OghmaNano."""
+
+
+def snapshot_dirs(path: str, kind: str) -> list:
+    """
+    Find the numbered snapshot folders of a simulation, in snapshot order.
+    Args:
+        path (str): The simulation directory.
+        kind (str): The snapshot directory, 'snapshots' or 'optical_snapshots'.
+    Returns:
+        list: The paths of the snapshot folders.
+    """
+    root = os.path.join(path, kind)
+    if not os.path.isdir(root):
+        return []
+    names = [name for name in os.listdir(root) if name.isdigit() and os.path.isdir(os.path.join(root, name))]
+    return [os.path.join(root, name) for name in sorted(names, key=int)]
+
+
+class SnapshotStore:
+    """
+    Class to harvest and lazily read snapshot quantities of an experiment.
+    Attributes:
+        path (str): The directory of the store.
+        index (dict): The layout of the store: hashes, chunk size and, per kind and quantity, the array shape,
+            dtype, positions and the snapshot metadata.
+        chunk_jobs (int): The number of jobs saved in each chunk.
+    """
+    def __init__(self, path: str, chunk_jobs: int = 256) -> None:
+        """
+        Initialize the SnapshotStore class. An existing store is opened.
+        Args:
+            path (str): The directory of the store.
+            chunk_jobs (int): The number of jobs saved in each chunk of a new store.
+        """
+        self.path = path
+        self.chunk_jobs = chunk_jobs
+        self.index = {'hashes': [], 'chunk_jobs': chunk_jobs, 'quantities': {}}
+        file = os.path.join(path, 'index.json')
+        if os.path.isfile(file):
+            with open(file, 'r') as f:
+                self.index = json.load(f)
+            self.chunk_jobs = self.index['chunk_jobs']
+
+    def harvest(self, jobs: list, quantities: list, kind: str = 'optical_snapshots', stride: int = 1,
+                snapshot_stride: int = 1, dtype: str = 'float32') -> None:
+        """
+        Gather quantities from the snapshot folders of jobs and save them to the store.
+        Args:
+            jobs (list): Tuples of (hash, path), one per job, in the order of the store.
+            quantities (list): The quantities to gather, named after their files (e.g. ['G', 'n']).
+            kind (str): The snapshot directory, 'snapshots' or 'optical_snapshots'.
+            stride (int): Keep every stride-th position, to limit the size of the store.
+            snapshot_stride (int): Keep every snapshot_stride-th snapshot.
+            dtype (str): The dtype of the stored arrays.
+        Raises:
+            ValueError: If the kind is not a snapshot directory, or a quantity is not found in any job.
+        """
+        if kind not in SNAPSHOT_KINDS:
+            raise ValueError('Unknown snapshot directory: ' + str(kind))
+        hashes = [h for h, _ in jobs]
+        if self.index['hashes'] and self.index['hashes'] != hashes:
+            raise ValueError('Jobs do not match the hashes of the store')
+        self.index['hashes'] = hashes
+
+        layout = self.layout(jobs, quantities, kind, stride, snapshot_stride)
+        kinds = self.index['quantities'].setdefault(kind, {})
+        for quantity, meta in layout.items():
+            meta['dtype'] = dtype
+            meta['stride'] = stride
+            meta['snapshot_stride'] = snapshot_stride
+            kinds[quantity] = meta
+            os.makedirs(os.path.join(self.path, kind, quantity), exist_ok=True)
+
+        for chunk, start in enumerate(range(0, len(jobs), self.chunk_jobs)):
+            part = jobs[start:start + self.chunk_jobs]
+            arrays = {quantity: np.full((len(part),) + tuple(kinds[quantity]['shape'][1:]), np.nan, dtype=dtype)
+                      for quantity in layout}
+            for row, (_, path) in enumerate(part):
+                folders = snapshot_dirs(path, kind)[::snapshot_stride]
+                for quantity, array in arrays.items():
+                    for snapshot, folder in enumerate(folders[:array.shape[1]]):
+                        file = os.path.join(folder, quantity + '.csv')
+                        if os.path.isfile(file):
+                            data = read_oghma_csv(file).data.ravel()[::stride]
+                            array[row, snapshot, :min(data.size, array.shape[2])] = data[:array.shape[2]]
+            for quantity, array in arrays.items():
+                np.save(self.chunk_file(kind, quantity, chunk), array)
+        self.save_index()
+
+    def layout(self, jobs: list, quantities: list, kind: str, stride: int, snapshot_stride: int) -> dict:
+        """
+        Find the shape, positions and snapshot metadata of each quantity from the first job holding it.
+        Args:
+            jobs (list): Tuples of (hash, path), one per job.
+            quantities (list): The quantities to gather.
+            kind (str): The snapshot directory.
+            stride (int): The position stride.
+            snapshot_stride (int): The snapshot stride.
+        Returns:
+            dict: The layout of each quantity.
+        Raises:
+            ValueError: If a quantity is not found in any job.
+        """
+        layout = {}
+        for _, path in jobs:
+            folders = snapshot_dirs(path, kind)[::snapshot_stride]
+            for quantity in quantities:
+                if quantity in layout or not folders:
+                    continue
+                file = os.path.join(folders[0], quantity + '.csv')
+                if not os.path.isfile(file):
+                    continue
+                csv = read_oghma_csv(file)
+                positions = csv.y[::stride] if csv.data.ndim == 3 and csv.data.shape[:2] == (1, 1) else np.arange(csv.data.size)[::stride]
+                snapshots = []
+                for folder in folders:
+                    info = os.path.join(folder, 'data.json')
+                    if os.path.isfile(info):
+                        with open(info, 'r') as f:
+                            snapshots.append(json.load(f))
+                    else:
+                        snapshots.append({})
+                layout[quantity] = {
+                    'shape': [len(jobs), len(folders), len(positions)],
+                    'positions': positions.tolist(),
+                    'snapshots': snapshots,
+                    'title': csv.title,
+                    'units': csv.units['data'],
+                }
+            if len(layout) == len(quantities):
+                break
+        missing = [quantity for quantity in quantities if quantity not in layout]
+        if missing:
+            raise ValueError('Snapshot quantities not found in ' + kind + ': ' + ', '.join(missing))
+        return layout
+
+    def chunk_file(self, kind: str, quantity: str, chunk: int) -> str:
+        """
+        Get the path of a chunk.
+        Args:
+            kind (str): The snapshot directory.
+            quantity (str): The quantity.
+            chunk (int): The chunk number.
+        Returns:
+            str: The path of the .npy file.
+        """
+        return os.path.join(self.path, kind, quantity, str(chunk) + '.npy')
+
+    def save_index(self) -> None:
+        """
+        Write the index of the store.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'index.json'), 'w') as f:
+            json.dump(self.index, f, indent=4)
+
+    def quantities(self, kind: str = 'optical_snapshots') -> list:
+        """
+        Get the quantities held by the store.
+        Args:
+            kind (str): The snapshot directory.
+        Returns:
+            list: The quantity names.
+        """
+        return list(self.index['quantities'].get(kind, {}).keys())
+
+    def positions(self, quantity: str, kind: str = 'optical_snapshots') -> np.ndarray:
+        """
+        Get the positions of a quantity after downsampling.
+        Args:
+            quantity (str): The quantity.
+            kind (str): The snapshot directory.
+        Returns:
+            numpy.ndarray: The positions.
+        """
+        return np.asarray(self.index['quantities'][kind][quantity]['positions'])
+
+    def snapshots(self, quantity: str, kind: str = 'optical_snapshots') -> list:
+        """
+        Get the metadata of each stored snapshot of a quantity (e.g. the wavelength of optical snapshots).
+        Args:
+            quantity (str): The quantity.
+            kind (str): The snapshot directory.
+        Returns:
+            list: The contents of data.json, one dictionary per snapshot.
+        """
+        return self.index['quantities'][kind][quantity]['snapshots']
+
+    def get(self, quantity: str, hashes: list = None, snapshots: object = slice(None), positions: object = slice(None),
+            kind: str = 'optical_snapshots') -> np.ndarray:
+        """
+        Read a slice of a quantity. Only the chunks holding the requested jobs are opened, and they are memory
+        mapped and sliced one contiguous run of jobs at a time, so only the requested part is read from disk.
+        Args:
+            quantity (str): The quantity.
+            hashes (list): The jobs to read. Defaults to every job.
+            snapshots (object): An index, slice or list selecting snapshots.
+            positions (object): An index, slice or list selecting positions. Lists select every combination of the
+                snapshots and positions given, as with numpy.ix_.
+            kind (str): The snapshot directory.
+        Returns:
+            numpy.ndarray: The data, shaped (job, snapshot, position) before indexing of snapshots and positions.
+        Raises:
+            KeyError: If the quantity or a hash is not in the store.
+        """
+        meta = self.index['quantities'][kind][quantity]
+        if hashes is None:
+            rows = np.arange(len(self.index['hashes']))
+        else:
+            lookup = {h: row for row, h in enumerate(self.index['hashes'])}
+            rows = np.asarray([lookup[h] for h in hashes], dtype=int)
+
+        chunks = rows // self.chunk_jobs
+        parts = []
+        for chunk in np.unique(chunks):
+            array = np.load(self.chunk_file(kind, quantity, int(chunk)), mmap_mode='r')
+            local, inverse = np.unique(rows[chunks == chunk] - chunk * self.chunk_jobs, return_inverse=True)
+            starts = np.flatnonzero(np.diff(local, prepend=-2) != 1)
+            stops = np.append(starts[1:], len(local))
+            runs = [select(array[local[a]:local[b - 1] + 1], snapshots, positions) for a, b in zip(starts, stops)]
+            parts.append((np.flatnonzero(chunks == chunk), np.concatenate(runs)[inverse.ravel()]))
+        shape = (len(rows),) + parts[0][1].shape[1:] if parts else (0,)
+        out = np.empty(shape, dtype=meta['dtype'])
+        for where, data in parts:
+            out[where] = data
+        return out
+
+
+def select(block: np.ndarray, snapshots: object, positions: object) -> np.ndarray:
+    """
+    Select snapshots and positions of a (job, snapshot, position) block. Indices and slices are applied first, as
+    views of a memory map; lists are applied one axis at a time, so two lists select every combination.
+    Args:
+        block (numpy.ndarray): The block, usually a view of a memory mapped chunk.
+        snapshots (object): An index, slice or list selecting snapshots.
+        positions (object): An index, slice or list selecting positions.
+    Returns:
+        numpy.ndarray: The selection.
+    """
+    basic = isinstance(positions, (slice, int, np.integer))
+    if basic:
+        block = block[:, :, positions]
+    block = block[:, snapshots]
+    if not basic:
+        block = block[..., positions]
+    return np.asarray(block)
+
+
+if __name__ == '__main__':
+    """
+    Example usage: harvest the optical snapshots of the standard device as if it were a set of jobs.
+    """
+    import tempfile
+
+    device = os.path.join(os.getcwd(), 'standard_device')
+    jobs = [('job' + str(n), device) for n in range(8)]
+    with tempfile.TemporaryDirectory() as path:
+        A = SnapshotStore(path, chunk_jobs=3)
+        A.harvest(jobs, ['G', 'alpha'], stride=4)
+        B = SnapshotStore(path)
+        G = B.get('G', hashes=['job1', 'job7'], snapshots=slice(0, 5))
+        print(G.shape, B.positions('G').shape, [s.get('wavelength') for s in B.snapshots('G')][:5])
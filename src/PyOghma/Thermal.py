@@ -7,7 +7,9 @@ and updating simulation data in JSON format for thermal analysis.
 import ujson as json
 import os
 from glob import glob
-from importlib import resources
+
+from .Defaults import load_default, resource_path
+from .SimFile import update_sim
 
 
 class Thermal:
@@ -37,9 +39,7 @@ class Thermal:
         Returns:
             dict: The loaded JSON data.
         """
-        file = file + '.json'
-        with open(self.find_file(file)) as j:
-            return json.loads(j.read())
+        return load_default('Thermal.configs.' + self.json_name, file + '.json')
 
     def find_file(self, file: str) -> str:
         """
@@ -49,9 +49,7 @@ class Thermal:
         Returns:
             str: The path to the found file.
         """
-        config_dir = resources.as_file(
-            resources.files("PyOghma.Sim_Defaults.Thermal.configs." + self.json_name).joinpath(file)).args[0]
-        return config_dir
+        return resource_path('Thermal.configs.' + self.json_name, file)
 
     def set_format(self) -> None:
         """
@@ -63,13 +61,7 @@ class Thermal:
         """
         Update the JSON file with the current data.
         """
-        with open(os.path.join(self.dest_dir,'sim.json'), 'r') as j:
-            data = json.load(j)
-
-        data.update(self.json_format)
-
-        with open(os.path.join(self.dest_dir,'sim.json'), 'w') as j:
-            j.write(json.dumps(data, indent=4))
+        update_sim(self.dest_dir, self.json_format)
 
         return
 
@@ -1,19 +1,110 @@
 """
 PyOghma: A Python API for OghmaNano
 
-PyOghma provides a programmatic interface to configure, execute, and analyze drift-diffusion simulations using OghmaNano. 
-It simplifies workflows for researchers and engineers by enabling seamless integration of optical, thermal, epitaxy, 
+PyOghma provides a programmatic interface to configure, execute, and analyze drift-diffusion simulations using OghmaNano.
+It simplifies workflows for researchers and engineers by enabling seamless integration of optical, thermal, epitaxy,
 and simulation configurations. PyOghma also includes tools for analyzing simulation results and calculating key metrics.
 
+Submodules and the classes below are imported on first use (PEP 562), so `import PyOghma` stays fast for worker
+processes and short scripts; run import_time_test.py to check it.
 """
 
-from .OghmaNano import OghmaNano
-# OghmaNano: Main class to manage simulations and configurations for OghmaNano.
+import sys
+import types
+import importlib
 
-from .OghmaResults import Results
-# Results: Class to handle the results of simulations and experiments.
+_lazy = {
+    'OghmaNano': 'OghmaNano',
+    # OghmaNano: Main class to manage simulations and configurations for OghmaNano.
 
-from .Calculate import Ideality_Factor, Transport_Resistance, Psudo_JV
-# Ideality_Factor: Class to calculate the ideality factor of a solar cell based on experimental data.
-# Transport_Resistance: Class to calculate transport resistance based on experimental data.
-# Psudo_JV: Class to calculate the pseudo JV of a diode.
+    'Results': 'OghmaResults',
+    # Results: Class to handle the results of simulations and experiments.
+
+    'Ideality_Factor': 'Calculate',
+    'Transport_Resistance': 'Calculate',
+    'Psudo_JV': 'Calculate',
+    'JV_Metrics': 'Calculate',
+    # Ideality_Factor: Class to calculate the ideality factor of a solar cell based on experimental data.
+    # Transport_Resistance: Class to calculate transport resistance based on experimental data.
+    # Psudo_JV: Class to calculate the pseudo JV of a diode.
+    # JV_Metrics: Class to extract Voc, Jsc, FF and the maximum power point of every JV curve at once.
+
+    'OghmaCSV': 'OghmaCSV',
+    'read_oghma_csv': 'OghmaCSV',
+    # OghmaCSV: Class to hold the data and metadata of an oghma_csv output file.
+    # read_oghma_csv: Function to read an oghma_csv output file into a shaped NumPy array.
+
+    'SimInfo': 'SimInfo',
+    # SimInfo: Class to hold the sim_info of every job as a typed float64 array with a validity mask.
+
+    'ExpStore': 'ExpStore',
+    # ExpStore: Class to read and write experiment files as independently compressed chunks with an index.
+
+    'SnapshotStore': 'SnapshotStore',
+    # SnapshotStore: Class to harvest snapshot quantities into chunked (job, snapshot, position) arrays read lazily.
+
+    'Preflight': 'Preflight',
+    'PreflightError': 'Preflight',
+    # Preflight: Class to check every path and value of a sweep against the source sim.json before launching it.
+    # PreflightError: Exception listing every problem found by Preflight.
+
+    'PathIndex': 'PathIndex',
+    'path_index': 'PathIndex',
+    # PathIndex: Class to resolve keys, partial paths and human readable names of a sim.json to full JSON paths.
+    # path_index: Function to get the index of a simulation, built once per sim.json.
+
+    'read_sim': 'SimFile',
+    'write_sim': 'SimFile',
+    # read_sim: Function to read the sim.json of a simulation, plain or inside its sim.oghma or sim.zip archive.
+    # write_sim: Function to write the sim.json of a simulation where it is stored, or into a compressed archive.
+
+    'ml_dataset': 'ML',
+    # ml_dataset: Class to generate ML training data natively, as shards of sampled inputs and output vectors.
+}
+
+_submodules = (
+    'Calculate', 'Defaults', 'Epitaxy', 'ExpStore', 'Fitting', 'Identifiers', 'JsonPatch', 'ML', 'OghmaCSV',
+    'OghmaNano', 'OghmaResults', 'Optical', 'PathIndex', 'Preflight', 'Server', 'SimFile', 'SimInfo', 'Sims',
+    'SnapshotStore', 'Thermal',
+)
+
+__all__ = list(_lazy)
+
+
+def __getattr__(name: str) -> object:
+    """
+    Import a class or submodule of the package on first access.
+    Args:
+        name (str): The attribute name.
+    Returns:
+        object: The class, function or submodule.
+    Raises:
+        AttributeError: If the name is not part of the package.
+    """
+    if name in _lazy:
+        value = getattr(importlib.import_module('.' + _lazy[name], __name__), name)
+    elif name in _submodules:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_lazy) | set(_submodules))
+
+
+class _Package(types.ModuleType):
+    """
+    Module type of the package. Importing a submodule binds it as an attribute of the package; for submodules
+    named after the class they define (e.g. SimInfo) this binding is skipped, so the name keeps resolving to
+    the class as it did when the classes were imported eagerly.
+    """
+    def __setattr__(self, name: str, value: object) -> None:
+        if name in _lazy and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package